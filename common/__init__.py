@@ -1,5 +1,7 @@
 from .stack import Stack
 from .queue import Queue
 from .linked_list import LinkedList
-from .utils import timeExecute, cacheDict
-from .simple_threadpool import ThreadPool
+from .utils import timeExecute
+from .lru_cache import LRUCache
+from .process_pool import ProcessPool
+from .result_cache import ResultCache, fileFingerprint
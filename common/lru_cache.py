@@ -0,0 +1,83 @@
+from collections import OrderedDict
+from typing import (
+    Any,
+    Callable,
+    Hashable,
+    Optional,
+)
+
+
+class LRUCache:
+    def __init__(self, maxSize: int) -> None:
+        if maxSize < 1:
+            raise Exception("cache size cannot < 1")
+        self.__maxSize: int = maxSize
+        self.__table: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self.__hits: int = 0
+        self.__misses: int = 0
+        self.__evictions: int = 0
+
+    def __len__(self) -> int:
+        return len(self.__table)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self.__table
+
+    @property
+    def maxSize(self) -> int:
+        return self.__maxSize
+
+    @property
+    def hits(self) -> int:
+        return self.__hits
+
+    @property
+    def misses(self) -> int:
+        return self.__misses
+
+    @property
+    def evictions(self) -> int:
+        return self.__evictions
+
+    @property
+    def hitRate(self) -> float:
+        total: int = self.__hits + self.__misses
+        return self.__hits / total if total != 0 else 0.0
+
+    def get(self, key: Hashable, default: Optional[Any] = None) -> Optional[Any]:
+        if key not in self.__table:
+            self.__misses += 1
+            return default
+        self.__hits += 1
+        self.__table.move_to_end(key)
+        return self.__table[key]
+
+    def put(self, key: Hashable, value: Any) -> None:
+        self.__table[key] = value
+        self.__table.move_to_end(key)
+        while len(self.__table) > self.__maxSize:
+            self.__table.popitem(last=False)
+            self.__evictions += 1
+
+    def getOrCompute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        if key in self.__table:
+            self.__hits += 1
+            self.__table.move_to_end(key)
+            return self.__table[key]
+        self.__misses += 1
+        value: Any = compute()
+        self.put(key, value)
+        return value
+
+    def clear(self) -> None:
+        self.__table.clear()
+
+    def resetStats(self) -> None:
+        self.__hits = 0
+        self.__misses = 0
+        self.__evictions = 0
+
+    def __str__(self) -> str:
+        return "LRUCache(size: {}/{}, hits: {}, misses: {}, evictions: {})".format(
+            len(self.__table), self.__maxSize, self.__hits, self.__misses, self.__evictions
+        )
@@ -0,0 +1,57 @@
+import multiprocessing
+import weakref
+from multiprocessing.pool import Pool
+from typing import (
+    Optional,
+    List,
+    Any,
+    Callable,
+    Tuple,
+)
+
+
+class ProcessPool:
+    def __init__(
+        self,
+        nprocs: int,
+        initializer: Optional[Callable[..., None]] = None,
+        initargs: Tuple = (),
+        startMethod: Optional[str] = None,
+    ) -> None:
+        if nprocs < 1:
+            raise Exception("number of processes cannot < 1")
+        self.__nprocs: int = nprocs
+        # the start method is picked per pool, never forced process-wide
+        self.__pool: Pool = multiprocessing.get_context(startMethod).Pool(
+            nprocs, initializer, initargs
+        )
+        self.__finalizer = weakref.finalize(self, ProcessPool.__shutdown, self.__pool)
+
+    @staticmethod
+    def __shutdown(pool: Pool) -> None:
+        pool.terminate()
+        pool.join()
+
+    @property
+    def size(self) -> int:
+        return self.__nprocs
+
+    @property
+    def closed(self) -> bool:
+        return not self.__finalizer.alive
+
+    def map(self, handler: Callable[[Any], Any], tasks: List[Any]) -> List[Any]:
+        if self.closed:
+            raise Exception("process pool is closed")
+        if tasks is None or len(tasks) <= 0:
+            raise Exception("No task found")
+        return self.__pool.map(handler, tasks)
+
+    def close(self) -> None:
+        self.__finalizer()
+
+    def __enter__(self) -> "ProcessPool":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
@@ -0,0 +1,127 @@
+import hashlib
+import pickle
+import sqlite3
+import time
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+)
+
+# stay below the default SQLITE_MAX_VARIABLE_NUMBER of older sqlite builds
+SQL_BATCH_SIZE = 500
+
+
+def fileFingerprint(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as fp:
+        for chunk in iter(lambda: fp.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ResultCache:
+    def __init__(self, path: str, maxEntries: int = 10 ** 6) -> None:
+        if maxEntries < 1:
+            raise Exception("cache size cannot < 1")
+        self.__path: str = path
+        self.__maxEntries: int = maxEntries
+        self.__connection: sqlite3.Connection = sqlite3.connect(path)
+        self.__connection.execute(
+            "CREATE TABLE IF NOT EXISTS results "
+            "(key TEXT PRIMARY KEY, value BLOB NOT NULL, used REAL NOT NULL)"
+        )
+        self.__connection.execute(
+            "CREATE INDEX IF NOT EXISTS results_used ON results (used)"
+        )
+        self.__connection.commit()
+        self.__hits: int = 0
+        self.__misses: int = 0
+        self.__evictions: int = 0
+
+    def __len__(self) -> int:
+        return self.__connection.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    @property
+    def path(self) -> str:
+        return self.__path
+
+    @property
+    def hits(self) -> int:
+        return self.__hits
+
+    @property
+    def misses(self) -> int:
+        return self.__misses
+
+    @property
+    def evictions(self) -> int:
+        return self.__evictions
+
+    def get(self, key: str, default: Optional[Any] = None) -> Optional[Any]:
+        return self.getMany([key]).get(key, default)
+
+    def put(self, key: str, value: Any) -> None:
+        self.putMany([(key, value)])
+
+    def getMany(self, keys: List[str]) -> Dict[str, Any]:
+        result: Dict[str, Any] = dict()
+        for batch in self.__batches(list(dict.fromkeys(keys))):
+            rows = self.__connection.execute(
+                "SELECT key, value FROM results WHERE key IN ({})".format(
+                    ",".join("?" * len(batch))
+                ),
+                batch,
+            ).fetchall()
+            for key, value in rows:
+                result[key] = pickle.loads(value)
+        if result:
+            now: float = time.time()
+            self.__connection.executemany(
+                "UPDATE results SET used = ? WHERE key = ?", [(now, k) for k in result]
+            )
+            self.__connection.commit()
+        self.__hits += len(result)
+        self.__misses += len(set(keys)) - len(result)
+        return result
+
+    def putMany(self, items: Iterable[Tuple[str, Any]]) -> None:
+        now: float = time.time()
+        self.__connection.executemany(
+            "INSERT OR REPLACE INTO results (key, value, used) VALUES (?, ?, ?)",
+            [(key, pickle.dumps(value), now) for key, value in items],
+        )
+        self.__evict()
+        self.__connection.commit()
+
+    def __evict(self) -> None:
+        # least recently used entries go first once the table is over its limit
+        excess: int = len(self) - self.__maxEntries
+        if excess <= 0:
+            return
+        self.__connection.execute(
+            "DELETE FROM results WHERE key IN "
+            "(SELECT key FROM results ORDER BY used ASC LIMIT ?)",
+            (excess,),
+        )
+        self.__evictions += excess
+
+    def __batches(self, keys: List[str]) -> Iterable[List[str]]:
+        for i in range(0, len(keys), SQL_BATCH_SIZE):
+            yield keys[i : i + SQL_BATCH_SIZE]
+
+    def clear(self) -> None:
+        self.__connection.execute("DELETE FROM results")
+        self.__connection.commit()
+
+    def close(self) -> None:
+        self.__connection.close()
+
+    def __enter__(self) -> "ResultCache":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
@@ -3,13 +3,30 @@ __email__ = "trhoangtuan96@gmail.com"
 __version__ = "1.0.0"
 
 from .adjacency_matrix import AdjacencyMatrix
+from .adjacency_list import AdjacencyList
+from .frozen_graph import FrozenGraph
 from .direction_graph import (
     UnweightedDirectionAdjacencyMatrix,
     WeightedDirectionAdjacencyMatrix,
+    UnweightedDirectionAdjacencyList,
+    WeightedDirectionAdjacencyList,
 )
 from .indirection_graph import (
     UnweightedIndirectionAdjacencyMatrix,
     WeightedIndirectionAdjacencyMatrix,
+    UnweightedIndirectionAdjacencyList,
+    WeightedIndirectionAdjacencyList,
+)
+from .algorithms import (
+    TopoSortAlgorithm,
+    BayesBallAlgorithm,
+    FrozenGraphAlgorithm,
+    ReachabilityIndex,
+)
+from .views import (
+    GraphView,
+    ReversedGraphView,
+    InducedSubgraphView,
+    EdgeMaskedGraphView,
 )
-from .algorithms import TopoSortAlgorithm
 from .utils import reverseGraph
@@ -0,0 +1,204 @@
+from typing import (
+    Dict,
+    Optional,
+    Generic,
+    Generator,
+    TypeVar,
+    List,
+    Tuple,
+    Hashable,
+    Union,
+)
+from .frozen_graph import FrozenGraph
+
+
+V = TypeVar("V", bound=Union[Hashable])
+W = TypeVar("W", float, int)
+
+
+class AdjacencyList(Generic[V, W]):
+    # same interface as AdjacencyMatrix, but every vertex only keeps its own
+    # successors and predecessors, so memory is O(V + E) and parent lookups
+    # do not scan the whole vertex set
+    def __init__(
+        self, verticesList: Optional[List[V]] = None, digraph: bool = False
+    ) -> None:
+        self.__digraph: bool = digraph
+        self.__successors: Dict[V, Dict[V, W]] = dict()
+        self.__predecessors: Dict[V, Dict[V, W]] = dict()
+        self.__inDegreeMap: Dict[V, int] = dict()
+        self.__outDegreeMap: Dict[V, int] = dict()
+        self.__numberOfEdges: int = 0
+        self.__version: int = 0
+
+        if verticesList is not None:
+            for v in verticesList:
+                self.addNewNode(v)
+
+    def addNewNode(self, node: Optional[V]) -> None:
+        if node is None:
+            raise Exception("input None node")
+        if node in self.__successors:
+            return
+        self.__version += 1
+        self.__successors[node] = dict()
+        self.__predecessors[node] = dict()
+        self.__inDegreeMap[node] = 0
+        self.__outDegreeMap[node] = 0
+
+    def addPath(self, startNode: V, endNode: V, value: W) -> None:
+        if startNode is None or endNode is None:
+            raise Exception("input None node")
+        if value is None:
+            raise Exception("input None value")
+        if startNode not in self.__successors:
+            self.addNewNode(startNode)
+        if endNode not in self.__successors:
+            self.addNewNode(endNode)
+        isNewPath: bool = endNode not in self.__successors[startNode]
+
+        self.__link(startNode, endNode, value, isNewPath)
+        if not self.__digraph and startNode != endNode:
+            self.__link(endNode, startNode, value, isNewPath)
+        if isNewPath:
+            self.__version += 1
+            self.__numberOfEdges += 1
+
+    def __link(self, startNode: V, endNode: V, value: W, isNewPath: bool) -> None:
+        self.__successors[startNode][endNode] = value
+        self.__predecessors[endNode][startNode] = value
+        if isNewPath:
+            self.__outDegreeMap[startNode] += 1
+            self.__inDegreeMap[endNode] += 1
+
+    def getPath(self, startNode: V, endNode: V) -> Optional[W]:
+        if startNode is None or endNode is None:
+            raise Exception("input None node")
+        if startNode not in self.__successors:
+            raise Exception("cannot found start node in map")
+        if endNode not in self.__successors:
+            raise Exception("cannot found end node in map")
+        return self.__successors[startNode].get(endNode)
+
+    def deletePath(self, startNode: V, endNode: V) -> None:
+        if startNode is None or endNode is None:
+            raise Exception("input None node")
+        if startNode not in self.__successors:
+            raise Exception("cannot found start node in map")
+        if endNode not in self.__successors:
+            raise Exception("cannot found end node in map")
+        if endNode not in self.__successors[startNode]:
+            return
+        self.__version += 1
+        self.__numberOfEdges -= 1
+        self.__unlink(startNode, endNode)
+        if not self.__digraph and startNode != endNode:
+            self.__unlink(endNode, startNode)
+
+    def __unlink(self, startNode: V, endNode: V) -> None:
+        del self.__successors[startNode][endNode]
+        del self.__predecessors[endNode][startNode]
+        self.__outDegreeMap[startNode] -= 1
+        self.__inDegreeMap[endNode] -= 1
+
+    def allSuccessors(self, v: V) -> Generator[Tuple[V, Optional[W]], None, None]:
+        if v is None:
+            raise Exception("input None vertex")
+        if v not in self.__successors:
+            raise Exception(f"input vertex not in graph ({v})")
+        for k, value in self.__successors[v].items():
+            yield (k, value)
+
+    def allInorderedSuccessors(
+        self, v: V
+    ) -> Generator[Tuple[V, Optional[W]], None, None]:
+        if v is None:
+            raise Exception("input None vertex")
+        if v not in self.__successors:
+            raise Exception(f"input vertex not in graph ({v})")
+        adj: Dict[V, W] = self.__successors[v]
+        for k in sorted(adj.keys()):
+            yield (k, adj[k])
+
+    def allPredecessors(self, v: V) -> Generator[Tuple[V, Optional[W]], None, None]:
+        if v is None:
+            raise Exception("input None vertex")
+        if v not in self.__predecessors:
+            raise Exception("input vertex not in graph")
+        for k, value in self.__predecessors[v].items():
+            yield (k, value)
+
+    def allInorderedPredecessors(
+        self, v: V
+    ) -> Generator[Tuple[V, Optional[W]], None, None]:
+        if v is None:
+            raise Exception("input None vertex")
+        if v not in self.__predecessors:
+            raise Exception("input vertex not in graph")
+        adj: Dict[V, W] = self.__predecessors[v]
+        for k in sorted(adj.keys()):
+            yield (k, adj[k])
+
+    def inDegree(self, v: V) -> int:
+        if v not in self.__inDegreeMap:
+            raise Exception("input vertex not in graph")
+        return self.__inDegreeMap[v]
+
+    def outDegree(self, v: V) -> int:
+        if v not in self.__outDegreeMap:
+            raise Exception("input vertex not in graph")
+        return self.__outDegreeMap[v]
+
+    def numberOfEdges(self) -> int:
+        return self.__numberOfEdges
+
+    def vertexSet(self) -> List[V]:
+        return list(self.__successors.keys())
+
+    def allVertexes(self) -> Generator[V, None, None]:
+        for k in self.__successors.keys():
+            yield k
+
+    def allInorderedVertexes(self) -> Generator[V, None, None]:
+        for k in sorted(self.__successors.keys()):
+            yield k
+
+    def checkVertexExist(self, v: V) -> bool:
+        if v is None:
+            raise Exception("input None vertex")
+        return v in self.__successors
+
+    def zeroInDegreeVertexes(self) -> Generator[V, None, None]:
+        for v in self.__inDegreeMap.keys():
+            if self.__inDegreeMap[v] == 0:
+                yield v
+
+    def zeroOutDegreeVertexes(self) -> Generator[V, None, None]:
+        for v in self.__outDegreeMap.keys():
+            if self.__outDegreeMap[v] == 0:
+                yield v
+
+    def freeze(self) -> FrozenGraph:
+        return FrozenGraph.fromGraph(self)
+
+    @property
+    def version(self) -> int:
+        return self.__version
+
+    def isDigraph(self) -> bool:
+        return self.__digraph
+
+    def allEdges(self) -> Generator[Tuple[V, V, Optional[W]], None, None]:
+        for s, adj in self.__successors.items():
+            for e, value in adj.items():
+                yield (s, e, value)
+
+    def __str__(self) -> str:
+        if not self.__successors:
+            raise Exception("Map is empty")
+        result: str = "vertices: " + str(sorted(self.__successors.keys())) + "\n"
+        result += "Adjacency: " + "\n"
+        for kstart in sorted(self.__successors.keys()):
+            result += "{:<10}".format(str(kstart)) + " -> "
+            result += str(sorted(self.__successors[kstart].keys())) + "\n"
+        return result
@@ -11,6 +11,7 @@ from typing import (
     Any,
     Union,
 )
+from .frozen_graph import FrozenGraph
 
 
 V = TypeVar("V", bound=Union[Hashable])
@@ -26,6 +27,8 @@ class AdjacencyMatrix(Generic[V, W]):
         self.__inDegreeMap: Dict[V, int] = dict()
         self.__outDegreeMap: Dict[V, int] = dict()
         self.__edgesSet: Set[Tuple[V, V]] = set()
+        # bumped on every structural change, lets algorithms drop stale caches
+        self.__version: int = 0
 
         if verticesList is not None:
             for v in verticesList:
@@ -40,10 +43,13 @@ class AdjacencyMatrix(Generic[V, W]):
             raise Exception("input None node")
         if node in self.__map:
             return
+        self.__version += 1
         self.__map[node] = dict()
         for v in self.__map.keys():
             self.__map[v][node] = None
             self.__map[node][v] = None
+        self.__inDegreeMap[node] = 0
+        self.__outDegreeMap[node] = 0
 
     def addPath(self, startNode: V, endNode: V, value: W) -> None:
         if startNode is None or endNode is None:
@@ -71,6 +77,7 @@ class AdjacencyMatrix(Generic[V, W]):
             self.__inDegreeMap[endNode] = 0
 
         if isNewPath:
+            self.__version += 1
             self.__outDegreeMap[startNode] += 1
             self.__inDegreeMap[endNode] += 1
             if not self.__digraph:
@@ -95,6 +102,7 @@ class AdjacencyMatrix(Generic[V, W]):
             raise Exception("cannot found end node in map")
         if self.__map[startNode][endNode] is None:
             return
+        self.__version += 1
         self.__map[startNode][endNode] = None
         self.__outDegreeMap[startNode] -= 1
         self.__inDegreeMap[endNode] -= 1
@@ -149,6 +157,19 @@ class AdjacencyMatrix(Generic[V, W]):
             if self.__map[k][v] is not None:
                 yield (k, self.__map[k][v])
 
+    def inDegree(self, v: V) -> int:
+        if v not in self.__inDegreeMap:
+            raise Exception("input vertex not in graph")
+        return self.__inDegreeMap[v]
+
+    def outDegree(self, v: V) -> int:
+        if v not in self.__outDegreeMap:
+            raise Exception("input vertex not in graph")
+        return self.__outDegreeMap[v]
+
+    def numberOfEdges(self) -> int:
+        return len(self.__edgesSet) if self.__digraph else len(self.__edgesSet) // 2
+
     def vertexSet(self) -> List[V]:
         return list(self.__map.keys())
 
@@ -175,6 +196,13 @@ class AdjacencyMatrix(Generic[V, W]):
             if self.__outDegreeMap[v] == 0:
                 yield v
 
+    def freeze(self) -> FrozenGraph:
+        return FrozenGraph.fromGraph(self)
+
+    @property
+    def version(self) -> int:
+        return self.__version
+
     def isDigraph(self) -> bool:
         return self.__digraph
 
@@ -1,7 +1,14 @@
+import sys
+import numpy as np
+from collections import OrderedDict
 from . import AdjacencyMatrix
+from .frozen_graph import FrozenGraph, gather
 from common import Stack, Queue
 from typing import (
     Dict,
+    FrozenSet,
+    Iterable,
+    Iterator,
     Optional,
     Generic,
     Generator,
@@ -17,6 +24,17 @@ from typing import (
 
 V = TypeVar("V", bound=Union[Hashable])
 
+REACHABILITY_INDEX_BYTES = 1 << 27
+
+
+def maskToArray(mask: int, size: int) -> np.array:
+    raw: np.array = np.frombuffer(mask.to_bytes((size + 7) // 8, "little"), dtype=np.uint8)
+    return np.unpackbits(raw, bitorder="little")[:size].astype(bool)
+
+
+def arrayToMask(flags: np.array) -> int:
+    return int.from_bytes(np.packbits(flags, bitorder="little").tobytes(), "little")
+
 
 class TopoSortAlgorithm:
     def __init__(self, adjacencyMatrix: AdjacencyMatrix):
@@ -31,12 +49,22 @@ class TopoSortAlgorithm:
                     vertex, visited, stack
                 )
             )
-        for neighbor, _ in self.__adjacencyMatrix.allSuccessors(vertex):
-            if neighbor in visited:
-                continue
-            visited.add(neighbor)
-            self.__dfsFromVertex(neighbor, visited, stack)
-        stack.push(vertex)
+        # an explicit stack of successor iterators instead of recursion, so
+        # deep graphs cannot hit the recursion limit
+        frames: List[Tuple[V, Iterator[Tuple[V, Any]]]] = [
+            (vertex, self.__adjacencyMatrix.allSuccessors(vertex))
+        ]
+        while frames:
+            v, successors = frames[-1]
+            for neighbor, _ in successors:
+                if neighbor in visited:
+                    continue
+                visited.add(neighbor)
+                frames.append((neighbor, self.__adjacencyMatrix.allSuccessors(neighbor)))
+                break
+            else:
+                frames.pop()
+                stack.push(v)
 
     def dfsFromVertex(
         self, vertex: V, visited: Set[V] = None
@@ -104,3 +132,468 @@ class TopoSortAlgorithm:
                 yield v
         else:
             raise Exception("This is not a Digraph")
+
+    def levels(self) -> List[List[V]]:
+        # Kahn's algorithm: every level holds the vertexes whose predecessors
+        # all lie in earlier levels, so the vertexes of a level are independent
+        # of each other
+        if not self.__adjacencyMatrix.isDigraph():
+            raise Exception("This is not a Digraph")
+        inDegrees: Dict[V, int] = {
+            v: self.__adjacencyMatrix.inDegree(v)
+            for v in self.__adjacencyMatrix.allVertexes()
+        }
+        frontier: List[V] = [v for v, degree in inDegrees.items() if degree == 0]
+        result: List[List[V]] = list()
+        remaining: int = len(inDegrees)
+        while frontier:
+            result.append(frontier)
+            remaining -= len(frontier)
+            nextFrontier: List[V] = list()
+            for v in frontier:
+                for neighbor, _ in self.__adjacencyMatrix.allSuccessors(v):
+                    inDegrees[neighbor] -= 1
+                    if inDegrees[neighbor] == 0:
+                        nextFrontier.append(neighbor)
+            frontier = nextFrontier
+        if remaining > 0:
+            raise Exception(
+                "Graph has a cycle: {}".format(
+                    " -> ".join(str(v) for v in self.__findCycle(inDegrees))
+                )
+            )
+        return result
+
+    def kahn(self) -> Generator[V, None, None]:
+        for level in self.levels():
+            for v in level:
+                yield v
+
+    def __findCycle(self, inDegrees: Dict[V, int]) -> List[V]:
+        # every vertex left with a positive in-degree has a predecessor that
+        # is left too, so walking predecessors must come back on itself
+        v: V = next(v for v, degree in inDegrees.items() if degree > 0)
+        path: List[V] = list()
+        seen: Dict[V, int] = dict()
+        while v not in seen:
+            seen[v] = len(path)
+            path.append(v)
+            v = next(
+                u
+                for u, _ in self.__adjacencyMatrix.allPredecessors(v)
+                if inDegrees[u] > 0
+            )
+        cycle: List[V] = path[seen[v] :] + [v]
+        cycle.reverse()
+        return cycle
+
+
+class ReachabilityIndex:
+    # transitive closure of a DAG kept as one big-int bitset per vertex and
+    # direction, bit i standing for the i-th vertex. Masks are computed on
+    # demand on top of the cached masks of neighbours, evicted least recently
+    # used past maxBytes, and patched in place by pathAdded
+    def __init__(
+        self, adjacencyMatrix: AdjacencyMatrix, maxBytes: int = REACHABILITY_INDEX_BYTES
+    ):
+        if not adjacencyMatrix:
+            raise Exception("Invalid input param")
+        if not adjacencyMatrix.isDigraph():
+            raise Exception("This is not a Digraph")
+        if maxBytes < 1:
+            raise Exception("index size cannot < 1")
+        self.__adjacencyMatrix = adjacencyMatrix
+        self.__maxBytes: int = maxBytes
+        self.__reset()
+
+    def __reset(self) -> None:
+        self.__vertices: List[V] = self.__adjacencyMatrix.vertexSet()
+        self.__index: Dict[V, int] = {v: i for i, v in enumerate(self.__vertices)}
+        # keyed by (up, vertex index), up meaning ancestors
+        self.__masks: "OrderedDict[Tuple[bool, int], int]" = OrderedDict()
+        self.__bytes: int = 0
+        self.__counts: Dict[bool, int] = {True: 0, False: 0}
+        self.__version: int = self.__adjacencyMatrix.version
+
+    def __sync(self) -> None:
+        # a change the index was not told about makes every mask suspect
+        if self.__version != self.__adjacencyMatrix.version:
+            self.__reset()
+
+    def __append(self, vertex: V) -> None:
+        self.__index[vertex] = len(self.__vertices)
+        self.__vertices.append(vertex)
+
+    def __indexOf(self, vertex: V) -> int:
+        if vertex is None:
+            raise Exception("Vertex is None")
+        if vertex not in self.__index:
+            raise Exception("Vertex: {} not exist in graph".format(vertex))
+        return self.__index[vertex]
+
+    def __store(self, key: Tuple[bool, int], mask: int) -> None:
+        if key in self.__masks:
+            self.__bytes -= sys.getsizeof(self.__masks[key])
+        else:
+            self.__counts[key[0]] += 1
+        self.__masks[key] = mask
+        self.__masks.move_to_end(key)
+        self.__bytes += sys.getsizeof(mask)
+        while self.__bytes > self.__maxBytes and len(self.__masks) > 1:
+            (up, _), evicted = self.__masks.popitem(last=False)
+            self.__bytes -= sys.getsizeof(evicted)
+            self.__counts[up] -= 1
+
+    def __closure(self, i: int, up: bool, store: bool = True) -> int:
+        key: Tuple[bool, int] = (up, i)
+        if key in self.__masks:
+            if store:
+                self.__masks.move_to_end(key)
+            return self.__masks[key]
+        neighbors = (
+            self.__adjacencyMatrix.allPredecessors
+            if up
+            else self.__adjacencyMatrix.allSuccessors
+        )
+        visited: bytearray = bytearray(len(self.__vertices))
+        mask: int = 0
+        stack: List[V] = [self.__vertices[i]]
+        while stack:
+            for neighbor, _ in neighbors(stack.pop()):
+                j: int = self.__index[neighbor]
+                if visited[j]:
+                    continue
+                visited[j] = 1
+                # a cached neighbour already covers everything past it
+                cached: Optional[int] = self.__masks.get((up, j))
+                if cached is not None:
+                    mask |= cached
+                else:
+                    stack.append(neighbor)
+        mask |= arrayToMask(np.frombuffer(visited, dtype=bool))
+        if store:
+            self.__store(key, mask)
+        return mask
+
+    def __union(self, vertexes: Iterable[V], up: bool) -> int:
+        self.__sync()
+        mask: int = 0
+        for i in [self.__indexOf(v) for v in vertexes]:
+            mask |= self.__closure(i, up)
+        return mask
+
+    def build(self) -> None:
+        # topological order lets every mask reuse its parents' masks, and the
+        # reverse order its children's
+        self.__sync()
+        order: List[int] = [
+            self.__index[v] for v in TopoSortAlgorithm(self.__adjacencyMatrix).kahn()
+        ]
+        for i in order:
+            self.__closure(i, True)
+        for i in reversed(order):
+            self.__closure(i, False)
+
+    @property
+    def vertices(self) -> Tuple[V, ...]:
+        # the vertex of every mask bit
+        self.__sync()
+        return tuple(self.__vertices)
+
+    @property
+    def nbytes(self) -> int:
+        return self.__bytes
+
+    def isAncestor(self, ancestor: V, vertex: V) -> bool:
+        self.__sync()
+        bit: int = self.__indexOf(ancestor)
+        return (self.__closure(self.__indexOf(vertex), True) >> bit) & 1 == 1
+
+    def isDescendant(self, descendant: V, vertex: V) -> bool:
+        return self.isAncestor(vertex, descendant)
+
+    def ancestorMask(self, vertexes: Iterable[V]) -> np.array:
+        # union over the vertexes, which are only included when one is an
+        # ancestor of another
+        mask: int = self.__union(vertexes, True)
+        return maskToArray(mask, len(self.__vertices))
+
+    def descendantMask(self, vertexes: Iterable[V]) -> np.array:
+        mask: int = self.__union(vertexes, False)
+        return maskToArray(mask, len(self.__vertices))
+
+    def ancestors(self, vertexes: Iterable[V]) -> List[V]:
+        return [self.__vertices[i] for i in np.flatnonzero(self.ancestorMask(vertexes))]
+
+    def descendants(self, vertexes: Iterable[V]) -> List[V]:
+        return [
+            self.__vertices[i] for i in np.flatnonzero(self.descendantMask(vertexes))
+        ]
+
+    def checkNewPath(self, startNode: V, endNode: V) -> None:
+        self.__sync()
+        if startNode == endNode or (
+            startNode in self.__index
+            and endNode in self.__index
+            and self.isAncestor(endNode, startNode)
+        ):
+            raise Exception(
+                "path {} -> {} would create a cycle".format(startNode, endNode)
+            )
+
+    def vertexAdded(self, vertex: V) -> None:
+        # to be called right after graph.addNewNode(vertex)
+        if vertex not in self.__index and self.__adjacencyMatrix.version == self.__version + 1:
+            self.__append(vertex)
+            self.__version += 1
+        self.__sync()
+
+    def pathAdded(self, startNode: V, endNode: V) -> None:
+        # to be called right after graph.addPath(startNode, endNode): only the
+        # masks below the new path gain the ancestors above it and vice versa
+        expected: int = self.__version
+        for vertex in [startNode, endNode]:
+            if vertex not in self.__index:
+                self.__append(vertex)
+                expected += 1
+        if self.__adjacencyMatrix.version == expected:
+            self.__version = expected
+            return
+        if self.__adjacencyMatrix.version != expected + 1:
+            self.__reset()
+            return
+        self.__version = self.__adjacencyMatrix.version
+        start: int = self.__index[startNode]
+        end: int = self.__index[endNode]
+        for up, source, vertex in [(True, end, start), (False, start, end)]:
+            # cached masks on the source side of the path gain the closure of
+            # the other side; the side is walked without caching, so a
+            # direction nobody queries never starts being patched
+            if self.__counts[up] == 0:
+                continue
+            affected: np.array = np.flatnonzero(
+                maskToArray(
+                    self.__closure(source, not up, False) | (1 << source),
+                    len(self.__vertices),
+                )
+            )
+            patch: Optional[int] = None
+            for i in affected.tolist():
+                if (up, i) not in self.__masks:
+                    continue
+                if patch is None:
+                    patch = self.__closure(vertex, up) | (1 << vertex)
+                # computing the patch may have evicted this very mask
+                current: Optional[int] = self.__masks.get((up, i))
+                if current is not None:
+                    self.__store((up, i), current | patch)
+
+
+class BayesBallAlgorithm:
+    # d-separation by Shachter's Bayes-ball: a ball is passed from the source
+    # vertexes along active trails, so every vertex and direction is visited
+    # at most once and a query runs in O(V + E)
+    def __init__(
+        self,
+        adjacencyMatrix: AdjacencyMatrix,
+        reachability: Optional[ReachabilityIndex] = None,
+    ):
+        if not adjacencyMatrix:
+            raise Exception("Invalid input param")
+        if not adjacencyMatrix.isDigraph():
+            raise Exception("This is not a Digraph")
+        self.__adjacencyMatrix = adjacencyMatrix
+        if reachability is None:
+            reachability = ReachabilityIndex(adjacencyMatrix)
+        self.__reachability: ReachabilityIndex = reachability
+
+    def __checkVertexes(self, vertexes: Iterable[V]) -> List[V]:
+        result: List[V] = list(vertexes)
+        for v in result:
+            if v is None:
+                raise Exception("Vertex is None")
+            if not self.__adjacencyMatrix.checkVertexExist(v):
+                raise Exception("Vertex: {} not exist in graph".format(v))
+        return result
+
+    def ancestors(self, vertex: V) -> FrozenSet[V]:
+        return frozenset(self.__reachability.ancestors([vertex]))
+
+    def descendants(self, vertex: V) -> FrozenSet[V]:
+        return frozenset(self.__reachability.descendants([vertex]))
+
+    def __ball(
+        self, sources: Iterable[V], evidence: Iterable[V]
+    ) -> Tuple[Set[V], Set[V]]:
+        sources = self.__checkVertexes(sources)
+        observed: Set[V] = set(self.__checkVertexes(evidence))
+        # observed vertexes and their ancestors let a ball bounce back up
+        # from a v-structure
+        opened: Set[V] = set(observed)
+        if observed:
+            opened.update(self.__reachability.ancestors(observed))
+
+        visited: Set[Tuple[V, bool]] = set()
+        reached: Set[V] = set()
+        touched: Set[V] = set()
+        # (vertex, up): up means the ball arrived from a child
+        stack: List[Tuple[V, bool]] = [(v, True) for v in sources if v not in observed]
+        while stack:
+            v, up = stack.pop()
+            if (v, up) in visited:
+                continue
+            visited.add((v, up))
+            if v in observed:
+                touched.add(v)
+            else:
+                reached.add(v)
+            if up and v not in observed:
+                for parent, _ in self.__adjacencyMatrix.allPredecessors(v):
+                    stack.append((parent, True))
+                for child, _ in self.__adjacencyMatrix.allSuccessors(v):
+                    stack.append((child, False))
+            elif not up:
+                if v not in observed:
+                    for child, _ in self.__adjacencyMatrix.allSuccessors(v):
+                        stack.append((child, False))
+                if v in opened:
+                    for parent, _ in self.__adjacencyMatrix.allPredecessors(v):
+                        stack.append((parent, True))
+        return reached, touched
+
+    def dConnected(self, sources: Iterable[V], evidence: Iterable[V]) -> Set[V]:
+        # unobserved vertexes with an active trail from a source, sources included
+        reached, _ = self.__ball(sources, evidence)
+        return reached
+
+    def requisiteEvidence(self, sources: Iterable[V], evidence: Iterable[V]) -> Set[V]:
+        # observations the ball touches, a posterior of the sources given the
+        # evidence only depends on these
+        _, touched = self.__ball(sources, evidence)
+        return touched
+
+    def isDSeparated(
+        self, xs: Iterable[V], ys: Iterable[V], evidence: Iterable[V]
+    ) -> bool:
+        ys = self.__checkVertexes(ys)
+        reached: Set[V] = self.dConnected(xs, evidence)
+        return not any(y in reached for y in ys)
+
+
+class FrozenGraphAlgorithm:
+    # traversals over a FrozenGraph, working level by level on index arrays;
+    # results are vertex indexes, FrozenGraph.vertexesOf maps them back
+    def __init__(self, frozenGraph: FrozenGraph):
+        if frozenGraph is None:
+            raise Exception("Invalid input param")
+        self.__graph: FrozenGraph = frozenGraph
+
+    def __sources(self, sources: Optional[Iterable[V]]) -> np.array:
+        if sources is None:
+            return np.flatnonzero(self.__graph.inDegrees() == 0)
+        return self.__graph.indexes(list(sources))
+
+    def topoSort(self) -> np.array:
+        # Kahn's algorithm, one whole zero in-degree level per step
+        if not self.__graph.isDigraph():
+            raise Exception("This is not a Digraph")
+        offsets: np.array = self.__graph.successorOffsets
+        indices: np.array = self.__graph.successorIndices
+        inDegrees: np.array = self.__graph.inDegrees().astype(np.intp)
+        frontier: np.array = np.flatnonzero(inDegrees == 0)
+        levels: List[np.array] = list()
+        while len(frontier) > 0:
+            levels.append(frontier)
+            successors: np.array = gather(offsets, indices, frontier)
+            inDegrees -= np.bincount(successors, minlength=len(inDegrees))
+            frontier = np.unique(successors[inDegrees[successors] == 0])
+        order: np.array = (
+            np.concatenate(levels) if levels else np.zeros(0, dtype=np.intp)
+        )
+        if len(order) != len(self.__graph):
+            raise Exception("Graph has a cycle, cannot sort it topologically")
+        return order
+
+    def bfs(self, sources: Optional[Iterable[V]] = None, reverse: bool = False) -> np.array:
+        offsets, indices = self.__arcs(reverse)
+        visited: np.array = np.zeros(len(self.__graph), dtype=bool)
+        frontier: np.array = self.__firstVisit(self.__sources(sources), visited)
+        levels: List[np.array] = list()
+        while len(frontier) > 0:
+            levels.append(frontier)
+            frontier = self.__firstVisit(gather(offsets, indices, frontier), visited)
+        return np.concatenate(levels) if levels else np.zeros(0, dtype=np.intp)
+
+    def __firstVisit(self, candidates: np.array, visited: np.array) -> np.array:
+        # unvisited candidates in order of first appearance, marked visited
+        candidates = candidates[~visited[candidates]]
+        _, first = np.unique(candidates, return_index=True)
+        result: np.array = candidates[np.sort(first)]
+        visited[result] = True
+        return result
+
+    def dfs(self, sources: Optional[Iterable[V]] = None, reverse: bool = False) -> np.array:
+        # pre-order, iterative so deep graphs cannot hit the recursion limit
+        offsets, indices = self.__arcs(reverse)
+        offsetList: List[int] = offsets.tolist()
+        indexList: List[int] = indices.tolist()
+        visited: List[bool] = [False] * len(self.__graph)
+        order: List[int] = list()
+        for source in self.__sources(sources).tolist():
+            if visited[source]:
+                continue
+            stack: List[int] = [source]
+            while stack:
+                v: int = stack.pop()
+                if visited[v]:
+                    continue
+                visited[v] = True
+                order.append(v)
+                # reversed, so the first successor is explored first
+                for u in reversed(indexList[offsetList[v] : offsetList[v + 1]]):
+                    if not visited[u]:
+                        stack.append(u)
+        return np.array(order, dtype=np.intp)
+
+    def reachable(self, sources: Iterable[V], reverse: bool = False) -> np.array:
+        # boolean mask of the vertexes reachable from the sources, sources
+        # included; reverse follows predecessors, i.e. ancestors
+        visited: np.array = np.zeros(len(self.__graph), dtype=bool)
+        visited[self.bfs(sources, reverse)] = True
+        return visited
+
+    def moralize(self) -> FrozenGraph:
+        # undirected graph linking every vertex to its parents and every pair
+        # of parents of a common child
+        if not self.__graph.isDigraph():
+            raise Exception("This is not a Digraph")
+        size: int = len(self.__graph)
+        offsets: np.array = self.__graph.predecessorOffsets
+        indices: np.array = self.__graph.predecessorIndices
+        children: np.array = np.repeat(np.arange(size), np.diff(offsets))
+        starts: List[np.array] = [indices.astype(np.intp)]
+        ends: List[np.array] = [children]
+        degrees: np.array = np.diff(offsets)
+        # children with the same number of parents are married in one go
+        for k in np.unique(degrees[degrees > 1]).tolist():
+            rows: np.array = offsets[:-1][degrees == k][:, None] + np.arange(k)
+            parents: np.array = indices[rows]
+            first, second = np.triu_indices(k, 1)
+            starts.append(parents[:, first].ravel().astype(np.intp))
+            ends.append(parents[:, second].ravel().astype(np.intp))
+        low: np.array = np.concatenate(starts)
+        high: np.array = np.concatenate(ends)
+        low, high = np.minimum(low, high), np.maximum(low, high)
+        keys: np.array = np.unique(low[low != high] * size + high[low != high])
+        low, high = keys // size, keys % size
+        return FrozenGraph(
+            list(self.__graph.vertices),
+            np.concatenate([low, high]),
+            np.concatenate([high, low]),
+            digraph=False,
+        )
+
+    def __arcs(self, reverse: bool) -> Tuple[np.array, np.array]:
+        if reverse:
+            return self.__graph.predecessorOffsets, self.__graph.predecessorIndices
+        return self.__graph.successorOffsets, self.__graph.successorIndices
@@ -1,4 +1,4 @@
-from . import AdjacencyMatrix
+from . import AdjacencyMatrix, AdjacencyList
 
 
 class UnweightedDirectionAdjacencyMatrix(AdjacencyMatrix):
@@ -15,3 +15,19 @@ class WeightedDirectionAdjacencyMatrix(AdjacencyMatrix):
 
     def addPath(self, startNode, endNode, value):
         super().addPath(startNode, endNode, value)
+
+
+class UnweightedDirectionAdjacencyList(AdjacencyList):
+    def __init__(self, verticesList=None):
+        super().__init__(verticesList, True)
+
+    def addPath(self, startNode, endNode):
+        super().addPath(startNode, endNode, 1)
+
+
+class WeightedDirectionAdjacencyList(AdjacencyList):
+    def __init__(self, verticesList=None):
+        super().__init__(verticesList, True)
+
+    def addPath(self, startNode, endNode, value):
+        super().addPath(startNode, endNode, value)
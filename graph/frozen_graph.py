@@ -0,0 +1,170 @@
+import numpy as np
+from typing import (
+    Dict,
+    Optional,
+    Generic,
+    TypeVar,
+    List,
+    Tuple,
+    Hashable,
+    Any,
+    Union,
+)
+
+
+V = TypeVar("V", bound=Union[Hashable])
+
+
+def buildCSR(
+    size: int, starts: np.array, ends: np.array
+) -> Tuple[np.array, np.array, np.array]:
+    # neighbours are kept in vertex index order, whatever order the source
+    # graph yields its edges in (the matrix backend keeps them in a set)
+    order: np.array = np.lexsort((ends, starts))
+    offsets: np.array = np.zeros(size + 1, dtype=np.int32)
+    np.cumsum(np.bincount(starts, minlength=size), out=offsets[1:])
+    return offsets, ends[order].astype(np.int32), order
+
+
+def gather(offsets: np.array, indices: np.array, vertexes: np.array) -> np.array:
+    # concatenated neighbour lists of the given vertexes, without a python loop
+    starts: np.array = offsets[vertexes].astype(np.intp)
+    lengths: np.array = offsets[vertexes + 1] - starts
+    total: int = int(lengths.sum())
+    if total == 0:
+        return np.zeros(0, dtype=indices.dtype)
+    shifts: np.array = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+    return indices[shifts + np.arange(total)]
+
+
+class FrozenGraph(Generic[V]):
+    # immutable compressed sparse row snapshot of a graph: vertex i has the
+    # successors successorIndices[successorOffsets[i]:successorOffsets[i + 1]]
+    # and likewise for predecessors
+    def __init__(
+        self,
+        vertices: List[V],
+        starts: np.array,
+        ends: np.array,
+        weights: Optional[np.array] = None,
+        digraph: bool = True,
+    ) -> None:
+        self.__vertices: Tuple[V, ...] = tuple(vertices)
+        self.__index: Dict[V, int] = {v: i for i, v in enumerate(self.__vertices)}
+        if len(self.__index) != len(self.__vertices):
+            raise Exception("duplicated vertexes in graph")
+        starts = np.asarray(starts, dtype=np.intp)
+        ends = np.asarray(ends, dtype=np.intp)
+        if starts.shape != ends.shape:
+            raise Exception("number of edge starts != number of edge ends")
+        size: int = len(self.__vertices)
+        if len(starts) > 0 and (
+            min(starts.min(), ends.min()) < 0 or max(starts.max(), ends.max()) >= size
+        ):
+            raise Exception("edge out of vertex range")
+        if weights is None:
+            weights = np.ones(len(starts))
+        self.__digraph: bool = digraph
+        (
+            self.__successorOffsets,
+            self.__successorIndices,
+            order,
+        ) = buildCSR(size, starts, ends)
+        self.__weights: np.array = np.asarray(weights, dtype=np.float64)[order]
+        self.__predecessorOffsets, self.__predecessorIndices, _ = buildCSR(
+            size, ends, starts
+        )
+        for array in [
+            self.__successorOffsets,
+            self.__successorIndices,
+            self.__predecessorOffsets,
+            self.__predecessorIndices,
+            self.__weights,
+        ]:
+            array.setflags(write=False)
+
+    @classmethod
+    def fromGraph(cls, graph: Any) -> "FrozenGraph":
+        vertices: List[V] = graph.vertexSet()
+        index: Dict[V, int] = {v: i for i, v in enumerate(vertices)}
+        # an undirected graph already lists both arcs of every edge
+        edges: List[Tuple[V, V, Any]] = list(graph.allEdges())
+        return cls(
+            vertices,
+            np.array([index[s] for s, _, _ in edges], dtype=np.intp),
+            np.array([index[e] for _, e, _ in edges], dtype=np.intp),
+            np.array([w for _, _, w in edges], dtype=np.float64),
+            graph.isDigraph(),
+        )
+
+    def __len__(self) -> int:
+        return len(self.__vertices)
+
+    @property
+    def vertices(self) -> Tuple[V, ...]:
+        return self.__vertices
+
+    @property
+    def successorOffsets(self) -> np.array:
+        return self.__successorOffsets
+
+    @property
+    def successorIndices(self) -> np.array:
+        return self.__successorIndices
+
+    @property
+    def predecessorOffsets(self) -> np.array:
+        return self.__predecessorOffsets
+
+    @property
+    def predecessorIndices(self) -> np.array:
+        return self.__predecessorIndices
+
+    @property
+    def weights(self) -> np.array:
+        return self.__weights
+
+    def isDigraph(self) -> bool:
+        return self.__digraph
+
+    def numberOfEdges(self) -> int:
+        if self.__digraph:
+            return len(self.__successorIndices)
+        # an undirected edge is stored as two arcs, a self loop as one
+        starts: np.array = np.repeat(
+            np.arange(len(self.__vertices)), np.diff(self.__successorOffsets)
+        )
+        loops: int = int(np.count_nonzero(starts == self.__successorIndices))
+        return (len(self.__successorIndices) + loops) // 2
+
+    def index(self, v: V) -> int:
+        if v not in self.__index:
+            raise Exception("Vertex: {} not exist in graph".format(v))
+        return self.__index[v]
+
+    def indexes(self, vertexes: List[V]) -> np.array:
+        return np.array([self.index(v) for v in vertexes], dtype=np.intp)
+
+    def vertexesOf(self, indexes: np.array) -> List[V]:
+        return [self.__vertices[i] for i in indexes.tolist()]
+
+    def successors(self, i: int) -> np.array:
+        return self.__successorIndices[
+            self.__successorOffsets[i] : self.__successorOffsets[i + 1]
+        ]
+
+    def predecessors(self, i: int) -> np.array:
+        return self.__predecessorIndices[
+            self.__predecessorOffsets[i] : self.__predecessorOffsets[i + 1]
+        ]
+
+    def inDegrees(self) -> np.array:
+        return np.diff(self.__predecessorOffsets)
+
+    def outDegrees(self) -> np.array:
+        return np.diff(self.__successorOffsets)
+
+    def __str__(self) -> str:
+        return "FrozenGraph(vertices: {}, edges: {}, digraph: {})".format(
+            len(self.__vertices), self.numberOfEdges(), self.__digraph
+        )
@@ -1,4 +1,4 @@
-from . import AdjacencyMatrix
+from . import AdjacencyMatrix, AdjacencyList
 
 
 class UnweightedIndirectionAdjacencyMatrix(AdjacencyMatrix):
@@ -15,3 +15,19 @@ class WeightedIndirectionAdjacencyMatrix(AdjacencyMatrix):
 
     def addPath(self, startNode, endNode, value):
         super().addPath(startNode, endNode, value)
+
+
+class UnweightedIndirectionAdjacencyList(AdjacencyList):
+    def __init__(self, verticesList=None):
+        super().__init__(verticesList, False)
+
+    def addPath(self, startNode, endNode):
+        super().addPath(startNode, endNode, 1)
+
+
+class WeightedIndirectionAdjacencyList(AdjacencyList):
+    def __init__(self, verticesList=None):
+        super().__init__(verticesList, False)
+
+    def addPath(self, startNode, endNode, value):
+        super().addPath(startNode, endNode, value)
@@ -1,11 +1,8 @@
-from . import AdjacencyMatrix
+from .views import ReversedGraphView
 
 
 def reverseGraph(adjMatrix):
     if adjMatrix is None:
         raise Exception("Invalid input")
-
-    rMatrix = AdjacencyMatrix(digraph=adjMatrix.isDigraph())
-    for s, e, w in adjMatrix.allEdges():
-        rMatrix.addPath(e, s, w)
-    return rMatrix
+    # a view rather than a copy: no O(V^2) matrix to build for every caller
+    return ReversedGraphView(adjMatrix)
@@ -0,0 +1,229 @@
+from .frozen_graph import FrozenGraph
+from typing import (
+    Any,
+    Generic,
+    Generator,
+    Hashable,
+    Iterable,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    TypeVar,
+    Union,
+)
+
+
+V = TypeVar("V", bound=Union[Hashable])
+W = TypeVar("W", float, int)
+
+
+class GraphView(Generic[V, W]):
+    # read-only window over another graph (or view): nothing is copied, so a
+    # view costs O(1) to make and follows later changes of the graph below it
+    def __init__(self, graph: Any) -> None:
+        if graph is None:
+            raise Exception("Invalid input param")
+        self.__graph: Any = graph
+
+    @property
+    def graph(self) -> Any:
+        return self.__graph
+
+    @property
+    def version(self) -> int:
+        return self.__graph.version
+
+    def isDigraph(self) -> bool:
+        return self.__graph.isDigraph()
+
+    def __checkVertex(self, v: V) -> None:
+        if v is None:
+            raise Exception("input None vertex")
+        if not self.checkVertexExist(v):
+            raise Exception(f"input vertex not in graph ({v})")
+
+    def checkVertexExist(self, v: V) -> bool:
+        if v is None:
+            raise Exception("input None vertex")
+        return self.__graph.checkVertexExist(v)
+
+    def allVertexes(self) -> Generator[V, None, None]:
+        for v in self.__graph.allVertexes():
+            yield v
+
+    def vertexSet(self) -> List[V]:
+        return list(self.allVertexes())
+
+    def allInorderedVertexes(self) -> Generator[V, None, None]:
+        for v in sorted(self.allVertexes()):
+            yield v
+
+    def allSuccessors(self, v: V) -> Generator[Tuple[V, Optional[W]], None, None]:
+        self.__checkVertex(v)
+        for k, value in self.__graph.allSuccessors(v):
+            yield (k, value)
+
+    def allPredecessors(self, v: V) -> Generator[Tuple[V, Optional[W]], None, None]:
+        self.__checkVertex(v)
+        for k, value in self.__graph.allPredecessors(v):
+            yield (k, value)
+
+    def allInorderedSuccessors(
+        self, v: V
+    ) -> Generator[Tuple[V, Optional[W]], None, None]:
+        for k, value in sorted(self.allSuccessors(v), key=lambda item: item[0]):
+            yield (k, value)
+
+    def allInorderedPredecessors(
+        self, v: V
+    ) -> Generator[Tuple[V, Optional[W]], None, None]:
+        for k, value in sorted(self.allPredecessors(v), key=lambda item: item[0]):
+            yield (k, value)
+
+    def getPath(self, startNode: V, endNode: V) -> Optional[W]:
+        self.__checkVertex(startNode)
+        self.__checkVertex(endNode)
+        return self.__graph.getPath(startNode, endNode)
+
+    def inDegree(self, v: V) -> int:
+        return sum(1 for _ in self.allPredecessors(v))
+
+    def outDegree(self, v: V) -> int:
+        return sum(1 for _ in self.allSuccessors(v))
+
+    def zeroInDegreeVertexes(self) -> Generator[V, None, None]:
+        for v in self.allVertexes():
+            if self.inDegree(v) == 0:
+                yield v
+
+    def zeroOutDegreeVertexes(self) -> Generator[V, None, None]:
+        for v in self.allVertexes():
+            if self.outDegree(v) == 0:
+                yield v
+
+    def allEdges(self) -> Generator[Tuple[V, V, Optional[W]], None, None]:
+        for s in self.allVertexes():
+            for e, value in self.allSuccessors(s):
+                yield (s, e, value)
+
+    def numberOfEdges(self) -> int:
+        # an undirected edge shows up as two arcs, a self loop as one
+        arcs: int = 0
+        loops: int = 0
+        for s, e, _ in self.allEdges():
+            arcs += 1
+            loops += s == e
+        return arcs if self.isDigraph() else (arcs + loops) // 2
+
+    def freeze(self) -> FrozenGraph:
+        return FrozenGraph.fromGraph(self)
+
+    def addNewNode(self, node: Optional[V]) -> None:
+        raise Exception("graph view is read-only")
+
+    def addPath(self, startNode: V, endNode: V, value: W = None) -> None:
+        raise Exception("graph view is read-only")
+
+    def deletePath(self, startNode: V, endNode: V) -> None:
+        raise Exception("graph view is read-only")
+
+    def __str__(self) -> str:
+        result: str = "vertices: " + str(sorted(self.allVertexes())) + "\n"
+        result += "Adjacency: " + "\n"
+        for kstart in self.allInorderedVertexes():
+            result += "{:<10}".format(str(kstart)) + " -> "
+            result += str([k for k, _ in self.allInorderedSuccessors(kstart)]) + "\n"
+        return result
+
+
+class ReversedGraphView(GraphView[V, W]):
+    # every arc turned around; degrees stay O(1) lookups on the graph below
+    def allSuccessors(self, v: V) -> Generator[Tuple[V, Optional[W]], None, None]:
+        return super().allPredecessors(v)
+
+    def allPredecessors(self, v: V) -> Generator[Tuple[V, Optional[W]], None, None]:
+        return super().allSuccessors(v)
+
+    def getPath(self, startNode: V, endNode: V) -> Optional[W]:
+        return super().getPath(endNode, startNode)
+
+    def inDegree(self, v: V) -> int:
+        return self.graph.outDegree(v)
+
+    def outDegree(self, v: V) -> int:
+        return self.graph.inDegree(v)
+
+    def numberOfEdges(self) -> int:
+        return self.graph.numberOfEdges()
+
+
+class InducedSubgraphView(GraphView[V, W]):
+    # the given vertexes and every edge of the graph between two of them
+    def __init__(self, graph: Any, vertexes: Iterable[V]) -> None:
+        super().__init__(graph)
+        self.__vertexes: List[V] = list(dict.fromkeys(vertexes))
+        for v in self.__vertexes:
+            if v is None:
+                raise Exception("input None vertex")
+            if not graph.checkVertexExist(v):
+                raise Exception(f"input vertex not in graph ({v})")
+        self.__vertexSet: Set[V] = set(self.__vertexes)
+
+    def checkVertexExist(self, v: V) -> bool:
+        return super().checkVertexExist(v) and v in self.__vertexSet
+
+    def allVertexes(self) -> Generator[V, None, None]:
+        for v in self.__vertexes:
+            yield v
+
+    def allSuccessors(self, v: V) -> Generator[Tuple[V, Optional[W]], None, None]:
+        for k, value in super().allSuccessors(v):
+            if k in self.__vertexSet:
+                yield (k, value)
+
+    def allPredecessors(self, v: V) -> Generator[Tuple[V, Optional[W]], None, None]:
+        for k, value in super().allPredecessors(v):
+            if k in self.__vertexSet:
+                yield (k, value)
+
+
+class EdgeMaskedGraphView(GraphView[V, W]):
+    # the graph with some edges hidden, e.g. the arcs into intervened vertexes
+    def __init__(self, graph: Any, hiddenEdges: Iterable[Tuple[V, V]]) -> None:
+        super().__init__(graph)
+        self.__hidden: Set[Tuple[V, V]] = set()
+        for s, e in hiddenEdges:
+            for v in [s, e]:
+                if v is None:
+                    raise Exception("input None vertex")
+                if not graph.checkVertexExist(v):
+                    raise Exception(f"input vertex not in graph ({v})")
+            self.__hidden.add((s, e))
+            if not graph.isDigraph():
+                self.__hidden.add((e, s))
+
+    @classmethod
+    def intervened(cls, graph: Any, vertexes: Iterable[V]) -> "EdgeMaskedGraphView":
+        # the mutilated graph of do(vertexes): their incoming arcs are cut
+        return cls(
+            graph, [(p, v) for v in vertexes for p, _ in graph.allPredecessors(v)]
+        )
+
+    @property
+    def hiddenEdges(self) -> Set[Tuple[V, V]]:
+        return set(self.__hidden)
+
+    def allSuccessors(self, v: V) -> Generator[Tuple[V, Optional[W]], None, None]:
+        for k, value in super().allSuccessors(v):
+            if (v, k) not in self.__hidden:
+                yield (k, value)
+
+    def allPredecessors(self, v: V) -> Generator[Tuple[V, Optional[W]], None, None]:
+        for k, value in super().allPredecessors(v):
+            if (k, v) not in self.__hidden:
+                yield (k, value)
+
+    def getPath(self, startNode: V, endNode: V) -> Optional[W]:
+        value: Optional[W] = super().getPath(startNode, endNode)
+        return None if (startNode, endNode) in self.__hidden else value
@@ -1,13 +1,14 @@
 import graph
 import argparse
 import os
-from common import timeExecute
+from common import timeExecute, ResultCache, fileFingerprint
 from model import (
-    Node,
+    ModelTables,
     ModelParser,
     TestParser,
     TxtParser,
     BayesianNetwork,
+    buildNetwork,
 )
 from typing import (
     List,
@@ -17,44 +18,57 @@ from typing import (
 )
 
 class BayesianNetworkRunner:
-    def __init__(self, modelFile: str, testFile: str, algorithm: str, output: str) -> None:
+    def __init__(
+        self,
+        modelFile: str,
+        testFile: str,
+        algorithm: str,
+        output: str,
+        halfWidth: Optional[float] = None,
+        confidence: float = 0.95,
+        cacheFile: Optional[str] = None,
+        cacheSize: int = 10 ** 6,
+    ) -> None:
         err: Optional[str] = self.__checkArguments(modelFile, testFile, algorithm, output)
         if err is not None:
             print(err)
             exit()
+        self.__cache: Optional[ResultCache] = (
+            None if cacheFile is None else ResultCache(cacheFile, cacheSize)
+        )
+        self.__fingerprint: str = fileFingerprint(modelFile)
         self.__network: BayesianNetwork = self.__produceNetwork(modelFile, algorithm)
         self.__queries: List[Tuple[Dict[str, str], Dict[str, str]]] = self.__produceQuery(testFile)
         self.__output = TxtParser(output)
+        self.__halfWidth: Optional[float] = halfWidth
+        self.__confidence: float = confidence
 
     def __checkArguments(self, model: str, test: str, algorithm: str, output: str) -> Optional[str]:
         if not os.path.exists(model):
             return "[ERROR] The file {} does not exist.\n".format(model)
         if not os.path.exists(test):
             return "[ERROR] The file {} does not exist.\n".format(test)
-        if algorithm not in ["forward", "likelihood", "gibbs"]:
+        if algorithm not in ["forward", "likelihood", "gibbs", "exact", "junction"]:
             return "[ERROR] Invalid algorithm: {}\n".format(algorithm)
         if len(output) == 0:
             return "[ERROR] Invalid output path: {}".format(output)
         return None
 
-    def __produceNetwork(self, model: str, algorithm: str) -> BayesianNetwork:
+    def __parseModel(self, model: str) -> ModelTables:
+        key: str = "model|{}".format(self.__fingerprint)
+        if self.__cache is not None:
+            tables: Optional[ModelTables] = self.__cache.get(key)
+            if tables is not None:
+                return tables
         parser: ModelParser = ModelParser(model)
         parser.parse()
+        if self.__cache is not None:
+            self.__cache.put(key, parser.getModel())
+        return parser.getModel()
 
-        nodes: Dict[str, Node] = parser.getNodes()
-        network: BayesianNetwork = BayesianNetwork.factory(algorithm)
-        for name, node in nodes.items():
-            if not node.isCondition():
-                continue
-            node.setConditionalFeatures(
-                {
-                    nodes[condition].name: nodes[condition].features
-                    for condition in node.conditions
-                }
-            )
-            for condition in node.conditions:
-                network.addPath(nodes[condition], node)
-        return network
+    def __produceNetwork(self, model: str, algorithm: str) -> BayesianNetwork:
+        tables: ModelTables = self.__parseModel(model)
+        return buildNetwork(tables, BayesianNetwork.factory(algorithm))
 
     def __produceQuery(self, test) -> List[Tuple[Dict[str, str], Dict[str, str]]]:
         parser: TestParser = TestParser(test)
@@ -62,7 +76,22 @@ class BayesianNetworkRunner:
         return parser.getQueriesTable()
 
     def run(self):
-        result: List[float] = self.__network.batchQuery(self.__queries)
+        with self.__network:
+            if self.__halfWidth is not None:
+                result: List[float] = [
+                    r.estimate
+                    for r in self.__network.anytimeBatchQuery(
+                        self.__queries, self.__halfWidth, self.__confidence
+                    )
+                ]
+            elif self.__cache is not None:
+                result = self.__network.cachedBatchQuery(
+                    self.__queries, self.__cache, self.__fingerprint
+                )
+            else:
+                result = self.__network.batchQuery(self.__queries)
+        if self.__cache is not None:
+            self.__cache.close()
         self.__output.writeLines([s for s in map(str, result)])
 
 
@@ -75,12 +104,37 @@ def main() -> None:
         "-o", "--output", default="output.txt", help="path file to output"
     )
     parser.add_argument(
-        "-a", "--algorithm", default="forward", help="forward | likelihood | gibbs"
+        "-a", "--algorithm", default="forward", help="forward | likelihood | gibbs | exact | junction"
+    )
+    parser.add_argument(
+        "-w",
+        "--half-width",
+        type=float,
+        default=None,
+        help="sample until every confidence interval is this tight (forward | likelihood)",
+    )
+    parser.add_argument(
+        "-c", "--confidence", type=float, default=0.95, help="confidence level for -w"
+    )
+    parser.add_argument(
+        "-k", "--cache", default=None, help="path file to a persistent result cache"
+    )
+    parser.add_argument(
+        "--cache-size", type=int, default=10 ** 6, help="maximum entries kept in the cache"
     )
     args = parser.parse_args()
 
     try:
-        BayesianNetworkRunner(args.model, args.test, args.algorithm, args.output).run()
+        BayesianNetworkRunner(
+            args.model,
+            args.test,
+            args.algorithm,
+            args.output,
+            args.half_width,
+            args.confidence,
+            args.cache,
+            args.cache_size,
+        ).run()
     except Exception as e:
         print("Failed: {}".format(e))
     else:
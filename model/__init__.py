@@ -1,5 +1,17 @@
 from .generator import GenerateRandomProbability
 from .distribution import ConditionalProbability, DiscreteDistribution
 from .nodes import Node
-from .network import BayesianNetwork, ForwardBayesianNetwork
-from .parser import ModelParser, TestParser, TxtParser
+from .network import (
+    BayesianNetwork,
+    ForwardBayesianNetwork,
+    LikelihoodBayesianNetwork,
+    GibbsBayesianNetwork,
+    ExactBayesianNetwork,
+    JunctionTreeBayesianNetwork,
+)
+from .samples import SampleStore
+from .compiled import CompiledNetwork
+from .tables import ModelTables
+from .estimate import QueryEstimate
+from .streams import RandomStreams
+from .parser import ModelParser, TestParser, TxtParser, buildNetwork
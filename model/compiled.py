@@ -0,0 +1,299 @@
+import numpy as np
+from functools import reduce
+from types import MappingProxyType
+from .nodes import Node
+from .distribution import drawFromAlias, drawFromCdf
+from typing import (
+    Dict,
+    Iterable,
+    Optional,
+    List,
+    Set,
+    Mapping,
+    Tuple,
+    Union,
+)
+
+
+def readOnly(array: np.array) -> np.array:
+    if not array.flags.writeable:
+        return array
+    view: np.array = array.view()
+    view.setflags(write=False)
+    return view
+
+
+class CompiledNetwork:
+    # nodes are given in topological order and become the integer ids 0..n-1;
+    # tables are read-only views, so workers attached to a shared buffer keep
+    # sharing it
+    def __init__(self, nodes: List[Node], version: Optional[Tuple[int, ...]] = None) -> None:
+        if nodes is None or len(nodes) < 1:
+            raise Exception("cannot compile an empty network")
+        columnTable: Dict[str, int] = {
+            node.name: column for column, node in enumerate(nodes)
+        }
+        parents: List[np.array] = list()
+        for column, node in enumerate(nodes):
+            conditions: List[str] = node.conditions if node.isCondition() else []
+            for name in conditions:
+                if columnTable.get(name, column) >= column:
+                    raise Exception(
+                        "parent {} of node {} is not compiled before it".format(
+                            name, node.name
+                        )
+                    )
+            parents.append(np.array([columnTable[c] for c in conditions], dtype=np.intp))
+        arrays: List[List[np.array]] = [node.sharedArrays() for node in nodes]
+        self.__build(
+            [node.name for node in nodes],
+            [node.features for node in nodes],
+            parents,
+            [node.table.reshape(-1, len(node.features)) for node in nodes],
+            [a[2] for a in arrays],
+            [a[3] for a in arrays],
+            [a[4] for a in arrays],
+            version,
+        )
+
+    @classmethod
+    def fromTables(
+        cls,
+        names: List[str],
+        codebooks: List[List[str]],
+        parents: List[np.array],
+        tables: List[np.array],
+        cdfColumns: List[np.array],
+        aliasThresholds: List[np.array],
+        aliasIndices: List[np.array],
+        version: Optional[Tuple[int, ...]] = None,
+    ) -> "CompiledNetwork":
+        # columns given straight as arrays, e.g. views of the flat tables of a
+        # parsed model, in topological order with parents as column ids
+        if names is None or len(names) < 1:
+            raise Exception("cannot compile an empty network")
+        children: np.array = np.repeat(np.arange(len(parents)), [len(p) for p in parents])
+        late: np.array = np.flatnonzero(np.concatenate(parents) >= children)
+        if len(late) > 0:
+            raise Exception(
+                "a parent of node {} is not compiled before it".format(
+                    names[children[late[0]]]
+                )
+            )
+        compiled: CompiledNetwork = cls.__new__(cls)
+        compiled.__build(
+            names,
+            codebooks,
+            parents,
+            tables,
+            cdfColumns,
+            aliasThresholds,
+            aliasIndices,
+            version,
+        )
+        return compiled
+
+    def __build(
+        self,
+        names: List[str],
+        codebooks: List[List[str]],
+        parents: List[np.array],
+        tables: List[np.array],
+        cdfColumns: List[np.array],
+        aliasThresholds: List[np.array],
+        aliasIndices: List[np.array],
+        version: Optional[Tuple[int, ...]],
+    ) -> None:
+        self.__version: Optional[Tuple[int, ...]] = version
+        self.__names: Tuple[str, ...] = tuple(names)
+        self.__columnTable: Mapping[str, int] = MappingProxyType(
+            {name: column for column, name in enumerate(self.__names)}
+        )
+        if len(self.__columnTable) != len(self.__names):
+            raise Exception("duplicated node names in the network")
+        self.__codebooks: Tuple[Tuple[str, ...], ...] = tuple(
+            tuple(codebook) for codebook in codebooks
+        )
+        self.__featureTables: Tuple[Mapping[str, int], ...] = tuple(
+            MappingProxyType({feature: index for index, feature in enumerate(codebook)})
+            for codebook in self.__codebooks
+        )
+        self.__cardinalities: np.array = readOnly(
+            np.array([len(codebook) for codebook in self.__codebooks], dtype=np.intp)
+        )
+        self.__parents: Tuple[np.array, ...] = tuple(readOnly(p) for p in parents)
+        # a column's level is one past the deepest of its parents, so the
+        # columns of one level can be drawn as a single wave
+        depths: List[int] = list()
+        for column in range(len(self.__names)):
+            depths.append(max((depths[p] + 1 for p in parents[column].tolist()), default=0))
+        depthArray: np.array = np.array(depths, dtype=np.intp)
+        self.__levels: Tuple[np.array, ...] = tuple(
+            readOnly(level)
+            for level in np.split(
+                np.argsort(depthArray, kind="stable"),
+                np.cumsum(np.bincount(depthArray))[:-1],
+            )
+        )
+        cardinalities: List[int] = self.__cardinalities.tolist()
+        self.__rowShapes: Tuple[Tuple[int, ...], ...] = tuple(
+            tuple(cardinalities[p] for p in parents.tolist()) for parents in self.__parents
+        )
+
+        self.__tables: Tuple[np.array, ...] = tuple(readOnly(t) for t in tables)
+        self.__cdfColumns: Tuple[np.array, ...] = tuple(readOnly(a) for a in cdfColumns)
+        self.__aliasThresholds: Tuple[np.array, ...] = tuple(
+            readOnly(a) for a in aliasThresholds
+        )
+        self.__aliasIndices: Tuple[np.array, ...] = tuple(readOnly(a) for a in aliasIndices)
+        for column, table in enumerate(self.__tables):
+            rows: int = reduce(lambda x, y: x * y, self.__rowShapes[column], 1)
+            if table.shape != (rows, cardinalities[column]):
+                raise Exception(
+                    "table of node {} does not match its parents".format(
+                        self.__names[column]
+                    )
+                )
+
+    def __len__(self) -> int:
+        return len(self.__names)
+
+    @property
+    def version(self) -> Optional[Tuple[int, ...]]:
+        return self.__version
+
+    @property
+    def names(self) -> Tuple[str, ...]:
+        return self.__names
+
+    @property
+    def columnTable(self) -> Mapping[str, int]:
+        return self.__columnTable
+
+    @property
+    def codebooks(self) -> Tuple[Tuple[str, ...], ...]:
+        return self.__codebooks
+
+    @property
+    def cardinalities(self) -> np.array:
+        return self.__cardinalities
+
+    @property
+    def parents(self) -> Tuple[np.array, ...]:
+        return self.__parents
+
+    @property
+    def levels(self) -> Tuple[np.array, ...]:
+        return self.__levels
+
+    @property
+    def tables(self) -> Tuple[np.array, ...]:
+        return self.__tables
+
+    @property
+    def cdfColumns(self) -> Tuple[np.array, ...]:
+        return self.__cdfColumns
+
+    def position(self, name: str) -> int:
+        if name not in self.__columnTable:
+            raise Exception("Failed to get node {} in the network".format(name))
+        return self.__columnTable[name]
+
+    def encode(self, column: int, feature: str) -> int:
+        table: Mapping[str, int] = self.__featureTables[column]
+        if feature not in table:
+            raise Exception(
+                "feature {} not found in node {}".format(feature, self.__names[column])
+            )
+        return table[feature]
+
+    def encodeState(self, state: Optional[Dict[str, str]]) -> Dict[int, int]:
+        if state is None:
+            return dict()
+        encoded: Dict[int, int] = dict()
+        for name, feature in state.items():
+            column: int = self.position(name)
+            encoded[column] = self.encode(column, feature)
+        return encoded
+
+    def cpt(self, column: int) -> np.array:
+        # the table shaped [parent states..., own state]
+        return self.__tables[column].reshape(
+            self.__rowShapes[column] + (int(self.__cardinalities[column]),)
+        )
+
+    def rowIndices(self, column: int, parentValues: List[np.array]) -> Union[int, np.array]:
+        if len(parentValues) != len(self.__parents[column]):
+            raise Exception(
+                "parent columns do not match the conditions of node {}".format(
+                    self.__names[column]
+                )
+            )
+        if len(parentValues) == 0:
+            return 0
+        return np.ravel_multi_index(tuple(parentValues), self.__rowShapes[column])
+
+    def drawColumn(
+        self, column: int, parentValues: List[np.array], rnd: np.array
+    ) -> np.array:
+        rows: Union[int, np.array] = self.rowIndices(column, parentValues)
+        if len(self.__aliasThresholds[column]) > 0:
+            return drawFromAlias(
+                self.__aliasThresholds[column], self.__aliasIndices[column], rows, rnd
+            )
+        return drawFromCdf(self.__cdfColumns[column], rows, rnd)
+
+    def probabilityBlock(
+        self, column: int, parentValues: List[np.array], featureIndex: int
+    ) -> Union[float, np.array]:
+        # a root node gives one probability shared by every sample
+        return self.__tables[column][self.rowIndices(column, parentValues), featureIndex]
+
+    def ancestors(self, columns: Iterable[int]) -> Set[int]:
+        result: Set[int] = set(columns)
+        stack: List[int] = list(result)
+        while stack:
+            for parent in self.__parents[stack.pop()].tolist():
+                if parent not in result:
+                    result.add(parent)
+                    stack.append(parent)
+        return result
+
+    def relevance(
+        self, queryColumns: Iterable[int], evidenceColumns: Iterable[int]
+    ) -> Tuple[List[int], List[int]]:
+        # nodes outside the ancestral set of query and evidence are barren; in
+        # its moral graph, nodes not connected to the query once the evidence
+        # is removed are d-separated from it. Returns the free columns left to
+        # sample and the evidence columns whose CPT still weighs the query,
+        # both in topological order
+        evidence: Set[int] = set(evidenceColumns)
+        query: Set[int] = set(queryColumns) - evidence
+        ancestral: Set[int] = self.ancestors(query | evidence)
+        moral: Dict[int, Set[int]] = {column: set() for column in ancestral}
+        for column in ancestral:
+            parents: List[int] = self.__parents[column].tolist()
+            for i, parent in enumerate(parents):
+                moral[column].add(parent)
+                moral[parent].add(column)
+                for other in parents[i + 1 :]:
+                    moral[parent].add(other)
+                    moral[other].add(parent)
+        connected: Set[int] = set(query)
+        stack: List[int] = list(query)
+        while stack:
+            for neighbour in moral[stack.pop()]:
+                if neighbour not in connected and neighbour not in evidence:
+                    connected.add(neighbour)
+                    stack.append(neighbour)
+        weighted: List[int] = [
+            column
+            for column in sorted(evidence)
+            if any(parent in connected for parent in self.__parents[column].tolist())
+        ]
+        return sorted(connected), weighted
+
+    def __str__(self) -> str:
+        return "CompiledNetwork(nodes: {}, version: {})".format(
+            len(self.__names), self.__version
+        )
@@ -1,7 +1,8 @@
 import numpy as np
 from functools import reduce, lru_cache
-from common import cacheDict
 from .generator import generateOneSample
+from .samples import smallestDtype
+from common import LRUCache
 from typing import (
     Dict,
     Optional,
@@ -17,6 +18,57 @@ from typing import (
 )
 
 
+# nodes with at least this many states draw through alias tables, smaller
+# ones compare against their cdf columns which is cheaper for a few states
+ALIAS_MIN_CARDINALITY = 8
+DISTRIBUTION_CACHE_SIZE = 1024
+
+
+def unnormalizedRows(rowSums: np.array) -> np.array:
+    # rows whose probabilities do not sum to one, up to float rounding
+    return np.flatnonzero(~np.isclose(rowSums, 1.0))
+
+
+def buildAliasTable(probs: np.array) -> Tuple[np.array, np.array]:
+    # Vose's alias method for one distribution
+    k: int = len(probs)
+    threshold: np.array = np.ones(k)
+    alias: np.array = np.arange(k)
+    scaled: List[float] = [p * k for p in probs]
+    small: List[int] = [i for i, p in enumerate(scaled) if p < 1.0]
+    large: List[int] = [i for i, p in enumerate(scaled) if p >= 1.0]
+    while small and large:
+        s: int = small.pop()
+        l: int = large.pop()
+        threshold[s] = scaled[s]
+        alias[s] = l
+        scaled[l] = scaled[l] + scaled[s] - 1.0
+        (small if scaled[l] < 1.0 else large).append(l)
+    return threshold, alias
+
+
+def drawFromAlias(
+    thresholds: np.array, aliasIndices: np.array, rows: Union[int, np.array], rnd: np.array
+) -> np.array:
+    # the integer part of rnd * k picks a column, the fraction flips its coin
+    k: int = thresholds.shape[-1]
+    scaled: np.array = rnd * k
+    columns: np.array = np.minimum(scaled.astype(np.intp), k - 1)
+    cells: np.array = rows * k + columns
+    iSamples: np.array = aliasIndices.ravel()[cells]
+    keep: np.array = scaled - columns < thresholds.ravel()[cells]
+    iSamples[keep] = columns[keep]
+    return iSamples
+
+
+def drawFromCdf(cdfColumns: np.array, rows: Union[int, np.array], rnd: np.array) -> np.array:
+    # same rule as generateOneSample: first state whose cdf >= rnd
+    iSamples: np.array = np.zeros(len(rnd), dtype=smallestDtype(len(cdfColumns)))
+    for column in cdfColumns[:-1]:
+        iSamples += rnd > column[rows]
+    return iSamples
+
+
 def totuple(a):
     try:
         return tuple(totuple(i) for i in a)
@@ -33,22 +85,94 @@ class Probability:
         features: List[str],
         conditions: Optional[List[str]],
     ):
+        values: np.array = self.__checkTable(table, shape)
+        cdfTable: np.array = np.cumsum(values, axis=len(values.shape) - 1)
+        rows: np.array = values.reshape(-1, shape[-1])
+        aliasRows: int = len(rows) if shape[-1] >= ALIAS_MIN_CARDINALITY else 0
+        self._bindArrays(
+            name,
+            features,
+            [
+                values,
+                cdfTable,
+                np.ascontiguousarray(cdfTable.reshape(-1, shape[-1]).T),
+                np.ones((aliasRows, shape[-1])),
+                np.zeros((aliasRows, shape[-1]), dtype=smallestDtype(shape[-1])),
+            ],
+        )
+        self.__buildAliasTables()
+
+    @classmethod
+    def fromSharedArrays(
+        cls,
+        name: str,
+        features: List[str],
+        conditions: Optional[List[str]],
+        arrays: List[np.array],
+    ) -> "Probability":
+        # wraps tables another process already checked and built (the arrays
+        # of sharedArrays), nothing is validated or recomputed
+        prob: Probability = cls.__new__(cls)
+        prob._bindArrays(name, features, arrays)
+        prob._bindConditions(conditions)
+        return prob
+
+    def _bindArrays(self, name: str, features: List[str], arrays: List[np.array]) -> None:
         self._name: str = name
         self._features: Dict[str, int] = {
             val: index for index, val in enumerate(features)
         }
         self._featuresArray: List[str] = features
+        self._distributionCache: LRUCache = LRUCache(DISTRIBUTION_CACHE_SIZE)
+        self._version: int = 0
+        (
+            self._table,
+            self._cdfTable,
+            self._cdfColumns,
+            self._aliasThresholds,
+            self._aliasIndices,
+        ) = arrays
+
+    def _bindConditions(self, conditions: Optional[List[str]]) -> None:
+        pass
+
+    def __checkTable(self, table: List[float], shape: Tuple[int]) -> np.array:
         if len(table) != reduce((lambda x, y: x * y), shape):
             raise Exception(
                 "Don't match between length of table and shape, length: {}, shape: {}".format(
                     len(table), shape
                 )
             )
-        self._table: np.array = np.array(table).reshape(shape)
-        self._cdfTable = np.cumsum(self._table, axis=len(self._table.shape) - 1)
-        sumProb: np.array = np.sum(self._table, axis=len(self._table.shape) - 1)
-        if sumProb.mean() != 1.0:
+        result: np.array = np.array(table, dtype=np.float64).reshape(shape)
+        sumProb: np.array = np.sum(result, axis=len(result.shape) - 1)
+        if len(unnormalizedRows(sumProb.ravel())) > 0:
             raise Exception("Incorrect probability")
+        return result
+
+    def __buildAliasTables(self) -> None:
+        rows: np.array = self._table.reshape(-1, self._table.shape[-1])
+        for row in range(len(self._aliasThresholds)):
+            self._aliasThresholds[row], self._aliasIndices[row] = buildAliasTable(
+                rows[row]
+            )
+
+    def setTable(self, table: List[float]) -> None:
+        # values are rewritten in place so every view of the tables stays valid
+        values: np.array = self.__checkTable(table, self._table.shape)
+        self._table[...] = values
+        self._cdfTable[...] = np.cumsum(values, axis=len(values.shape) - 1)
+        self._cdfColumns[...] = self._cdfTable.reshape(-1, values.shape[-1]).T
+        self.__buildAliasTables()
+        self._distributionCache.clear()
+        self._version += 1
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    @property
+    def distributionCache(self) -> LRUCache:
+        return self._distributionCache
 
     @property
     def features(self) -> List[str]:
@@ -58,6 +182,10 @@ class Probability:
     def name(self) -> str:
         return self._name
 
+    @property
+    def table(self) -> np.array:
+        return self._table
+
     @name.setter
     def name(self, name: str) -> None:
         self._name = name
@@ -73,7 +201,6 @@ class Probability:
     def conditions(self, condFeatures: Dict[str, List[str]]) -> None:
         raise NotImplementedError
 
-    @cacheDict
     def _produceDistributionOutput(self, arr: np.array) -> Dict[str, float]:
         if len(arr) != len(self.features):
             raise Exception(
@@ -86,6 +213,62 @@ class Probability:
             result[feature] = prob
         return result
 
+    @property
+    def usesAlias(self) -> bool:
+        return len(self._aliasThresholds) > 0
+
+    def sharedArrays(self) -> List[np.array]:
+        return [
+            self._table,
+            self._cdfTable,
+            self._cdfColumns,
+            self._aliasThresholds,
+            self._aliasIndices,
+        ]
+
+    def attachSharedArrays(self, arrays: List[np.array]) -> None:
+        # rebind the tables to views of a shared buffer holding the same values
+        if [(a.shape, a.dtype) for a in arrays] != [
+            (a.shape, a.dtype) for a in self.sharedArrays()
+        ]:
+            raise Exception("shared arrays do not match the tables of {}".format(self._name))
+        (
+            self._table,
+            self._cdfTable,
+            self._cdfColumns,
+            self._aliasThresholds,
+            self._aliasIndices,
+        ) = arrays
+
+    def featureIndex(self, feature: str) -> int:
+        if feature not in self._features:
+            raise Exception(
+                "feature {} not found in node {}".format(feature, self._name)
+            )
+        return self._features[feature]
+
+    def generateSampleBlock(
+        self, parentColumns: Optional[List[np.array]], rnd: np.array
+    ) -> np.array:
+        raise NotImplementedError
+
+    def getProbabilityBlock(
+        self, parentColumns: Optional[List[np.array]], featureIndex: int
+    ) -> np.array:
+        raise NotImplementedError
+
+    def drawBlock(self, rows: Union[int, np.array], rnd: np.array) -> np.array:
+        # rows are flat parent configurations, rnd one uniform draw per sample
+        if self.usesAlias:
+            return self._drawFromAlias(rows, rnd)
+        return self._drawFromCdf(rows, rnd)
+
+    def _drawFromAlias(self, rows: Union[int, np.array], rnd: np.array) -> np.array:
+        return drawFromAlias(self._aliasThresholds, self._aliasIndices, rows, rnd)
+
+    def _drawFromCdf(self, rows: Union[int, np.array], rnd: np.array) -> np.array:
+        return drawFromCdf(self._cdfColumns, rows, rnd)
+
     def __str__(self) -> str:
         # TODO
         return "{}".format(self._table)
@@ -101,10 +284,24 @@ class ConditionalProbability(Probability):
         conditions: List[str],
     ):
         super().__init__(name, table, shape, features, conditions)
+        self._bindConditions(conditions)
+
+    def _bindConditions(self, conditions: Optional[List[str]]) -> None:
+        shape: Tuple[int, ...] = self._table.shape
+        if len(shape) != len(conditions) + 1:
+            raise Exception(
+                "shape {} does not match {} conditions".format(shape, len(conditions))
+            )
         self.__conditions: Dict[str, int] = {
             val: index for index, val in enumerate(conditions)
         }
         self.__conditionalFeatures: Dict[str, Dict[str, int]] = dict()
+        # mixed-radix strides of the parent axes: a parent configuration maps
+        # to row sum(index * stride) of the table flattened to (rows, states)
+        self._rowStrides: List[int] = [
+            reduce(lambda x, y: x * y, shape[i + 1 : -1], 1)
+            for i in range(len(conditions))
+        ]
 
     @property
     def conditions(self) -> List[str]:
@@ -125,49 +322,66 @@ class ConditionalProbability(Probability):
         # TODO
         pass
 
-    # @timeExecute
-    def getDistribution(self, mNodes: Optional[Dict[str, str]]) -> Dict[str, float]:
+    def rowOffset(self, mNodes: Optional[Dict[str, str]]) -> int:
+        # only the parents are looked up, whatever else the state holds
         if mNodes is None:
             raise Exception("input None node")
-        index: List[int] = []
-        for node, feature in mNodes.items():
-            if node not in self.__conditionalFeatures:
-                continue
-            index.append(self.__conditionalFeatures[node][feature])
+        offset: int = 0
+        for condition, stride in zip(self.__conditions, self._rowStrides):
+            if condition not in self.__conditionalFeatures:
+                raise Exception(
+                    "features of condition {} are not set in node {}".format(
+                        condition, self._name
+                    )
+                )
+            if condition not in mNodes:
+                raise Exception(
+                    "condition {} of node {} not found in state".format(
+                        condition, self._name
+                    )
+                )
+            offset += self.__conditionalFeatures[condition][mNodes[condition]] * stride
+        return offset
 
-        out: np.array = self._cdfTable
-        for i in index:
-            out = out[i]
-        return self._produceDistributionOutput(out)
+    def rowIndices(self, parentColumns: Optional[List[np.array]]) -> np.array:
+        if parentColumns is None or len(parentColumns) != len(self.__conditions):
+            raise Exception("parent columns do not match the conditions")
+        return np.ravel_multi_index(tuple(parentColumns), self._table.shape[:-1])
 
-    def getProbability(self, mNodes: Optional[Dict[str, str]], featureName: str) -> float:
-        if mNodes is None:
-            raise Exception("input None node")
-        index: List[int] = []
-        for node, feature in mNodes.items():
-            if node not in self.__conditionalFeatures:
-                continue
-            index.append(self.__conditionalFeatures[node][feature])
+    # @timeExecute
+    def getDistribution(self, mNodes: Optional[Dict[str, str]]) -> Dict[str, float]:
+        row: int = self.rowOffset(mNodes)
+        return self._distributionCache.getOrCompute(
+            row,
+            lambda: self._produceDistributionOutput(
+                self._table.reshape(-1, self._table.shape[-1])[row]
+            ),
+        )
 
-        out: np.array = self._cdfTable
-        for i in index:
-            out = out[i]
-        return out[self._features[featureName]]
+    def getProbability(self, mNodes: Optional[Dict[str, str]], featureName: str) -> float:
+        return self._table.reshape(-1, self._table.shape[-1])[
+            self.rowOffset(mNodes), self._features[featureName]
+        ]
 
     def generateSample(self, mNodes: Optional[Dict[str, str]]) -> Dict[str, float]:
-        if mNodes is None:
-            raise Exception("input None node")
-        index: List[int] = []
-        for node, feature in mNodes.items():
-            if node not in self.__conditionalFeatures:
-                continue
-            index.append(self.__conditionalFeatures[node][feature])
-        out: np.array = self._cdfTable
-        for i in index:
-            out = out[i]
-        iSample = generateOneSample(out)
+        cdf: np.array = self._cdfTable.reshape(-1, self._table.shape[-1])[
+            self.rowOffset(mNodes)
+        ]
+        iSample = generateOneSample(cdf)
         return self._featuresArray[iSample]
 
+    def generateSampleBlock(
+        self, parentColumns: Optional[List[np.array]], rnd: np.array
+    ) -> np.array:
+        return self.drawBlock(self.rowIndices(parentColumns), rnd)
+
+    def getProbabilityBlock(
+        self, parentColumns: Optional[List[np.array]], featureIndex: int
+    ) -> np.array:
+        return self._table.reshape(-1, self._table.shape[-1])[
+            self.rowIndices(parentColumns), featureIndex
+        ]
+
 
 class DiscreteDistribution(Probability):
     def __init__(
@@ -178,14 +392,9 @@ class DiscreteDistribution(Probability):
     def getDistribution(
         self, mNodes: Optional[Dict[str, str]] = None
     ) -> Dict[str, float]:
-        probs: np.array = self._table[0]
-        if len(probs) != len(self._featuresArray):
-            raise Exception(
-                "number of probs ({}) != number of features ({})".format(
-                    len(probs), len(self._featuresArray)
-                )
-            )
-        return self._produceDistributionOutput(probs)
+        return self._distributionCache.getOrCompute(
+            0, lambda: self._produceDistributionOutput(self._table[0])
+        )
 
     def getProbability(self, mNodes: Optional[Dict[str, str]], feature: str) -> float:
         probs: np.array = self._table[0]
@@ -200,3 +409,13 @@ class DiscreteDistribution(Probability):
     def generateSample(self, mNodes: Optional[Dict[str, str]]) -> Dict[str, float]:
         iSample = generateOneSample(self._cdfTable[0])
         return self._featuresArray[iSample]
+
+    def generateSampleBlock(
+        self, parentColumns: Optional[List[np.array]], rnd: np.array
+    ) -> np.array:
+        return self.drawBlock(0, rnd)
+
+    def getProbabilityBlock(
+        self, parentColumns: Optional[List[np.array]], featureIndex: int
+    ) -> np.array:
+        return self._table[0, featureIndex]
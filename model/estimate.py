@@ -0,0 +1,54 @@
+import math
+from typing import Tuple
+
+
+def normalQuantile(p: float) -> float:
+    if not 0.0 < p < 1.0:
+        raise Exception("invalid probability: {}".format(p))
+    low, high = -40.0, 40.0
+    for _ in range(100):
+        mid: float = (low + high) / 2
+        if 0.5 * (1.0 + math.erf(mid / math.sqrt(2.0))) < p:
+            low = mid
+        else:
+            high = mid
+    return (low + high) / 2
+
+
+class QueryEstimate:
+    def __init__(
+        self, estimate: float, halfWidth: float, samples: int, converged: bool
+    ) -> None:
+        self.__estimate: float = estimate
+        self.__halfWidth: float = halfWidth
+        self.__samples: int = samples
+        self.__converged: bool = converged
+
+    @property
+    def estimate(self) -> float:
+        return self.__estimate
+
+    @property
+    def halfWidth(self) -> float:
+        return self.__halfWidth
+
+    @property
+    def interval(self) -> Tuple[float, float]:
+        return (
+            max(0.0, self.__estimate - self.__halfWidth),
+            min(1.0, self.__estimate + self.__halfWidth),
+        )
+
+    @property
+    def samples(self) -> int:
+        return self.__samples
+
+    @property
+    def converged(self) -> bool:
+        return self.__converged
+
+    def __str__(self) -> str:
+        lower, upper = self.interval
+        return "QueryEstimate(estimate: {}, interval: [{}, {}], samples: {}, converged: {})".format(
+            self.__estimate, lower, upper, self.__samples, self.__converged
+        )
@@ -0,0 +1,141 @@
+import numpy as np
+from functools import reduce
+from typing import (
+    Dict,
+    Optional,
+    List,
+    Set,
+    Tuple,
+)
+
+
+class Factor:
+    def __init__(self, variables: List[int], values: np.array) -> None:
+        if len(variables) != values.ndim:
+            raise Exception(
+                "number of variables ({}) != number of axes ({})".format(
+                    len(variables), values.ndim
+                )
+            )
+        if len(set(variables)) != len(variables):
+            raise Exception("duplicate variables in factor: {}".format(variables))
+        self.__variables: Tuple[int, ...] = tuple(variables)
+        self.__values: np.array = values
+
+    @property
+    def variables(self) -> Tuple[int, ...]:
+        return self.__variables
+
+    @property
+    def values(self) -> np.array:
+        return self.__values
+
+    def cardinality(self, variable: int) -> int:
+        return self.__values.shape[self.__variables.index(variable)]
+
+    def reduce(self, evidence: Dict[int, int]) -> "Factor":
+        index: List = []
+        variables: List[int] = []
+        for variable in self.__variables:
+            if variable in evidence:
+                index.append(evidence[variable])
+            else:
+                index.append(slice(None))
+                variables.append(variable)
+        if len(variables) == len(self.__variables):
+            return self
+        return Factor(variables, self.__values[tuple(index)])
+
+    def marginalize(self, variables: Set[int]) -> "Factor":
+        axes: Tuple[int, ...] = tuple(
+            i for i, v in enumerate(self.__variables) if v in variables
+        )
+        if not axes:
+            return self
+        return Factor(
+            [v for v in self.__variables if v not in variables],
+            self.__values.sum(axis=axes),
+        )
+
+    def transpose(self, variables: List[int]) -> "Factor":
+        if tuple(variables) == self.__variables:
+            return self
+        return Factor(
+            variables,
+            np.transpose(self.__values, [self.__variables.index(v) for v in variables]),
+        )
+
+    def normalize(self) -> "Factor":
+        total: float = self.__values.sum()
+        if total == 0.0:
+            return self
+        return Factor(list(self.__variables), self.__values / total)
+
+    def __str__(self) -> str:
+        return "Factor(variables: {}, shape: {})".format(
+            self.__variables, self.__values.shape
+        )
+
+
+def contract(factors: List[Factor], keep: List[int]) -> Factor:
+    # multiply factors and sum out everything not in keep with a single einsum;
+    # variables are relabelled locally because einsum only accepts 52 labels
+    labels: Dict[int, int] = dict()
+    operands: List = []
+    for factor in factors:
+        operands.append(factor.values)
+        operands.append([labels.setdefault(v, len(labels)) for v in factor.variables])
+    for v in keep:
+        if v not in labels:
+            raise Exception("variable {} not found in factors".format(v))
+    operands.append([labels[v] for v in keep])
+    return Factor(keep, np.einsum(*operands))
+
+
+def eliminationOrder(factors: List[Factor], keep: Set[int]) -> List[int]:
+    # greedy min-weight ordering on the interaction graph
+    neighbors: Dict[int, Set[int]] = dict()
+    cardinalities: Dict[int, int] = dict()
+    for factor in factors:
+        for v in factor.variables:
+            neighbors.setdefault(v, set()).update(factor.variables)
+            cardinalities[v] = factor.cardinality(v)
+    for v in neighbors:
+        neighbors[v].discard(v)
+
+    order: List[int] = []
+    remaining: Set[int] = set(neighbors) - keep
+    while remaining:
+        best: int = min(
+            remaining,
+            key=lambda v: (
+                reduce(lambda x, y: x * y, [cardinalities[n] for n in neighbors[v]], 1),
+                v,
+            ),
+        )
+        for n in neighbors[best]:
+            neighbors[n].update(neighbors[best])
+            neighbors[n].discard(n)
+            neighbors[n].discard(best)
+        del neighbors[best]
+        remaining.remove(best)
+        order.append(best)
+    return order
+
+
+def eliminate(
+    factors: List[Factor], keep: List[int], order: Optional[List[int]] = None
+) -> Factor:
+    if order is None:
+        order = eliminationOrder(factors, set(keep))
+    pool: List[Factor] = list(factors)
+    for variable in order:
+        related: List[Factor] = [f for f in pool if variable in f.variables]
+        if not related:
+            continue
+        pool = [f for f in pool if variable not in f.variables]
+        scope: List[int] = sorted(
+            {v for f in related for v in f.variables if v != variable}
+        )
+        pool.append(contract(related, scope))
+    return contract(pool, list(keep)) if pool else Factor([], np.array(1.0))
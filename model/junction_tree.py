@@ -0,0 +1,249 @@
+import numpy as np
+from functools import reduce
+from .factor import Factor, contract, eliminate
+from typing import (
+    Dict,
+    Optional,
+    FrozenSet,
+    List,
+    Set,
+    Tuple,
+)
+
+Edge = Tuple[int, int]
+
+
+def triangulate(factors: List[Factor], cardinalities: Dict[int, int]) -> List[FrozenSet[int]]:
+    # min-fill elimination on the moral graph, keeping only maximal cliques
+    neighbors: Dict[int, Set[int]] = {v: set() for v in cardinalities}
+    for factor in factors:
+        for v in factor.variables:
+            neighbors[v].update(factor.variables)
+    for v in neighbors:
+        neighbors[v].discard(v)
+
+    def fillIn(v: int) -> int:
+        adj: List[int] = list(neighbors[v])
+        return sum(
+            1
+            for i in range(len(adj))
+            for j in range(i + 1, len(adj))
+            if adj[j] not in neighbors[adj[i]]
+        )
+
+    cliques: List[FrozenSet[int]] = []
+    remaining: Set[int] = set(neighbors)
+    while remaining:
+        best: int = min(
+            remaining,
+            key=lambda v: (
+                fillIn(v),
+                reduce(lambda x, y: x * y, [cardinalities[n] for n in neighbors[v]], 1),
+                v,
+            ),
+        )
+        clique: FrozenSet[int] = frozenset(neighbors[best] | {best})
+        if not any(clique <= c for c in cliques):
+            cliques.append(clique)
+        for n in neighbors[best]:
+            neighbors[n].update(neighbors[best])
+            neighbors[n].discard(n)
+            neighbors[n].discard(best)
+        del neighbors[best]
+        remaining.remove(best)
+    return cliques
+
+
+class JunctionTree:
+    def __init__(self, factors: List[Factor], cardinalities: Dict[int, int]) -> None:
+        self.__cardinalities: Dict[int, int] = dict(cardinalities)
+        self.__cliques: List[FrozenSet[int]] = triangulate(factors, cardinalities)
+        self.__factors: List[Factor] = list(factors)
+        self.__neighbors: List[List[int]] = [[] for _ in self.__cliques]
+        self.__buildTree()
+
+        self.__assigned: List[List[Factor]] = [[] for _ in self.__cliques]
+        self.__home: Dict[int, int] = dict()
+        for factor in factors:
+            home: int = self.__smallestClique(set(factor.variables))
+            self.__assigned[home].append(factor)
+        for v in cardinalities:
+            self.__home[v] = self.__smallestClique({v})
+        # cliques whose assigned factors miss some of their variables get a
+        # unit factor so every message and belief keeps the full clique scope
+        for i, clique in enumerate(self.__cliques):
+            covered: Set[int] = {v for f in self.__assigned[i] for v in f.variables}
+            missing: List[int] = sorted(clique - covered)
+            if missing:
+                self.__assigned[i].append(
+                    Factor(missing, np.ones([cardinalities[v] for v in missing]))
+                )
+
+        self.__schedule: List[Edge] = self.__buildSchedule()
+        self.__evidence: Dict[int, int] = dict()
+        self.__messages: Dict[Edge, Factor] = dict()
+        self.__beliefs: Dict[int, Factor] = dict()
+        self.__propagated: int = 0
+
+    @property
+    def cliques(self) -> List[FrozenSet[int]]:
+        return list(self.__cliques)
+
+    @property
+    def evidence(self) -> Dict[int, int]:
+        return dict(self.__evidence)
+
+    @property
+    def propagatedMessages(self) -> int:
+        return self.__propagated
+
+    def treeEdges(self) -> List[Edge]:
+        return [(i, j) for i in range(len(self.__cliques)) for j in self.__neighbors[i] if i < j]
+
+    def __buildTree(self) -> None:
+        # Kruskal maximum spanning tree on separator sizes
+        candidates: List[Tuple[int, int, int]] = [
+            (len(self.__cliques[i] & self.__cliques[j]), i, j)
+            for i in range(len(self.__cliques))
+            for j in range(i + 1, len(self.__cliques))
+        ]
+        candidates.sort(key=lambda c: (-c[0], c[1], c[2]))
+        parent: List[int] = list(range(len(self.__cliques)))
+
+        def find(x: int) -> int:
+            while parent[x] != x:
+                parent[x] = parent[parent[x]]
+                x = parent[x]
+            return x
+
+        for _, i, j in candidates:
+            ri, rj = find(i), find(j)
+            if ri == rj:
+                continue
+            parent[ri] = rj
+            self.__neighbors[i].append(j)
+            self.__neighbors[j].append(i)
+
+    def __smallestClique(self, variables: Set[int]) -> int:
+        best: Optional[int] = None
+        for i, clique in enumerate(self.__cliques):
+            if variables <= clique and (
+                best is None or len(clique) < len(self.__cliques[best])
+            ):
+                best = i
+        if best is None:
+            raise Exception("no clique covers variables {}".format(variables))
+        return best
+
+    def __buildSchedule(self) -> List[Edge]:
+        # collect (leaves to root) followed by distribute (root to leaves),
+        # one root per connected component of the forest
+        upward: List[Edge] = []
+        downward: List[Edge] = []
+        visited: Set[int] = set()
+        for root in range(len(self.__cliques)):
+            if root in visited:
+                continue
+            visited.add(root)
+            order: List[Tuple[int, int]] = []
+            stack: List[Tuple[int, int]] = [(root, -1)]
+            while stack:
+                node, parent = stack.pop()
+                order.append((node, parent))
+                for n in self.__neighbors[node]:
+                    if n != parent:
+                        visited.add(n)
+                        stack.append((n, node))
+            upward.extend((node, parent) for node, parent in reversed(order) if parent >= 0)
+            downward.extend((parent, node) for node, parent in order if parent >= 0)
+        return upward + downward
+
+    def __potential(self, clique: int) -> List[Factor]:
+        factors: List[Factor] = list(self.__assigned[clique])
+        for v, value in self.__evidence.items():
+            if self.__home[v] == clique:
+                indicator: np.array = np.zeros(self.__cardinalities[v])
+                indicator[value] = 1.0
+                factors.append(Factor([v], indicator))
+        return factors
+
+    def __invalidate(self, changed: Set[int]) -> None:
+        # a message i -> j depends on every clique on i's side of the edge,
+        # so only messages pointing away from a changed clique go stale
+        for start in changed:
+            stack: List[Tuple[int, int]] = [(start, -1)]
+            while stack:
+                node, parent = stack.pop()
+                for n in self.__neighbors[node]:
+                    if n == parent:
+                        continue
+                    if self.__messages.pop((node, n), None) is None:
+                        continue
+                    stack.append((n, node))
+        self.__beliefs = dict()
+
+    def setEvidence(self, evidence: Optional[Dict[int, int]]) -> None:
+        evidence = dict(evidence or {})
+        changed: Set[int] = {
+            self.__home[v]
+            for v in set(evidence) | set(self.__evidence)
+            if evidence.get(v) != self.__evidence.get(v)
+        }
+        self.__evidence = evidence
+        if changed:
+            self.__invalidate(changed)
+
+    def __passMessage(self, i: int, j: int) -> None:
+        if (i, j) in self.__messages:
+            return
+        separator: List[int] = sorted(self.__cliques[i] & self.__cliques[j])
+        incoming: List[Factor] = [
+            self.__messages[(k, i)] for k in self.__neighbors[i] if k != j
+        ]
+        message: Factor = contract(self.__potential(i) + incoming, separator)
+        # rescale to keep long chains of messages away from underflow
+        total: float = message.values.sum()
+        self.__messages[(i, j)] = message if total == 0.0 else message.normalize()
+        self.__propagated += 1
+
+    def calibrate(self) -> None:
+        for i, j in self.__schedule:
+            self.__passMessage(i, j)
+
+    def __collect(self, root: int) -> None:
+        # pass only the messages flowing towards root, leaves first
+        order: List[Edge] = []
+        stack: List[Tuple[int, int]] = [(root, -1)]
+        while stack:
+            node, parent = stack.pop()
+            if parent >= 0:
+                order.append((node, parent))
+            for n in self.__neighbors[node]:
+                if n != parent:
+                    stack.append((n, node))
+        for i, j in reversed(order):
+            self.__passMessage(i, j)
+
+    def belief(self, clique: int) -> Factor:
+        if clique not in self.__beliefs:
+            self.__collect(clique)
+            incoming: List[Factor] = [
+                self.__messages[(k, clique)] for k in self.__neighbors[clique]
+            ]
+            self.__beliefs[clique] = contract(
+                self.__potential(clique) + incoming, sorted(self.__cliques[clique])
+            )
+        return self.__beliefs[clique]
+
+    def marginal(self, variables: List[int]) -> Factor:
+        needed: Set[int] = set(variables)
+        covering: List[int] = [
+            i for i, clique in enumerate(self.__cliques) if needed <= clique
+        ]
+        if covering:
+            clique: int = min(covering, key=lambda i: len(self.__cliques[i]))
+            return contract([self.belief(clique)], list(variables)).normalize()
+        # out-of-clique query: fall back to elimination on the reduced model
+        return eliminate(
+            [f.reduce(self.__evidence) for f in self.__factors], list(variables)
+        ).normalize()
@@ -1,11 +1,31 @@
-from graph import UnweightedDirectionAdjacencyMatrix, TopoSortAlgorithm
+from graph import (
+    UnweightedDirectionAdjacencyList,
+    TopoSortAlgorithm,
+    BayesBallAlgorithm,
+    ReachabilityIndex,
+)
 from copy import deepcopy
 from .nodes import Node
-from common import timeExecute, ThreadPool
+from .samples import SampleStore, smallestDtype
+from .compiled import CompiledNetwork
+from .query import BatchQueryExecutor
+from .estimate import QueryEstimate, normalQuantile
+from .factor import Factor, eliminate, eliminationOrder
+from .junction_tree import JunctionTree
+from .streams import RandomStreams
+from .worker import (
+    allocateArrays,
+    attachArrays,
+    publishArrays,
+    describeNode,
+    initWorker,
+    runTask,
+)
+from common import timeExecute, ProcessPool, ResultCache
 from .generator import GenerateRandomProbability
 from multiprocessing import cpu_count
 from functools import partial
-from random import seed
+import numpy as np
 import time
 from typing import (
     Dict,
@@ -20,18 +40,45 @@ from typing import (
     Any,
     Union,
     Callable,
+    FrozenSet,
+    Iterable,
 )
 
 LIMITED_SAMPLES = 2 * 10 ** 7
+GROUP_SAMPLES = 2 * 10 ** 6
+SAMPLE_BLOCK_SIZE = 10 ** 5
+SAMPLE_POOL_BYTES = 1 << 26
+GIBBS_CHAINS = 10 ** 4
+GIBBS_BURN_IN = 100
+GIBBS_THINNING = 2
+
 
+class BayesianNetwork(UnweightedDirectionAdjacencyList):
+    _weightedSamples: bool = False
 
-class BayesianNetwork(UnweightedDirectionAdjacencyMatrix):
     def __init__(self, initializedSamples: int):
         super().__init__(None)
         self._generator: GenerateRandomProbability = GenerateRandomProbability()
         self._initSamples: int = initializedSamples
         self._nodeTable: Dict[str, V] = dict()
         self._topoNodes: Optional[List[Node]] = None
+        self._compiled: Optional[CompiledNetwork] = None
+        self._pool: Optional[ProcessPool] = None
+        self._streams: RandomStreams = RandomStreams()
+        self._structureVersion: int = 0
+        self._preparedVersion: Optional[Tuple[int, ...]] = None
+        self._loadedCompiled: Optional[CompiledNetwork] = None
+        self._loadedVersion: Optional[Tuple[int, ...]] = None
+        self._reachability: ReachabilityIndex = ReachabilityIndex(self)
+        self._bayesBall: BayesBallAlgorithm = BayesBallAlgorithm(self, self._reachability)
+
+    @property
+    def randomSeed(self) -> int:
+        return self._streams.seed
+
+    @randomSeed.setter
+    def randomSeed(self, seed: int) -> None:
+        self._streams = RandomStreams(seed)
 
     @classmethod
     def factory(cls, algorithm: str, initializedSamples: int = LIMITED_SAMPLES) -> Any:
@@ -39,6 +86,12 @@ class BayesianNetwork(UnweightedDirectionAdjacencyMatrix):
             return ForwardBayesianNetwork(initializedSamples)
         elif algorithm == "likelihood":
             return LikelihoodBayesianNetwork(initializedSamples)
+        elif algorithm == "gibbs":
+            return GibbsBayesianNetwork(initializedSamples)
+        elif algorithm == "exact":
+            return ExactBayesianNetwork(initializedSamples)
+        elif algorithm == "junction":
+            return JunctionTreeBayesianNetwork(initializedSamples)
         raise Exception("cannot create {} Bayesian netword!")
 
     def addNewNode(self, node: Node) -> None:
@@ -47,7 +100,71 @@ class BayesianNetwork(UnweightedDirectionAdjacencyMatrix):
         if node is None:
             raise Exception("cannot add None node")
         super().addNewNode(node)
+        self._reachability.vertexAdded(node)
         self._nodeTable[node.name] = node
+        self._structureVersion += 1
+
+    def addPath(self, startNode: Node, endNode: Node) -> None:
+        # a cycle is refused here rather than when the model is compiled
+        self._reachability.checkNewPath(startNode, endNode)
+        super().addPath(startNode, endNode)
+        self._reachability.pathAdded(startNode, endNode)
+        self._structureVersion += 1
+
+    def addPaths(self, paths: Iterable[Tuple[Node, Node]]) -> None:
+        # one Kahn pass over the whole batch instead of a reachability query
+        # per path; a cycle rolls the batch back
+        added: List[Tuple[Node, Node]] = list()
+        for startNode, endNode in paths:
+            isNewPath: bool = not (
+                self.checkVertexExist(startNode)
+                and self.checkVertexExist(endNode)
+                and self.getPath(startNode, endNode) is not None
+            )
+            super().addPath(startNode, endNode)
+            if isNewPath:
+                added.append((startNode, endNode))
+        self._structureVersion += 1
+        try:
+            TopoSortAlgorithm(self).levels()
+        except Exception:
+            for startNode, endNode in added:
+                super().deletePath(startNode, endNode)
+            raise
+
+    def addCompiled(self, nodes: List[Node], compiled: CompiledNetwork) -> None:
+        # bulk load of a model compiled elsewhere, nodes in its column order:
+        # every parent comes before its column, so the paths cannot close a
+        # cycle, and the next _prepare takes the compiled arrays as they are
+        if next(iter(self.allVertexes()), None) is not None:
+            raise Exception("a compiled model only loads into an empty network")
+        if [node.name for node in nodes] != list(compiled.names):
+            raise Exception("nodes do not match the compiled columns")
+        for node in nodes:
+            super().addNewNode(node)
+            self._nodeTable[node.name] = node
+        for node, parents in zip(nodes, compiled.parents):
+            for parent in parents.tolist():
+                super().addPath(nodes[parent], node)
+        self._structureVersion += 1
+        self._loadedCompiled = compiled
+        self._loadedVersion = self._modelVersion()
+
+    def deletePath(self, startNode: Node, endNode: Node) -> None:
+        super().deletePath(startNode, endNode)
+        self._structureVersion += 1
+
+    def _modelVersion(self) -> Tuple[int, ...]:
+        # changes whenever the topology or any CPT changes
+        return (self._structureVersion,) + tuple(
+            node.version for node in self._nodeTable.values()
+        )
+
+    def _isPrepared(self) -> bool:
+        return (
+            self._topoNodes is not None
+            and self._preparedVersion == self._modelVersion()
+        )
 
     def batchQuery(
         self,
@@ -56,12 +173,257 @@ class BayesianNetwork(UnweightedDirectionAdjacencyMatrix):
     ) -> List[float]:
         pass
 
+    def _effectiveSteps(self, steps: int) -> int:
+        return steps if steps > 0 else self._initSamples
+
+    def _budgetKey(self, steps: int) -> str:
+        # the samples batchQuery really spends for this steps argument
+        return "steps={}".format(self._effectiveSteps(steps))
+
+    def cachedBatchQuery(
+        self,
+        paramList: List[Tuple[Dict[str, str], Optional[Dict[str, str]]]],
+        cache: ResultCache,
+        fingerprint: str,
+        steps: int = -1,
+    ) -> List[float]:
+        # answers are keyed by model content, engine, budget, seed and the
+        # canonical query, so only unseen queries reach batchQuery
+        if paramList is None or len(paramList) < 1:
+            raise Exception("invalid query params")
+        prefix: str = "{}|{}|{};seed={}".format(
+            fingerprint, type(self).__name__, self._budgetKey(steps), self.randomSeed
+        )
+        keys: List[str] = [
+            "{}|{}|{}".format(
+                prefix,
+                self._buildConditionalKey(prob),
+                self._buildConditionalKey(conditions),
+            )
+            for prob, conditions in paramList
+        ]
+        cached: Dict[str, float] = cache.getMany(keys)
+        missing: List[int] = [i for i, key in enumerate(keys) if key not in cached]
+        if missing:
+            values: List[float] = self.batchQuery([paramList[i] for i in missing], steps)
+            values = [float(value) for value in values]
+            cache.putMany([(keys[i], value) for i, value in zip(missing, values)])
+            cached.update((keys[i], value) for i, value in zip(missing, values))
+        return [cached[key] for key in keys]
+
+    def anytimeBatchQuery(
+        self,
+        paramList: List[Tuple[Dict[str, str], Optional[Dict[str, str]]]],
+        halfWidth: float,
+        confidence: float = 0.95,
+        maxSamples: int = -1,
+        blockSize: int = SAMPLE_BLOCK_SIZE,
+        durationTime: Optional[float] = None,
+    ) -> List[QueryEstimate]:
+        if paramList is None or len(paramList) < 1:
+            raise Exception("invalid query params")
+        if halfWidth <= 0.0 or blockSize < 1:
+            raise Exception(
+                "invalid anytime params, half-width: {}, block size: {}".format(
+                    halfWidth, blockSize
+                )
+            )
+        self._prepare()
+        paramList = self._planQueries(paramList)
+        if maxSamples <= 0:
+            maxSamples = self._initSamples
+        z: float = normalQuantile(0.5 + confidence / 2)
+        encoded: List[Tuple[Dict[int, int], Optional[Dict[int, int]]]] = (
+            self._encodeQueries(paramList)
+        )
+        result: List[Optional[QueryEstimate]] = [None for _ in range(len(paramList))]
+        start = time.time()
+        for key, clamped, indexList in self._anytimeGroups(paramList, encoded):
+            streams: RandomStreams = self._streams.keyed(key)
+            executor: BatchQueryExecutor = BatchQueryExecutor(
+                [encoded[i] for i in indexList],
+                self._compiled.cardinalities,
+                weighted=self._weightedSamples,
+                secondMoments=True,
+            )
+            active: List[int] = list(range(len(indexList)))
+            spent: int = 0
+            chunk: int = 0
+            while active and spent < maxSamples:
+                if durationTime is not None and time.time() - start > durationTime:
+                    break
+                samples, weights = self._anytimeBlock(
+                    min(blockSize, maxSamples - spent), clamped, streams.chunk(chunk)
+                )
+                chunk += 1
+                executor.accumulate(samples, weights)
+                spent += len(samples)
+                widths: np.array = executor.halfWidths(z)
+                estimates: List[float] = executor.estimates()
+                remaining: List[int] = list()
+                for k in active:
+                    if widths[k] <= halfWidth:
+                        result[indexList[k]] = QueryEstimate(
+                            estimates[k], widths[k].item(), spent, True
+                        )
+                    else:
+                        remaining.append(k)
+                active = remaining
+            if active:
+                widths = executor.halfWidths(z)
+                estimates = executor.estimates()
+                for k in active:
+                    result[indexList[k]] = QueryEstimate(
+                        estimates[k], widths[k].item(), spent, False
+                    )
+        return result
+
+    def _anytimeGroups(
+        self,
+        paramList: List[Tuple[Dict[str, str], Optional[Dict[str, str]]]],
+        encoded: List[Tuple[Dict[int, int], Optional[Dict[int, int]]]],
+    ) -> List[Tuple[str, Dict[int, int], List[int]]]:
+        raise Exception(
+            "{} does not support anytime queries".format(type(self).__name__)
+        )
+
+    def _anytimeBlock(
+        self, nSamples: int, clamped: Dict[int, int], rng: np.random.Generator
+    ) -> Tuple[SampleStore, Optional[np.array]]:
+        raise Exception(
+            "{} does not support anytime queries".format(type(self).__name__)
+        )
+
+    def _workerFactory(self) -> Callable[[], "BayesianNetwork"]:
+        return partial(type(self), self._initSamples)
+
+    def _workerPool(self) -> ProcessPool:
+        # started once per network; workers rebuild the network from CPT
+        # arrays published once in shared memory and keep it between calls
+        if self._pool is None or self._pool.closed:
+            self._prepare()
+            buffer, layout = publishArrays(
+                [a for node in self._topoNodes for a in node.sharedArrays()]
+            )
+            self._pool = ProcessPool(
+                max(1, cpu_count() - 1),
+                initWorker,
+                (
+                    self._workerFactory(),
+                    [describeNode(node) for node in self._topoNodes],
+                    buffer,
+                    layout,
+                )
+                + self._sharedState(),
+            )
+        return self._pool
+
+    def _sharedState(self) -> Tuple:
+        # extra shared buffers handed to every worker when the pool starts
+        return ()
+
+    def _attachShared(self, *shared: Any) -> None:
+        pass
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.close()
+            self._pool = None
+
+    def __enter__(self) -> "BayesianNetwork":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
     def _prepare(self) -> None:
         if len(self.vertexSet()) == 0:
             raise Exception("Graph haven't been initialized!")
-        if self._topoNodes is None:
+        if not self._isPrepared():
+            # workers hold a copy of the old model
+            self.close()
+            version: Tuple[int, ...] = self._modelVersion()
+            if self._loadedVersion == version:
+                self._topoNodes = [
+                    self._nodeTable[name] for name in self._loadedCompiled.names
+                ]
+                self._compiled = self._loadedCompiled
+                self._preparedVersion = version
+                return
             topo: TopoSortAlgorithm = TopoSortAlgorithm(self)
-            self._topoNodes = [node for node in topo.bfs()]
+            # level by level, so the compiled columns are grouped into waves;
+            # a cycle raises before anything stale is marked as prepared
+            self._topoNodes = [node for level in topo.levels() for node in level]
+            self._compiled = CompiledNetwork(self._topoNodes, version)
+            self._preparedVersion = version
+
+    def compile(self) -> CompiledNetwork:
+        self._prepare()
+        return self._compiled
+
+    def _encodeState(self, state: Optional[Dict[str, str]]) -> Dict[int, int]:
+        return self._compiled.encodeState(state)
+
+    def _encodeQueries(
+        self, paramList: List[Tuple[Dict[str, str], Optional[Dict[str, str]]]]
+    ) -> List[Tuple[Dict[int, int], Optional[Dict[int, int]]]]:
+        encoded: List[Tuple[Dict[int, int], Optional[Dict[int, int]]]] = list()
+        for prob, conditions in paramList:
+            self._statsCheck(prob, conditions)
+            encoded.append(
+                (
+                    self._encodeState(prob),
+                    None if conditions is None else self._encodeState(conditions),
+                )
+            )
+        return encoded
+
+    def _emptySampleStore(self, nSamples: int) -> SampleStore:
+        return SampleStore(
+            list(self._compiled.names),
+            [list(codebook) for codebook in self._compiled.codebooks],
+            nSamples,
+        )
+
+    def _fillSampleBlock(
+        self,
+        samples: SampleStore,
+        start: int,
+        end: int,
+        clamped: Optional[Dict[int, int]] = None,
+        rng: Optional[np.random.Generator] = None,
+        columns: Optional[List[int]] = None,
+    ) -> None:
+        # only the given columns are filled, they must be in topological
+        # order and contain the parents of every column they sample
+        if rng is None:
+            rng = self._streams.chunk(0)
+        if clamped is None:
+            clamped = dict()
+        compiled: CompiledNetwork = self._compiled
+        if columns is None:
+            columns = list(range(len(compiled)))
+        for column in columns:
+            out: np.array = samples.columnAt(column)[start:end]
+            if column in clamped:
+                out[:] = clamped[column]
+                continue
+            out[:] = compiled.drawColumn(
+                column,
+                [samples.columnAt(p)[start:end] for p in compiled.parents[column]],
+                rng.random(end - start),
+            )
+
+    def _generateSampleBlock(
+        self,
+        nSamples: int,
+        clamped: Optional[Dict[int, int]] = None,
+        rng: Optional[np.random.Generator] = None,
+        columns: Optional[List[int]] = None,
+    ) -> SampleStore:
+        samples: SampleStore = self._emptySampleStore(nSamples)
+        self._fillSampleBlock(samples, 0, nSamples, clamped, rng, columns)
+        return samples
 
     def _generateSample(
         self, originalState: Optional[Dict[str, str]] = None
@@ -77,54 +439,177 @@ class BayesianNetwork(UnweightedDirectionAdjacencyMatrix):
             state[node.name] = node.generateSample(state)
         return state
 
+    def _streamSamples(
+        self,
+        nSamples: int,
+        originalState: Optional[Dict[str, str]] = None,
+        durationTime: int = 90,
+        blockSize: int = SAMPLE_BLOCK_SIZE,
+        streams: Optional[RandomStreams] = None,
+        firstChunk: int = 0,
+        columns: Optional[List[int]] = None,
+    ) -> Generator[SampleStore, None, None]:
+        # one block buffer is refilled in place, so consumers must fold each
+        # block into their accumulators before asking for the next one; block
+        # k is drawn from chunk firstChunk + k of the given streams
+        if nSamples < 1:
+            raise Exception("number of samples cannot < 1")
+        if streams is None:
+            streams = self._streams
+        block: SampleStore = self._emptySampleStore(min(blockSize, nSamples))
+        clamped: Dict[int, int] = block.encodeState(originalState)
+        start = time.time()
+        for chunk, i in enumerate(range(0, nSamples, blockSize), firstChunk):
+            size: int = min(blockSize, nSamples - i)
+            self._fillSampleBlock(block, 0, size, clamped, streams.chunk(chunk), columns)
+            yield block.truncate(size)
+            if time.time() - start > durationTime:
+                return
+
     def _generateSamples(
         self,
         nSamples: int,
         originalState: Optional[Dict[str, str]] = None,
         durationTime: int = 90,
-    ) -> List[Dict[str, str]]:
+    ) -> SampleStore:
         if nSamples < 1:
             raise Exception("number of samples cannot < 1")
-        samples = []
+        samples: SampleStore = self._emptySampleStore(nSamples)
+        clamped: Dict[int, int] = samples.encodeState(originalState)
         start = time.time()
-        for i in range(nSamples):
-            samples.append(self._generateSample(originalState))
-            if i % 1000 == 0:
-                duration = time.time() - start
-                if duration > durationTime:
-                    break
+        for chunk, i in enumerate(range(0, nSamples, SAMPLE_BLOCK_SIZE)):
+            end: int = min(i + SAMPLE_BLOCK_SIZE, nSamples)
+            self._fillSampleBlock(samples, i, end, clamped, self._streams.chunk(chunk))
+            duration = time.time() - start
+            if duration > durationTime:
+                return samples.truncate(end)
         return samples
 
-    def _filterSample(self, prob: Dict[str, str], record: Dict[str, str]) -> bool:
-        for name, feature in prob.items():
-            if name not in record:
-                raise Exception("Failed to get item {} in the record".format(name))
-            if feature != record[name]:
-                return False
-        return True
+    def _planQueries(
+        self, paramList: List[Tuple[Dict[str, str], Optional[Dict[str, str]]]]
+    ) -> List[Tuple[Dict[str, str], Optional[Dict[str, str]]]]:
+        # evidence the ball cannot reach is independent of the query given the
+        # rest, dropping it merges query groups and, for rejection sampling,
+        # keeps samples that would have been thrown away
+        planned: List[Tuple[Dict[str, str], Optional[Dict[str, str]]]] = list()
+        for prob, conditions in paramList:
+            self._statsCheck(prob, conditions)
+            names: List[str] = list(prob) + list(conditions or [])
+            if not conditions or any(name not in self._nodeTable for name in names):
+                planned.append((prob, conditions))
+                continue
+            requisite: Set[Node] = self._bayesBall.requisiteEvidence(
+                [self._nodeTable[name] for name in prob],
+                [self._nodeTable[name] for name in conditions],
+            )
+            kept: Dict[str, str] = {
+                name: feature
+                for name, feature in conditions.items()
+                if self._nodeTable[name] in requisite
+            }
+            planned.append((prob, kept or None))
+        return planned
+
+    def _relevantColumns(
+        self, encoded: List[Tuple[Dict[int, int], Optional[Dict[int, int]]]]
+    ) -> Tuple[List[int], List[int]]:
+        # columns a query group has to fill, the relevant free nodes plus the
+        # clamped evidence, and the evidence columns that weigh the samples
+        evidence: Dict[int, int] = encoded[0][1] or dict()
+        free, weighted = self._compiled.relevance(
+            set().union(*[prob for prob, _ in encoded]), evidence
+        )
+        return sorted(set(free) | set(evidence)), weighted
+
+    def _filterSample(self, prob: Dict[str, str], samples: SampleStore) -> np.array:
+        return samples.mask(prob)
 
     def _filterSamples(
-        self, samples: List[Dict[str, str]], filters: Dict[str, str]
-    ) -> Generator[Dict[str, str], None, None]:
-        for result in filter(partial(self._filterSample, filters), samples):
-            yield result
+        self, samples: SampleStore, filters: Dict[str, str]
+    ) -> SampleStore:
+        return samples.select(self._filterSample(filters, samples))
 
     def _noneConditionStatsSample(
-        self, prob: Dict[str, str], samples: List[Dict[str, str]]
+        self, prob: Dict[str, str], samples: SampleStore
     ) -> Tuple[int, int]:
         if len(samples) == 0:
             raise Exception("input no sample!")
-        cnt: int = 0
-        for _ in self._filterSamples(samples, prob):
-            cnt += 1
+        cnt: int = int(np.count_nonzero(self._filterSample(prob, samples)))
         return (cnt, len(samples))
 
     def _noneConditionStats(
-        self, prob: Dict[str, str], samples: List[Dict[str, str]]
+        self, prob: Dict[str, str], samples: SampleStore
     ) -> float:
         cnt, total = self._noneConditionStatsSample(prob, samples)
         return cnt / total
 
+    def _buildFactors(self) -> List[Factor]:
+        compiled: CompiledNetwork = self._compiled
+        return [
+            Factor(parents.tolist() + [column], compiled.cpt(column))
+            for column, parents in enumerate(compiled.parents)
+        ]
+
+    def _buildConditionalKey(self, condition: Optional[Dict[str, str]]) -> str:
+        if condition is None:
+            return "standard"
+        keyList: List[str] = sorted(condition.keys())
+        conditionKey: List[str] = list()
+        for k in keyList:
+            conditionKey.append(k + ":" + condition[k])
+        return ";".join(conditionKey)
+
+    def _doParamListIndexing(
+        self, paramList: List[Tuple[Dict[str, str], Optional[Dict[str, str]]]]
+    ) -> Dict[str, List[int]]:
+        index: Dict[str, List[int]] = dict()
+        for i, param in enumerate(paramList):
+            key: str = self._buildConditionalKey(param[1])
+            if key not in index:
+                index[key] = [i]
+            else:
+                index[key].append(i)
+        return index
+
+    def _samplingGroups(
+        self, paramList: List[Tuple[Dict[str, str], Optional[Dict[str, str]]]]
+    ) -> List[Tuple[str, List[int]]]:
+        # queries share samples only with queries of the same evidence and the
+        # same relevant columns. That key, not the position in the batch or
+        # the other queries, picks the random stream, so an answer depends on
+        # its own query alone
+        groups: Dict[str, List[int]] = dict()
+        for i, (prob, evidence) in enumerate(self._encodeQueries(paramList)):
+            free, _ = self._compiled.relevance(prob, evidence or dict())
+            key: str = "{}|{}".format(
+                self._buildConditionalKey(paramList[i][1]),
+                ",".join(sorted(self._compiled.names[column] for column in free)),
+            )
+            groups.setdefault(key, []).append(i)
+        return list(groups.items())
+
+    def _chunkRanges(self, steps: int, workers: int) -> List[Tuple[int, int]]:
+        # contiguous runs of whole chunks, so the chunk -> stream mapping and
+        # therefore the summed counts do not depend on the number of workers
+        chunks: int = -(-steps // SAMPLE_BLOCK_SIZE)
+        ranges: List[Tuple[int, int]] = list()
+        for w in range(min(workers, chunks)):
+            first: int = chunks * w // min(workers, chunks)
+            last: int = chunks * (w + 1) // min(workers, chunks)
+            ranges.append(
+                (first, min(last * SAMPLE_BLOCK_SIZE, steps) - first * SAMPLE_BLOCK_SIZE)
+            )
+        return ranges
+
+    def _mergeGroupCounts(
+        self, indexLists: List[List[int]], batchJobResults: List[np.array], size: int
+    ) -> List[float]:
+        result: List[float] = [0.0 for _ in range(size)]
+        for indexList, (numerators, denominators) in zip(indexLists, batchJobResults):
+            for i, n, d in zip(indexList, numerators.tolist(), denominators.tolist()):
+                result[i] = n / d if d != 0 else 0.0
+        return result
+
     def _statsCheck(self, prob: Dict[str, str], conditions: Optional[Dict[str, str]]):
         if prob is None:
             raise Exception("input None prob!!!")
@@ -140,43 +625,108 @@ class BayesianNetwork(UnweightedDirectionAdjacencyMatrix):
 
 
 class ForwardBayesianNetwork(BayesianNetwork):
-    def __generateAndQuery(
+    def __init__(self, initializedSamples: int, poolBytes: int = SAMPLE_POOL_BYTES):
+        super().__init__(initializedSamples)
+        if poolBytes < 0:
+            raise Exception("sample pool size cannot < 0")
+        self.__poolBytes: int = poolBytes
+        self.__poolShared: Optional[Tuple[Any, List]] = None
+        self.__poolColumns: List[np.array] = list()
+        self.__samplePool: Optional[SampleStore] = None
+        self.__samplePoolKey: Optional[Tuple] = None
+
+    @property
+    def samplePool(self) -> Optional[SampleStore]:
+        return self.__samplePool
+
+    def _poolCapacity(self) -> int:
+        # whole chunks only, so pooled sample k is always sample k of the streams
+        bytesPerSample: int = sum(
+            np.dtype(smallestDtype(c)).itemsize for c in self._compiled.cardinalities
+        )
+        chunks: int = self.__poolBytes // (bytesPerSample * SAMPLE_BLOCK_SIZE)
+        return chunks * SAMPLE_BLOCK_SIZE
+
+    def _sharedState(self) -> Tuple:
+        # the pool lives in shared memory for the lifetime of the workers, who
+        # draw their chunks of a top-up straight into it
+        capacity: int = self._poolCapacity()
+        cardinalities: List[int] = self._compiled.cardinalities.tolist()
+        shapes: List[Tuple[int, ...]] = [(capacity,) for _ in cardinalities]
+        dtypes: List[Any] = [smallestDtype(c) for c in cardinalities]
+        # a restarted pool keeps the buffer while its columns still fit, the
+        # pool key decides whether the rows in it are still valid
+        if self.__poolShared is None or [
+            (shape, dtype) for _, shape, dtype in self.__poolShared[1]
+        ] != [(shape, np.dtype(dtype).str) for shape, dtype in zip(shapes, dtypes)]:
+            self.__poolShared = allocateArrays(shapes, dtypes)
+            self._attachShared(*self.__poolShared)
+            self.__samplePool = None
+            self.__samplePoolKey = None
+        return self.__poolShared
+
+    def _attachShared(self, buffer: Any, layout: List) -> None:
+        self.__poolColumns = attachArrays(buffer, layout)
+
+    def __poolWindow(self, start: int, end: int) -> SampleStore:
+        return SampleStore(
+            list(self._compiled.names),
+            [list(codebook) for codebook in self._compiled.codebooks],
+            end - start,
+            [column[start:end] for column in self.__poolColumns],
+        )
+
+    def _sampleChunks(
+        self, nSamples: int, streams: RandomStreams, firstChunk: int
+    ) -> int:
+        start: int = firstChunk * SAMPLE_BLOCK_SIZE
+        samples: SampleStore = self.__poolWindow(start, start + nSamples)
+        for chunk, i in enumerate(range(0, nSamples, SAMPLE_BLOCK_SIZE), firstChunk):
+            end: int = min(i + SAMPLE_BLOCK_SIZE, nSamples)
+            self._fillSampleBlock(samples, i, end, None, streams.chunk(chunk))
+        return nSamples
+
+    def __pooledSamples(self, nSamples: int) -> SampleStore:
+        # the columns are sized for the whole capacity once, a top-up only
+        # fills the rows after the ones already pooled
+        pool: ProcessPool = self._workerPool()
+        key: Tuple = (self._preparedVersion, self._streams.seed)
+        if self.__samplePoolKey != key:
+            self.__samplePool = self.__poolWindow(0, 0)
+            self.__samplePoolKey = key
+        have: int = len(self.__samplePool)
+        need: int = -(-nSamples // SAMPLE_BLOCK_SIZE) * SAMPLE_BLOCK_SIZE
+        if need > have:
+            firstChunk: int = have // SAMPLE_BLOCK_SIZE
+            taskList: List[Tuple[str, Tuple]] = [
+                ("_sampleChunks", (n, self._streams, firstChunk + first))
+                for first, n in self._chunkRanges(need - have, pool.size)
+            ]
+            pool.map(runTask, taskList)
+            self.__samplePool = self.__poolWindow(0, need)
+        return self.__samplePool.truncate(nSamples)
+
+    def _forwardCounts(
         self,
         steps: int,
         paramList: List[Tuple[Dict[str, str], Optional[Dict[str, str]]]],
-        index: int,
-    ) -> List[Tuple[int, int]]:
-        seed(index)
-        result: List[Tuple[int, int]] = list()
-        samples: List[Dict[str, str]] = self._generateSamples(steps)
-        print(len(samples))
-        for prob, conditions in paramList:
-            self._statsCheck(prob, conditions)
-            if conditions is None:
-                result.append(self._noneConditionStatsSample(prob, samples))
-            else:
-                result.append(
-                    self._noneConditionStatsSample(
-                        prob,
-                        [item for item in self._filterSamples(samples, conditions)],
-                    )
-                )
-        return result
+        streams: RandomStreams,
+        firstChunk: int,
+    ) -> np.array:
+        executor: BatchQueryExecutor = BatchQueryExecutor(
+            self._encodeQueries(paramList), self._compiled.cardinalities
+        )
+        for block in self._streamSamples(
+            steps, streams=streams, firstChunk=firstChunk
+        ):
+            executor.accumulate(block)
+        return np.stack([executor.numerators, executor.denominators])
 
-    def __convertBatchJobResults(
-        self, batchJobResults: List[List[Tuple[int, int]]]
-    ) -> List[float]:
+    def __convertBatchJobResults(self, batchJobResults: List[np.array]) -> List[float]:
         if batchJobResults is None or len(batchJobResults) < 1:
             raise Exception("invalid batch job results")
-        result: List[float] = [0.0 for _ in range(len(batchJobResults[0]))]
-        for i in range(len(result)):
-            total: int = 0
-            filtered: int = 0
-            for lst in batchJobResults:
-                filtered += lst[i][0]
-                total += lst[i][1]
-            result[i] = filtered / total if total != 0 else 0.0
-        return result
+        filtered, total = sum(batchJobResults)
+        return [f / t if t != 0 else 0.0 for f, t in zip(filtered.tolist(), total.tolist())]
 
     def batchQuery(
         self,
@@ -186,138 +736,444 @@ class ForwardBayesianNetwork(BayesianNetwork):
         if paramList is None or len(paramList) < 1:
             raise Exception("invalid query params")
         self._prepare()
+        paramList = self._planQueries(paramList)
         if steps <= 0:
             steps = self._initSamples
 
-        poolSize: int = cpu_count() - 1
-        taskList: List[Callable[[], Optional[Any]]] = [
-            partial(self.__generateAndQuery, int(steps / poolSize) + 1, paramList, i)
-            for i in range(poolSize)
-        ]
+        # the pool answers as many samples as it may hold, anything above
+        # its capacity is streamed by the workers and thrown away
+        pooledSteps: int = min(steps, self._poolCapacity())
+        batchJobResults: List[np.array] = list()
+        if pooledSteps > 0:
+            samples: SampleStore = self.__pooledSamples(pooledSteps)
+            executor: BatchQueryExecutor = BatchQueryExecutor(
+                self._encodeQueries(paramList), self._compiled.cardinalities
+            )
+            for i in range(0, pooledSteps, SAMPLE_BLOCK_SIZE):
+                executor.accumulate(samples.window(i, i + SAMPLE_BLOCK_SIZE))
+            batchJobResults.append(
+                np.stack([executor.numerators, executor.denominators])
+            )
+        if steps > pooledSteps:
+            pool: ProcessPool = self._workerPool()
+            pooledChunks: int = pooledSteps // SAMPLE_BLOCK_SIZE
+            taskList: List[Tuple[str, Tuple]] = [
+                (
+                    "_forwardCounts",
+                    (nSamples, paramList, self._streams, pooledChunks + firstChunk),
+                )
+                for firstChunk, nSamples in self._chunkRanges(
+                    steps - pooledSteps, pool.size
+                )
+            ]
+            batchJobResults.extend(pool.map(runTask, taskList))
+        return self.__convertBatchJobResults(batchJobResults)
 
-        pool: ThreadPool = ThreadPool(taskList, poolSize)
-        pool.startAndWait()
-        return self.__convertBatchJobResults(pool.result)
+    def _anytimeGroups(
+        self,
+        paramList: List[Tuple[Dict[str, str], Optional[Dict[str, str]]]],
+        encoded: List[Tuple[Dict[int, int], Optional[Dict[int, int]]]],
+    ) -> List[Tuple[str, Dict[int, int], List[int]]]:
+        # one unclamped stream serves every query, evidence is filtered
+        return [(self._buildConditionalKey(None), dict(), list(range(len(paramList))))]
+
+    def _anytimeBlock(
+        self, nSamples: int, clamped: Dict[int, int], rng: np.random.Generator
+    ) -> Tuple[SampleStore, Optional[np.array]]:
+        return self._generateSampleBlock(nSamples, rng=rng), None
 
 
 class LikelihoodBayesianNetwork(BayesianNetwork):
-    def __buildConditionalKey(self, condition: Optional[Dict[str, str]]) -> str:
-        if condition is None:
-            return "standard"
-        keyList: List[str] = sorted(condition.keys())
-        conditionKey: List[str] = list()
-        for k in keyList:
-            conditionKey.append(k + ":" + condition[k])
-        return ";".join(conditionKey)
+    _weightedSamples: bool = True
 
-    def __doParamListIndexing(
-        self, paramList: List[Tuple[Dict[str, str], Optional[Dict[str, str]]]]
-    ) -> Dict[str, List[int]]:
-        index: Dict[str, List[int]] = dict()
-        for i, param in enumerate(paramList):
-            key: str = self.__buildConditionalKey(param[1])
-            if key not in index:
-                index[key] = [i]
-            else:
-                index[key].append(i)
-        return index
+    def __likelihoodSampleWeights(
+        self,
+        samples: SampleStore,
+        clamped: Dict[int, int],
+        weighted: Optional[List[int]] = None,
+    ) -> np.array:
+        weights: np.array = np.ones(len(samples))
+        compiled: CompiledNetwork = self._compiled
+        for column, index in clamped.items():
+            if weighted is not None and column not in weighted:
+                continue
+            weights *= compiled.probabilityBlock(
+                column, [samples.columnAt(p) for p in compiled.parents[column]], index
+            )
+        return weights
 
-    def __likelihoodSampleWeight(
-        self, condition: Dict[str, str], sample: Dict[str, str]
+    def _likelihoodCounts(
+        self,
+        nSamples: int,
+        limitTime: int,
+        paramList: List[Tuple[Dict[str, str], Optional[Dict[str, str]]]],
+        streams: RandomStreams,
+    ) -> np.array:
+        condition = paramList[0][1]
+        clamped: Dict[int, int] = self._encodeState(condition)
+        encoded: List[Tuple[Dict[int, int], Optional[Dict[int, int]]]] = (
+            self._encodeQueries(paramList)
+        )
+        columns, weighted = self._relevantColumns(encoded)
+        executor: BatchQueryExecutor = BatchQueryExecutor(
+            encoded, self._compiled.cardinalities, weighted=True
+        )
+        total: int = 0
+        for block in self._streamSamples(
+            nSamples, condition, limitTime, streams=streams, columns=columns
+        ):
+            executor.accumulate(
+                block, self.__likelihoodSampleWeights(block, clamped, weighted)
+            )
+            total += len(block)
+        if total <= 1:
+            raise Exception("no input sample found")
+        return np.stack([executor.numerators, executor.denominators])
+
+    def batchQuery(
+        self,
+        paramList: List[Tuple[Dict[str, str], Optional[Dict[str, str]]]],
+        steps: int = -1,
+    ) -> List[float]:
+        self._prepare()
+        paramList = self._planQueries(paramList)
+        stepsTable: int = self._effectiveSteps(steps)
+
+        groups: List[Tuple[str, List[int]]] = self._samplingGroups(paramList)
+        indexLists: List[List[int]] = [indexList for _, indexList in groups]
+        pool: ProcessPool = self._workerPool()
+        workers: int = pool.size
+        numsTimeSlice = (
+            int(len(indexLists) / workers) + 1
+            if len(indexLists) % workers
+            else int(len(indexLists) / workers)
+        )
+        limitTimeSlice = int(90 / numsTimeSlice)
+        taskList: List[Tuple[str, Tuple]] = [
+            (
+                "_likelihoodCounts",
+                (
+                    stepsTable,
+                    limitTimeSlice,
+                    [paramList[i] for i in indexList],
+                    self._streams.keyed(key),
+                ),
+            )
+            for key, indexList in groups
+        ]
+        return self._mergeGroupCounts(
+            indexLists, pool.map(runTask, taskList), len(paramList)
+        )
+
+    def _effectiveSteps(self, steps: int) -> int:
+        # every evidence group draws its own samples
+        return steps if steps > 0 else min(self._initSamples, GROUP_SAMPLES)
+
+    def _anytimeGroups(
+        self,
+        paramList: List[Tuple[Dict[str, str], Optional[Dict[str, str]]]],
+        encoded: List[Tuple[Dict[int, int], Optional[Dict[int, int]]]],
+    ) -> List[Tuple[str, Dict[int, int], List[int]]]:
+        return [
+            (key, encoded[indexList[0]][1] or dict(), indexList)
+            for key, indexList in self._doParamListIndexing(paramList).items()
+        ]
+
+    def _anytimeBlock(
+        self, nSamples: int, clamped: Dict[int, int], rng: np.random.Generator
+    ) -> Tuple[SampleStore, Optional[np.array]]:
+        samples: SampleStore = self._generateSampleBlock(nSamples, clamped, rng)
+        return samples, self.__likelihoodSampleWeights(samples, clamped)
+
+
+class GibbsBayesianNetwork(BayesianNetwork):
+    def __init__(
+        self,
+        initializedSamples: int,
+        chains: int = GIBBS_CHAINS,
+        burnIn: int = GIBBS_BURN_IN,
+        thinning: int = GIBBS_THINNING,
     ):
-        w: float = 1.0
-        for conditionName, conditionValue in condition.items():
-            w *= self._nodeTable[conditionName].getProbability(sample, conditionValue)
-        return sample, w
+        super().__init__(initializedSamples)
+        if chains < 1 or burnIn < 0 or thinning < 1:
+            raise Exception(
+                "invalid gibbs params, chains: {}, burn-in: {}, thinning: {}".format(
+                    chains, burnIn, thinning
+                )
+            )
+        self.__chains: int = chains
+        self.__burnIn: int = burnIn
+        self.__thinning: int = thinning
+        self._markovBlankets: Dict[str, Set[str]] = dict()
+        self.__ownSlices: List[Tuple[List[int], np.array]] = list()
+        self.__childSlices: List[
+            List[Tuple[int, List[int], Tuple[int, ...], np.array]]
+        ] = list()
 
-    def __calculateLikelihoodProbability(
+    def _workerFactory(self) -> Callable[[], BayesianNetwork]:
+        return partial(
+            GibbsBayesianNetwork,
+            self._initSamples,
+            self.__chains,
+            self.__burnIn,
+            self.__thinning,
+        )
+
+    def _prepare(self) -> None:
+        if self._isPrepared():
+            return
+        super()._prepare()
+        compiled: CompiledNetwork = self._compiled
+        cardinalities: List[int] = compiled.cardinalities.tolist()
+        children: List[List[int]] = [[] for _ in compiled.names]
+        for column, parents in enumerate(compiled.parents):
+            for parent in parents.tolist():
+                children[parent].append(column)
+
+        self.__ownSlices = list()
+        self.__childSlices = list()
+        for column, name in enumerate(compiled.names):
+            self.__ownSlices.append((compiled.parents[column].tolist(), compiled.tables[column]))
+            slices: List[Tuple[int, List[int], Tuple[int, ...], np.array]] = list()
+            blanket: Set[int] = set(compiled.parents[column].tolist())
+            for child in children[column]:
+                childParents: List[int] = compiled.parents[child].tolist()
+                axis: int = childParents.index(column)
+                others: List[int] = childParents[:axis] + childParents[axis + 1 :]
+                # child CPT with this node's axis moved next to the child's own
+                # axis: [other parents' row, node state, child state]
+                table: np.array = np.moveaxis(compiled.cpt(child), axis, -2).reshape(
+                    -1, cardinalities[column], cardinalities[child]
+                )
+                shape: Tuple[int, ...] = tuple(cardinalities[p] for p in others)
+                slices.append((child, others, shape, table))
+                blanket.add(child)
+                blanket.update(others)
+            self.__childSlices.append(slices)
+            self._markovBlankets[name] = {compiled.names[b] for b in blanket}
+
+    def __fullConditional(
+        self, chains: SampleStore, column: int, filled: Set[int]
+    ) -> np.array:
+        parents, table = self.__ownSlices[column]
+        if not parents:
+            probs: np.array = np.tile(table[0], (len(chains), 1))
+        else:
+            probs = table[
+                self._compiled.rowIndices(column, [chains.columnAt(p) for p in parents])
+            ]
+        for child, others, shape, childTable in self.__childSlices[column]:
+            if child not in filled:
+                # barren child, it sums out to one
+                continue
+            rows = (
+                np.ravel_multi_index(tuple(chains.columnAt(p) for p in others), shape)
+                if others
+                else np.zeros(len(chains), dtype=np.intp)
+            )
+            probs = probs * childTable[rows, :, chains.columnAt(child)]
+        return probs
+
+    def __sweep(
         self,
-        condition: Dict[str, str],
-        prob: Dict[str, str],
-        samples: List[Dict[str, str]],
-    ) -> float:
-        if prob is None:
-            raise Exception("input None condition or prob")
-        if samples is None or len(samples) <= 1:
-            raise Exception("no input sample found")
-        if condition is None:
-            return self._noneConditionStats(prob, samples)
-        totalw: float = 0.0
-        condw: float = 0.0
-        for sample, w in map(
-            partial(self.__likelihoodSampleWeight, condition), samples
-        ):
-            totalw += w
-            if self._filterSample(prob, sample):
-                condw += w
-        return condw / totalw if totalw != 0.0 else 0.0
+        chains: SampleStore,
+        free: List[int],
+        filled: Set[int],
+        rng: np.random.Generator,
+    ) -> None:
+        for column in free:
+            probs: np.array = self.__fullConditional(chains, column, filled)
+            cdf: np.array = np.cumsum(probs, axis=1)
+            total: np.array = cdf[:, -1]
+            # chains stuck in a zero-probability state resample uniformly
+            stuck: np.array = total <= 0.0
+            if stuck.any():
+                cdf[stuck] = np.arange(1, cdf.shape[1] + 1)
+                total = cdf[:, -1]
+            rnd: np.array = rng.random(len(chains)) * total
+            state: np.array = (rnd[:, None] > cdf).sum(axis=1)
+            chains.columnAt(column)[:] = np.minimum(state, cdf.shape[1] - 1)
+
+    def _effectiveSteps(self, steps: int) -> int:
+        return steps if steps > 0 else min(self._initSamples, GROUP_SAMPLES)
 
-    def __generateAndQuery(
+    def _budgetKey(self, steps: int) -> str:
+        # the chain settings change the answer as much as the kept samples do
+        return "{};chains={};burnIn={};thinning={}".format(
+            super()._budgetKey(steps), self.__chains, self.__burnIn, self.__thinning
+        )
+
+    def _gibbsCounts(
         self,
         nSamples: int,
-        limitTime: int,
-        conditionList: List[Optional[Dict[str, str]]],
-        probList: List[Dict[str, str]],
-        indexList: List[int],
+        paramList: List[Tuple[Dict[str, str], Optional[Dict[str, str]]]],
+        streams: RandomStreams,
+    ) -> np.array:
+        rng: np.random.Generator = streams.chunk(0)
+        condition = paramList[0][1]
+        clamped: Dict[int, int] = self._encodeState(condition)
+        encoded: List[Tuple[Dict[int, int], Optional[Dict[int, int]]]] = (
+            self._encodeQueries(paramList)
+        )
+        columns, _ = self._relevantColumns(encoded)
+        filled: Set[int] = set(columns)
+        free: List[int] = [column for column in columns if column not in clamped]
+
+        executor: BatchQueryExecutor = BatchQueryExecutor(
+            encoded, self._compiled.cardinalities
+        )
+        chains: SampleStore = self._generateSampleBlock(
+            self.__chains, clamped, rng, columns
+        )
+        for _ in range(self.__burnIn):
+            self.__sweep(chains, free, filled, rng)
+        kept: int = 0
+        while kept < nSamples:
+            for _ in range(self.__thinning):
+                self.__sweep(chains, free, filled, rng)
+            executor.accumulate(chains)
+            kept += len(chains)
+        return np.stack([executor.numerators, executor.denominators])
+
+    def batchQuery(
+        self,
+        paramList: List[Tuple[Dict[str, str], Optional[Dict[str, str]]]],
+        steps: int = -1,
     ) -> List[float]:
-        seed(indexList[0])
-        result: List[float] = [0.0 for _ in range(len(probList))]
-        condition = conditionList[indexList[0]]
-        samples: List[Dict[str, str]] = self._generateSamples(
-            nSamples, condition, limitTime
+        if paramList is None or len(paramList) < 1:
+            raise Exception("invalid query params")
+        self._prepare()
+        paramList = self._planQueries(paramList)
+        # each evidence group keeps steps samples, split across its chains
+        stepsTable: int = self._effectiveSteps(steps)
+
+        groups: List[Tuple[str, List[int]]] = self._samplingGroups(paramList)
+        indexLists: List[List[int]] = [indexList for _, indexList in groups]
+        pool: ProcessPool = self._workerPool()
+        taskList: List[Tuple[str, Tuple]] = [
+            (
+                "_gibbsCounts",
+                (
+                    stepsTable,
+                    [paramList[i] for i in indexList],
+                    self._streams.keyed(key),
+                ),
+            )
+            for key, indexList in groups
+        ]
+        return self._mergeGroupCounts(
+            indexLists, pool.map(runTask, taskList), len(paramList)
         )
 
-        for i in indexList:
-            prob: Dict[str, str] = probList[i]
-            self._statsCheck(prob, condition)
-            result[i] = self.__calculateLikelihoodProbability(condition, prob, samples)
-        return result
 
-    def __convertBatchJobResults(
-        self, batchJobResults: List[List[float]]
+class ExactBayesianNetwork(BayesianNetwork):
+    def __init__(self, initializedSamples: int = 0):
+        super().__init__(initializedSamples)
+        self.__factors: List[Factor] = list()
+        self.__orderCache: Dict[Tuple[FrozenSet[int], FrozenSet[int]], List[int]] = dict()
+
+    def _prepare(self) -> None:
+        if self._isPrepared():
+            return
+        super()._prepare()
+        self.__factors = self._buildFactors()
+        self.__orderCache = dict()
+
+    def __posterior(self, evidence: Dict[int, int], variables: List[int]) -> Factor:
+        # barren and d-separated nodes contribute a constant factor
+        free, weighted = self._compiled.relevance(variables, evidence)
+        factors: List[Factor] = [
+            self.__factors[column].reduce(evidence)
+            for column in sorted(set(free) | set(weighted))
+        ]
+        key = (frozenset(evidence), frozenset(variables))
+        if key not in self.__orderCache:
+            self.__orderCache[key] = eliminationOrder(factors, set(variables))
+        return eliminate(factors, variables, self.__orderCache[key])
+
+    def __queryGroup(
+        self, evidence: Dict[int, int], queries: List[Dict[int, int]]
     ) -> List[float]:
-        result: List[float] = [0.0 for _ in range(len(batchJobResults[0]))]
-        for i in range(len(result)):
-            for subresult in batchJobResults:
-                result[i] += subresult[i]
+        posteriors: Dict[Tuple[int, ...], Factor] = dict()
+        result: List[float] = list()
+        for prob in queries:
+            variables: Tuple[int, ...] = tuple(sorted(prob))
+            if variables not in posteriors:
+                posteriors[variables] = self.__posterior(evidence, list(variables))
+            joint: Factor = posteriors[variables]
+            total: float = float(joint.values.sum())
+            value: float = float(joint.values[tuple(prob[v] for v in variables)])
+            result.append(value / total if total != 0.0 else 0.0)
         return result
 
+    def _budgetKey(self, steps: int) -> str:
+        # exact answers do not depend on any sample budget
+        return "exact"
+
     def batchQuery(
         self,
         paramList: List[Tuple[Dict[str, str], Optional[Dict[str, str]]]],
         steps: int = -1,
     ) -> List[float]:
+        if paramList is None or len(paramList) < 1:
+            raise Exception("invalid query params")
         self._prepare()
-        if steps <= 0:
-            steps = self._initSamples
+        paramList = self._planQueries(paramList)
+        encoded: List[Tuple[Dict[int, int], Optional[Dict[int, int]]]] = (
+            self._encodeQueries(paramList)
+        )
+        result: List[float] = [0.0 for _ in range(len(paramList))]
+        for _, indexList in self._doParamListIndexing(paramList).items():
+            evidence: Dict[int, int] = encoded[indexList[0]][1] or dict()
+            for i, value in zip(
+                indexList,
+                self.__queryGroup(evidence, [encoded[i][0] for i in indexList]),
+            ):
+                result[i] = value
+        return result
 
-        indexTable: Dict[str, List[int]] = self.__doParamListIndexing(paramList)
-        probList: List[Dict[str, str]] = [param[0] for param in paramList]
-        conditionList: List[Optional[Dict[str, str]]] = [
-            param[1] for param in paramList
-        ]
 
-        sizeIndexTable: int = len(indexTable)
-        poolSize: int = min(cpu_count() - 1, sizeIndexTable)
-        stepsTable: int = min(2 * 10 ** 6, int(LIMITED_SAMPLES / poolSize))
-        numsTimeSlice = (
-            int(sizeIndexTable / (cpu_count()) - 1) + 1
-            if sizeIndexTable % (cpu_count() - 1)
-            else int(sizeIndexTable / (cpu_count() - 1))
+class JunctionTreeBayesianNetwork(BayesianNetwork):
+    def __init__(self, initializedSamples: int = 0):
+        super().__init__(initializedSamples)
+        self.__tree: Optional[JunctionTree] = None
+
+    def _prepare(self) -> None:
+        if self._isPrepared():
+            return
+        super()._prepare()
+        self.__tree = JunctionTree(
+            self._buildFactors(), dict(enumerate(self._compiled.cardinalities.tolist()))
         )
-        limitTimeSlice = int(90 / numsTimeSlice)
-        taskList: List[Callable[[], Optional[Any]]] = [
-            partial(
-                self.__generateAndQuery,
-                stepsTable,
-                limitTimeSlice,
-                conditionList,
-                probList,
-                indexList,
-            )
-            for _, indexList in indexTable.items()
-        ]
-        pool: ThreadPool = ThreadPool(taskList, poolSize)
-        pool.startAndWait()
 
-        return self.__convertBatchJobResults(pool.result)
+    def _budgetKey(self, steps: int) -> str:
+        return "exact"
+
+    def batchQuery(
+        self,
+        paramList: List[Tuple[Dict[str, str], Optional[Dict[str, str]]]],
+        steps: int = -1,
+    ) -> List[float]:
+        if paramList is None or len(paramList) < 1:
+            raise Exception("invalid query params")
+        self._prepare()
+        paramList = self._planQueries(paramList)
+        encoded: List[Tuple[Dict[int, int], Optional[Dict[int, int]]]] = (
+            self._encodeQueries(paramList)
+        )
+        result: List[float] = [0.0 for _ in range(len(paramList))]
+        indexTable: Dict[str, List[int]] = self._doParamListIndexing(paramList)
+        # neighbouring keys share evidence, so the tree re-propagates less
+        for key in sorted(indexTable):
+            indexList: List[int] = indexTable[key]
+            self.__tree.setEvidence(encoded[indexList[0]][1])
+            marginals: Dict[Tuple[int, ...], Factor] = dict()
+            for i in indexList:
+                prob: Dict[int, int] = encoded[i][0]
+                variables: Tuple[int, ...] = tuple(sorted(prob))
+                if variables not in marginals:
+                    marginals[variables] = self.__tree.marginal(list(variables))
+                result[i] = float(
+                    marginals[variables].values[tuple(prob[v] for v in variables)]
+                )
+        return result
@@ -4,6 +4,7 @@ from common import timeExecute
 from .generator import GenerateRandomProbability
 from .distribution import DiscreteDistribution, ConditionalProbability, Probability
 from typing import (
+    Callable,
     Dict,
     Optional,
     Generic,
@@ -20,39 +21,96 @@ from typing import (
 
 class Node:
     def __init__(self, probTable: Probability) -> None:
-        self.__probTable: Probability = probTable
+        self.__probTable: Optional[Probability] = probTable
+        self.__loader: Optional[Callable[[], Probability]] = None
+
+    @classmethod
+    def lazy(
+        cls, name: str, isCondition: bool, loader: Callable[[], Probability]
+    ) -> "Node":
+        # the probability is only made by loader on first use, until then the
+        # node answers its name, kind and version by itself
+        node: Node = cls.__new__(cls)
+        node.__probTable = None
+        node.__loader = loader
+        node.__name = name
+        node.__isCondition = isCondition
+        return node
+
+    @property
+    def __prob(self) -> Probability:
+        if self.__probTable is None:
+            self.__probTable = self.__loader()
+            self.__loader = None
+        return self.__probTable
 
     @property
     def name(self) -> str:
+        if self.__probTable is None:
+            return self.__name
         return self.__probTable.name
 
     @property
     def features(self) -> List[str]:
-        return self.__probTable.features
+        return self.__prob.features
 
     @property
     def conditions(self) -> List[str]:
-        return self.__probTable.conditions
+        return self.__prob.conditions
+
+    @property
+    def table(self) -> np.array:
+        return self.__prob.table
+
+    @property
+    def version(self) -> int:
+        if self.__probTable is None:
+            return 0
+        return self.__probTable.version
+
+    def setTable(self, table: List[float]) -> None:
+        self.__prob.setTable(table)
 
     def setConditionalFeatures(self, condFeatures: Dict[str, List[str]]) -> None:
-        self.__probTable.setConditionalFeatures(condFeatures)
+        self.__prob.setConditionalFeatures(condFeatures)
 
     def getDistribution(
         self, param: Optional[Dict[str, str]] = None
     ) -> Dict[str, float]:
-        return self.__probTable.getDistribution(param)
+        return self.__prob.getDistribution(param)
 
     def getProbability(
         self, param: Dict[str, str],  feature: str
     ) -> Dict[str, float]:
         if param is None:
             raise Exception("no input param")
-        return self.__probTable.getProbability(param, feature)
+        return self.__prob.getProbability(param, feature)
 
     def generateSample(self, param: Optional[Dict[str, str]] = None):
-        return self.__probTable.generateSample(param)
+        return self.__prob.generateSample(param)
+
+    def sharedArrays(self) -> List[np.array]:
+        return self.__prob.sharedArrays()
+
+    def attachSharedArrays(self, arrays: List[np.array]) -> None:
+        self.__prob.attachSharedArrays(arrays)
+
+    def featureIndex(self, feature: str) -> int:
+        return self.__prob.featureIndex(feature)
+
+    def generateSampleBlock(
+        self, parentColumns: Optional[List[np.array]], rnd: np.array
+    ) -> np.array:
+        return self.__prob.generateSampleBlock(parentColumns, rnd)
+
+    def getProbabilityBlock(
+        self, parentColumns: Optional[List[np.array]], featureIndex: int
+    ) -> np.array:
+        return self.__prob.getProbabilityBlock(parentColumns, featureIndex)
 
     def isCondition(self):
+        if self.__probTable is None:
+            return self.__isCondition
         return isinstance(self.__probTable, ConditionalProbability)
 
     def __str__(self) -> str:
@@ -67,11 +125,22 @@ class Node:
         conditions = None if not format[1] else format[1].split(",")
 
         features = format[2].split(",")
-        if len(format[3]) == 1:
-            shape = (1, int(format[3][0]))
-        else:
-            shape = tuple([int(v) for v in format[3].split(",")])
-        probList = [float(v) for v in format[4].split(",")]
+        shape = tuple(int(v) for v in format[3].split(","))
+        if conditions is None:
+            if len(shape) != 1:
+                raise Exception("shape {} of root node {} has parents".format(shape, name))
+            shape = (1,) + shape
+        if shape[-1] != len(features):
+            raise Exception(
+                "shape {} of node {} does not match its {} features".format(
+                    shape, name, len(features)
+                )
+            )
+        # converted in C rather than one float() per value
+        try:
+            probList = np.array(format[4].split(","), dtype=np.float64)
+        except ValueError:
+            raise Exception("Incorrect probabilities of node {}".format(name))
         if conditions is None:
             prob = DiscreteDistribution(name, probList, shape, features)
         else:
@@ -1,5 +1,7 @@
 import os
 from .nodes import Node
+from .network import BayesianNetwork
+from .tables import ModelTables
 from typing import (
     Dict,
     Optional,
@@ -51,31 +53,62 @@ class ModelParser(TxtParser):
     def __init__(self, filePath: str) -> None:
         super().__init__(filePath)
         self.__numOfNodes: int = 0
-        self.__nodes: Dict[str, Node] = dict()
+        self.__model: Optional[ModelTables] = None
+        self.__nodes: Optional[Dict[str, Node]] = None
 
     def getNumberOfNodes(self) -> int:
         return self.__numOfNodes
 
     def parse(self) -> None:
-        lines: List[str] = self.readLines()
-        self.__numOfNodes = int(lines[0])
-        if self.__numOfNodes < 2 or self.__numOfNodes > 999:
+        # streamed line by line into flat buffers of raw fields, the numbers
+        # of all nodes are parsed and checked together by ModelTables
+        lines: Generator[str, None, None] = self.readLine()
+        header: Optional[str] = next(lines, None)
+        if header is None:
+            raise Exception("Model file is empty")
+        self.__numOfNodes = int(header)
+        if self.__numOfNodes < 2:
             raise Exception(
                 "Don't support number of nodes: {}".format(self.__numOfNodes)
             )
-        if self.__numOfNodes != (len(lines) - 1):
+        fields: List[List[str]] = [list() for _ in range(5)]
+        for line in lines:
+            if not line:
+                continue
+            format: List[str] = line.strip().split(";")
+            if len(format) != 5:
+                raise Exception("Incorrect format line txt")
+            for buffer, field in zip(fields, format):
+                buffer.append(field)
+        if self.__numOfNodes != len(fields[0]):
             raise Exception(
                 "numofnode: {} != len(line): {}".format(
-                    self.__numOfNodes, len(lines) - 1
+                    self.__numOfNodes, len(fields[0])
                 )
             )
-        for line in lines[1:]:
-            node: Node = Node.fromTxt(line)
-            self.__nodes[node.name] = node
+        self.__model = ModelTables(*fields)
+        self.__nodes = None
+
+    def getModel(self) -> ModelTables:
+        if self.__model is None:
+            raise Exception("Model file is not parsed")
+        return self.__model
 
     def getNodes(self) -> Dict[str, Node]:
+        # made on demand, building a network does not need them
+        if self.__nodes is None:
+            self.__nodes = {node.name: node for node in self.getModel().nodes()}
         return self.__nodes
 
+    def buildNetwork(self, network: BayesianNetwork) -> BayesianNetwork:
+        return buildNetwork(self.getModel(), network)
+
+
+def buildNetwork(model: ModelTables, network: BayesianNetwork) -> BayesianNetwork:
+    # every node goes in, roots without children too, with the network
+    # compiled straight from the flat tables
+    return model.buildNetwork(network)
+
 
 class TestParser(TxtParser):
     def __init__(self, filePath: str) -> None:
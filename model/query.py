@@ -0,0 +1,212 @@
+import numpy as np
+from functools import reduce
+from .samples import SampleStore
+from typing import (
+    Dict,
+    Optional,
+    FrozenSet,
+    List,
+    Tuple,
+    Callable,
+)
+
+JOINT_TABLE_LIMIT = 1 << 16
+
+Atom = Tuple[int, int]
+EncodedQuery = Tuple[Dict[int, int], Optional[Dict[int, int]]]
+
+
+class BatchQueryExecutor:
+    def __init__(
+        self,
+        queries: List[EncodedQuery],
+        cardinalities: List[int],
+        weighted: bool = False,
+        secondMoments: bool = False,
+    ) -> None:
+        if queries is None or len(queries) < 1:
+            raise Exception("invalid query params")
+        self.__weighted: bool = weighted
+        # sums of squared weights, only needed for weighted interval estimates
+        self.__secondMoments: bool = weighted and secondMoments
+        self.__probAtoms: List[FrozenSet[Atom]] = []
+        self.__evidenceKeys: List[Optional[FrozenSet[Atom]]] = []
+        for prob, evidence in queries:
+            self.__probAtoms.append(frozenset(prob.items()))
+            self.__evidenceKeys.append(
+                None if not evidence else frozenset(evidence.items())
+            )
+        self.__atoms: List[Atom] = sorted(
+            set().union(*self.__probAtoms, *[k for k in self.__evidenceKeys if k])
+        )
+        self.__positions: List[int] = sorted({p for p, _ in self.__atoms})
+        self.__shape: Tuple[int, ...] = tuple(cardinalities[p] for p in self.__positions)
+        jointSize: int = reduce(lambda x, y: x * y, self.__shape, 1)
+        self.__useJointTable: bool = jointSize <= JOINT_TABLE_LIMIT
+        self.__strides: List[int] = [
+            reduce(lambda x, y: x * y, self.__shape[i + 1 :], 1)
+            for i in range(len(self.__shape))
+        ]
+        dtype = np.float64 if weighted else np.int64
+        self.__joint: np.array = np.zeros(
+            jointSize if self.__useJointTable else 0, dtype=dtype
+        )
+        self.__numerators: np.array = np.zeros(len(queries), dtype=dtype)
+        self.__denominators: np.array = np.zeros(len(queries), dtype=dtype)
+        self.__jointSquares: np.array = np.zeros(
+            len(self.__joint) if self.__secondMoments else 0
+        )
+        self.__numeratorSquares: np.array = np.zeros(len(queries))
+        self.__denominatorSquares: np.array = np.zeros(len(queries))
+        self.__evaluated: bool = True
+
+    def __len__(self) -> int:
+        return len(self.__probAtoms)
+
+    def accumulate(self, samples: SampleStore, weights: Optional[np.array] = None) -> None:
+        if len(samples) == 0:
+            return
+        if self.__weighted and weights is None:
+            raise Exception("weighted executor needs sample weights")
+        if self.__useJointTable:
+            code: np.array = np.zeros(len(samples), dtype=np.intp)
+            for position, stride in zip(self.__positions, self.__strides):
+                code += samples.columnAt(position).astype(np.intp) * stride
+            self.__joint += np.bincount(
+                code, weights=weights, minlength=len(self.__joint)
+            ).astype(self.__joint.dtype)
+            if self.__secondMoments:
+                self.__jointSquares += np.bincount(
+                    code, weights=weights * weights, minlength=len(self.__joint)
+                )
+            self.__evaluated = False
+            return
+        atomMask: Callable[[Atom], np.array] = (
+            lambda atom: samples.columnAt(atom[0]) == atom[1]
+        )
+        numerators, denominators = self.__countQueries(atomMask, weights, len(samples))
+        self.__numerators += numerators
+        self.__denominators += denominators
+        if self.__secondMoments:
+            squared: np.array = weights * weights
+            numerators, denominators = self.__countQueries(
+                atomMask, squared, squared.sum()
+            )
+            self.__numeratorSquares += numerators
+            self.__denominatorSquares += denominators
+
+    def __jointAtomMask(self, configurations: np.array, atom: Atom) -> np.array:
+        k: int = self.__positions.index(atom[0])
+        return (configurations // self.__strides[k]) % self.__shape[k] == atom[1]
+
+    def __evaluateJointTable(self) -> None:
+        if self.__evaluated:
+            return
+        configurations: np.array = np.arange(len(self.__joint))
+        self.__numerators, self.__denominators = self.__countQueries(
+            lambda atom: self.__jointAtomMask(configurations, atom),
+            self.__joint,
+            self.__joint.sum(),
+        )
+        if self.__secondMoments:
+            self.__numeratorSquares, self.__denominatorSquares = self.__countQueries(
+                lambda atom: self.__jointAtomMask(configurations, atom),
+                self.__jointSquares,
+                self.__jointSquares.sum(),
+            )
+        self.__evaluated = True
+
+    def __countQueries(
+        self,
+        atomMask: Callable[[Atom], np.array],
+        weights: Optional[np.array],
+        total,
+    ) -> Tuple[np.array, np.array]:
+        # every distinct atom and evidence set is evaluated once per call
+        atomMasks: Dict[Atom, np.array] = {atom: atomMask(atom) for atom in self.__atoms}
+        evidenceMasks: Dict[FrozenSet[Atom], np.array] = dict()
+        for key in self.__evidenceKeys:
+            if key and key not in evidenceMasks:
+                evidenceMasks[key] = reduce(np.logical_and, [atomMasks[a] for a in key])
+
+        def measure(mask: np.array):
+            if weights is None:
+                return np.count_nonzero(mask)
+            return weights[mask].sum()
+
+        numerators: np.array = np.zeros(len(self), dtype=self.__numerators.dtype)
+        denominators: np.array = np.zeros(len(self), dtype=self.__numerators.dtype)
+        evidenceTotals: Dict[FrozenSet[Atom], float] = dict()
+        for i, (probAtoms, key) in enumerate(zip(self.__probAtoms, self.__evidenceKeys)):
+            masks: List[np.array] = [atomMasks[a] for a in probAtoms]
+            if key:
+                masks.append(evidenceMasks[key])
+                if key not in evidenceTotals:
+                    evidenceTotals[key] = measure(evidenceMasks[key])
+                denominators[i] = evidenceTotals[key]
+            else:
+                denominators[i] = total
+            numerators[i] = (
+                measure(reduce(np.logical_and, masks)) if masks else denominators[i]
+            )
+        return numerators, denominators
+
+    @property
+    def numerators(self) -> np.array:
+        if self.__useJointTable:
+            self.__evaluateJointTable()
+        return self.__numerators
+
+    @property
+    def denominators(self) -> np.array:
+        if self.__useJointTable:
+            self.__evaluateJointTable()
+        return self.__denominators
+
+    def counts(self) -> List[Tuple[int, int]]:
+        return [
+            (n.item(), d.item()) for n, d in zip(self.numerators, self.denominators)
+        ]
+
+    def estimates(self) -> List[float]:
+        return [n / d if d != 0 else 0.0 for n, d in self.counts()]
+
+    def variances(self) -> np.array:
+        # delta-method variance of the ratio estimator sum(w * q) / sum(w);
+        # with unit weights this is the binomial p * (1 - p) / n
+        numerators: np.array = self.numerators.astype(np.float64)
+        denominators: np.array = self.denominators.astype(np.float64)
+        if not self.__weighted:
+            numeratorSquares, denominatorSquares = numerators, denominators
+        elif self.__secondMoments:
+            numeratorSquares = self.__numeratorSquares
+            denominatorSquares = self.__denominatorSquares
+        else:
+            raise Exception("executor does not track second moments")
+        result: np.array = np.full(len(self), np.inf)
+        seen: np.array = denominators > 0
+        p: np.array = numerators[seen] / denominators[seen]
+        result[seen] = (
+            numeratorSquares[seen] * (1.0 - 2.0 * p) + denominatorSquares[seen] * p * p
+        ) / (denominators[seen] ** 2)
+        return result
+
+    def effectiveSamples(self) -> np.array:
+        denominators: np.array = self.denominators.astype(np.float64)
+        if not self.__weighted:
+            return denominators
+        if not self.__secondMoments:
+            raise Exception("executor does not track second moments")
+        result: np.array = np.zeros(len(self))
+        seen: np.array = self.__denominatorSquares > 0
+        result[seen] = denominators[seen] ** 2 / self.__denominatorSquares[seen]
+        return result
+
+    def halfWidths(self, z: float) -> np.array:
+        # the normal interval collapses to zero width while an estimate sits at
+        # 0 or 1, so the Agresti-Coull variance is used as a floor
+        ess: np.array = self.effectiveSamples()
+        estimates: np.array = np.array(self.estimates())
+        adjusted: np.array = (estimates * ess + z * z / 2) / (ess + z * z)
+        floor: np.array = adjusted * (1.0 - adjusted) / (ess + z * z)
+        return z * np.sqrt(np.maximum(self.variances(), floor))
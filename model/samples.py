@@ -0,0 +1,148 @@
+import numpy as np
+from typing import (
+    Dict,
+    Optional,
+    Generator,
+    List,
+    Tuple,
+)
+
+
+def smallestDtype(cardinality: int) -> np.dtype:
+    if cardinality < 1:
+        raise Exception("invalid cardinality: {}".format(cardinality))
+    return np.min_scalar_type(cardinality - 1)
+
+
+class SampleStore:
+    def __init__(
+        self,
+        names: List[str],
+        features: List[List[str]],
+        nSamples: int,
+        columns: Optional[List[np.array]] = None,
+    ) -> None:
+        if len(names) != len(features):
+            raise Exception(
+                "number of names ({}) != number of features ({})".format(
+                    len(names), len(features)
+                )
+            )
+        self.__names: List[str] = list(names)
+        self.__features: List[List[str]] = [list(f) for f in features]
+        self.__columnTable: Dict[str, int] = {
+            name: position for position, name in enumerate(self.__names)
+        }
+        self.__featureTables: List[Dict[str, int]] = [
+            {val: index for index, val in enumerate(f)} for f in self.__features
+        ]
+        if columns is None:
+            columns = [np.empty(nSamples, dtype=smallestDtype(len(f))) for f in features]
+        if len(columns) != len(names):
+            raise Exception("number of columns does not match number of names")
+        self.__columns: List[np.array] = columns
+        self.__nSamples: int = nSamples
+
+    def __len__(self) -> int:
+        return self.__nSamples
+
+    @property
+    def names(self) -> List[str]:
+        return list(self.__names)
+
+    @property
+    def columnTable(self) -> Dict[str, int]:
+        return self.__columnTable
+
+    @property
+    def nbytes(self) -> int:
+        return sum(column.nbytes for column in self.__columns)
+
+    def position(self, name: str) -> int:
+        if name not in self.__columnTable:
+            raise Exception("Failed to get item {} in the store".format(name))
+        return self.__columnTable[name]
+
+    def column(self, name: str) -> np.array:
+        return self.__columns[self.position(name)]
+
+    def columnAt(self, position: int) -> np.array:
+        return self.__columns[position]
+
+    def encode(self, name: str, feature: str) -> int:
+        table: Dict[str, int] = self.__featureTables[self.position(name)]
+        if feature not in table:
+            raise Exception("feature {} not found in node {}".format(feature, name))
+        return table[feature]
+
+    def encodeState(self, state: Optional[Dict[str, str]]) -> Dict[int, int]:
+        if state is None:
+            return dict()
+        return {
+            self.position(name): self.encode(name, feature)
+            for name, feature in state.items()
+        }
+
+    def mask(self, filters: Dict[str, str]) -> np.array:
+        result: np.array = np.ones(self.__nSamples, dtype=bool)
+        for position, index in self.encodeState(filters).items():
+            result &= self.__columns[position] == index
+        return result
+
+    def select(self, mask: np.array) -> "SampleStore":
+        columns: List[np.array] = [column[mask] for column in self.__columns]
+        return SampleStore(
+            self.__names, self.__features, len(columns[0]) if columns else 0, columns
+        )
+
+    def truncate(self, nSamples: int) -> "SampleStore":
+        if nSamples >= self.__nSamples:
+            return self
+        return SampleStore(
+            self.__names,
+            self.__features,
+            nSamples,
+            [column[:nSamples] for column in self.__columns],
+        )
+
+    def window(self, start: int, end: int) -> "SampleStore":
+        # rows [start, end) as views, no copy is made
+        end = min(end, self.__nSamples)
+        return SampleStore(
+            self.__names,
+            self.__features,
+            max(0, end - start),
+            [column[start:end] for column in self.__columns],
+        )
+
+    def extend(self, other: "SampleStore") -> "SampleStore":
+        if sorted(other.names) != sorted(self.__names):
+            raise Exception("cannot extend samples with different columns")
+        return SampleStore(
+            self.__names,
+            self.__features,
+            self.__nSamples + len(other),
+            [
+                np.concatenate([column, other.column(name)])
+                for name, column in zip(self.__names, self.__columns)
+            ],
+        )
+
+    def decode(self, index: int) -> Dict[str, str]:
+        return {
+            name: self.__features[position][self.__columns[position][index]]
+            for position, name in enumerate(self.__names)
+        }
+
+    def records(self) -> Generator[Dict[str, str], None, None]:
+        decoded: List[np.array] = [
+            np.array(features, dtype=object)[column]
+            for features, column in zip(self.__features, self.__columns)
+        ]
+        for values in zip(*decoded):
+            yield dict(zip(self.__names, values))
+
+    def __str__(self) -> str:
+        return "SampleStore(samples: {}, columns: {}, bytes: {})".format(
+            self.__nSamples, self.__names, self.nbytes
+        )
@@ -0,0 +1,40 @@
+import numpy as np
+import zlib
+
+DEFAULT_SEED = 0
+
+
+class RandomStreams:
+    def __init__(self, seed: int = DEFAULT_SEED, stream: int = 0) -> None:
+        if seed < 0 or stream < 0:
+            raise Exception("invalid random streams, seed: {}, stream: {}".format(seed, stream))
+        self.__seed: int = seed
+        self.__stream: int = stream
+
+    @property
+    def seed(self) -> int:
+        return self.__seed
+
+    @property
+    def stream(self) -> int:
+        return self.__stream
+
+    def substream(self, stream: int) -> "RandomStreams":
+        return RandomStreams(self.__seed, stream)
+
+    def keyed(self, key: str) -> "RandomStreams":
+        # crc32 rather than the salted built-in hash, a key has to map to the
+        # same stream in every run and every worker
+        return self.substream(zlib.crc32(key.encode("utf-8")))
+
+    def chunk(self, index: int) -> np.random.Generator:
+        # every (stream, chunk) pair owns an independent Philox key, so a chunk
+        # draws the same numbers whichever worker happens to generate it
+        return np.random.Generator(
+            np.random.Philox(
+                np.random.SeedSequence(self.__seed, spawn_key=(self.__stream, index))
+            )
+        )
+
+    def __str__(self) -> str:
+        return "RandomStreams(seed: {}, stream: {})".format(self.__seed, self.__stream)
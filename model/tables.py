@@ -0,0 +1,301 @@
+import warnings
+import numpy as np
+from functools import partial
+from .nodes import Node
+from .compiled import CompiledNetwork, readOnly
+from .samples import smallestDtype
+from .distribution import (
+    ALIAS_MIN_CARDINALITY,
+    ConditionalProbability,
+    DiscreteDistribution,
+    buildAliasTable,
+    unnormalizedRows,
+)
+from typing import (
+    Any,
+    Dict,
+    List,
+    Tuple,
+)
+
+
+class ModelTables:
+    # a parsed model kept as flat buffers in file order: every CPT in one
+    # float array and the parents in CSR form. Every check runs on whole
+    # arrays once all nodes are known, Probability objects are only made when
+    # a network is built from the tables
+    def __init__(
+        self,
+        names: List[str],
+        conditions: List[str],
+        features: List[str],
+        shapes: List[str],
+        probabilities: List[str],
+    ) -> None:
+        self.__names: List[str] = names
+        columnTable: Dict[str, int] = {name: i for i, name in enumerate(names)}
+        if len(columnTable) != len(names):
+            seen: Dict[str, int] = dict()
+            for name in names:
+                if name in seen:
+                    raise Exception("Node {} is defined twice".format(name))
+                seen[name] = 1
+        self.__codebooks: List[List[str]] = [f.split(",") for f in features]
+        parentNames: List[List[str]] = [c.split(",") if c else [] for c in conditions]
+        for name, parents in zip(names, parentNames):
+            for parent in parents:
+                if parent not in columnTable:
+                    raise Exception(
+                        "parent {} of node {} is not defined".format(parent, name)
+                    )
+        parentCounts: np.array = np.array([len(p) for p in parentNames], dtype=np.intp)
+        self.__parentPtr: np.array = np.concatenate(([0], np.cumsum(parentCounts)))
+        self.__parentIndex: np.array = np.array(
+            [columnTable[parent] for parents in parentNames for parent in parents],
+            dtype=np.intp,
+        )
+
+        dims, dimCounts = self.__parseNumbers(
+            shapes, np.intp, "Incorrect shape of node {}"
+        )
+        self.__check(
+            dimCounts != parentCounts + 1,
+            "shape of node {} does not match its conditions",
+        )
+        dimPtr: np.array = np.concatenate(([0], np.cumsum(dimCounts)))
+        self.__check(
+            np.minimum.reduceat(dims, dimPtr[:-1]) < 1, "Incorrect shape of node {}"
+        )
+        self.__cardinalities: np.array = dims[dimPtr[1:] - 1]
+        self.__check(
+            self.__cardinalities != [len(c) for c in self.__codebooks],
+            "shape of node {} does not match its features",
+        )
+        parentDims: np.array = np.delete(dims, dimPtr[1:] - 1)
+        badEdges: np.array = np.flatnonzero(
+            parentDims != self.__cardinalities[self.__parentIndex]
+        )
+        if len(badEdges) > 0:
+            node: int = np.searchsorted(self.__parentPtr, badEdges[0], side="right") - 1
+            raise Exception(
+                "shape of node {} does not match its parents".format(names[node])
+            )
+
+        self.__values, counts = self.__parseNumbers(
+            probabilities, np.float64, "Incorrect probabilities of node {}"
+        )
+        sizes: np.array = np.multiply.reduceat(dims, dimPtr[:-1])
+        self.__check(
+            counts != sizes, "Don't match between length of table and shape of node {}"
+        )
+        self.__offsets: np.array = np.concatenate(([0], np.cumsum(sizes)))
+        self.__rows: np.array = sizes // self.__cardinalities
+        rowPtr: np.array = np.concatenate(([0], np.cumsum(self.__rows)))
+        rowStarts: np.array = np.concatenate(
+            ([0], np.cumsum(np.repeat(self.__cardinalities, self.__rows))[:-1])
+        )
+        badRows: np.array = unnormalizedRows(np.add.reduceat(self.__values, rowStarts))
+        if len(badRows) > 0:
+            node = np.searchsorted(rowPtr, badRows[0], side="right") - 1
+            raise Exception("Incorrect probability of node {}".format(names[node]))
+        self.__order: np.array = self.__topologicalOrder(parentCounts)
+
+    def __len__(self) -> int:
+        return len(self.__names)
+
+    @property
+    def names(self) -> List[str]:
+        return self.__names
+
+    def __check(self, bad: np.array, message: str) -> None:
+        nodes: np.array = np.flatnonzero(bad)
+        if len(nodes) > 0:
+            raise Exception(message.format(self.__names[nodes[0]]))
+
+    def __parseNumbers(
+        self, texts: List[str], dtype: Any, message: str
+    ) -> Tuple[np.array, np.array]:
+        # one parse in C over the joined text instead of one per line
+        counts: np.array = np.array(
+            [text.count(",") + 1 for text in texts], dtype=np.intp
+        )
+        with warnings.catch_warnings():
+            # a token that is not a number stops the parse early
+            warnings.simplefilter("error", DeprecationWarning)
+            try:
+                values: np.array = np.fromstring(",".join(texts), dtype=dtype, sep=",")
+                if len(values) == counts.sum():
+                    return values, counts
+            except (ValueError, DeprecationWarning):
+                pass
+            for name, text, count in zip(self.__names, texts, counts):
+                try:
+                    if len(np.fromstring(text, dtype=dtype, sep=",")) != count:
+                        raise ValueError
+                except (ValueError, DeprecationWarning):
+                    raise Exception(message.format(name))
+        raise Exception(message.format(self.__names[0]))
+
+    def __topologicalOrder(self, parentCounts: np.array) -> np.array:
+        # Kahn's algorithm a whole level at a time on the CSR arrays
+        n: int = len(self.__names)
+        edgeChildren: np.array = np.repeat(np.arange(n), parentCounts)
+        children: np.array = edgeChildren[np.argsort(self.__parentIndex, kind="stable")]
+        childPtr: np.array = np.concatenate(
+            ([0], np.cumsum(np.bincount(self.__parentIndex, minlength=n)))
+        )
+        inDegrees: np.array = parentCounts.copy()
+        frontier: np.array = np.flatnonzero(inDegrees == 0)
+        levels: List[np.array] = list()
+        while len(frontier) > 0:
+            levels.append(frontier)
+            starts: np.array = childPtr[frontier]
+            lengths: np.array = childPtr[frontier + 1] - starts
+            edges: np.array = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+            reached: np.array = children[edges + np.arange(len(edges))]
+            np.subtract.at(inDegrees, reached, 1)
+            frontier = np.unique(reached[inDegrees[reached] == 0])
+        if sum(len(level) for level in levels) < n:
+            raise Exception(
+                "Graph has a cycle: {}".format(" -> ".join(self.__findCycle(inDegrees)))
+            )
+        return np.concatenate(levels)
+
+    def __findCycle(self, inDegrees: np.array) -> List[str]:
+        # every node left has a parent that is left too
+        v: int = int(np.flatnonzero(inDegrees > 0)[0])
+        path: List[int] = list()
+        seen: Dict[int, int] = dict()
+        while v not in seen:
+            seen[v] = len(path)
+            path.append(v)
+            parents: np.array = self.__parentIndex[
+                self.__parentPtr[v] : self.__parentPtr[v + 1]
+            ]
+            v = int(parents[inDegrees[parents] > 0][0])
+        cycle: List[int] = path[seen[v] :] + [v]
+        cycle.reverse()
+        return [self.__names[i] for i in cycle]
+
+    def __sharedTables(self) -> List[Any]:
+        # a fresh copy for every network: the flat table, its cdf, the cdf of
+        # every node stored state-major as (states, rows), the alias tables
+        # of the nodes with many states and an empty one for the others
+        values: np.array = self.__values.copy()
+        rowCards: np.array = np.repeat(self.__cardinalities, self.__rows)
+        cdf: np.array = np.empty_like(values)
+        elementCards: np.array = np.repeat(rowCards, rowCards)
+        cardinalities: List[int] = np.unique(self.__cardinalities).tolist()
+        for k in cardinalities:
+            mask: np.array = elementCards == k
+            cdf[mask] = np.cumsum(values[mask].reshape(-1, k), axis=1).ravel()
+        sizes: np.array = np.diff(self.__offsets)
+        nodeOf: np.array = np.repeat(np.arange(len(self.__names)), sizes)
+        local: np.array = np.arange(len(values)) - self.__offsets[nodeOf]
+        states: np.array = self.__cardinalities[nodeOf]
+        cdfColumns: np.array = np.empty_like(values)
+        # element (row, state) of a node moves to (state, row)
+        cdfColumns[
+            self.__offsets[nodeOf]
+            + (local % states) * self.__rows[nodeOf]
+            + local // states
+        ] = cdf
+        aliasTables: Dict[int, Tuple[np.array, np.array]] = dict()
+        aliasNodes: np.array = np.flatnonzero(self.__cardinalities >= ALIAS_MIN_CARDINALITY)
+        for node in aliasNodes.tolist():
+            k: int = int(self.__cardinalities[node])
+            rows: np.array = values[
+                self.__offsets[node] : self.__offsets[node + 1]
+            ].reshape(-1, k)
+            thresholds: np.array = np.ones(rows.shape)
+            indices: np.array = np.zeros(rows.shape, dtype=smallestDtype(k))
+            for row in range(len(rows)):
+                thresholds[row], indices[row] = buildAliasTable(rows[row])
+            aliasTables[node] = (thresholds, indices)
+        emptyTables: Dict[int, Tuple[np.array, np.array]] = {
+            k: (np.ones((0, k)), np.zeros((0, k), dtype=smallestDtype(k)))
+            for k in cardinalities
+        }
+        return [values, cdf, cdfColumns, aliasTables, emptyTables]
+
+    def __nodeArrays(self, tables: List[Any], node: int) -> List[np.array]:
+        # the arrays of Probability.sharedArrays, tables shaped (rows, states)
+        values, cdf, cdfColumns, aliasTables, emptyTables = tables
+        start, end = self.__offsets[node], self.__offsets[node + 1]
+        k: int = int(self.__cardinalities[node])
+        rows: int = int(self.__rows[node])
+        thresholds, indices = aliasTables.get(node, emptyTables[k])
+        return [
+            values[start:end].reshape(rows, k),
+            cdf[start:end].reshape(rows, k),
+            cdfColumns[start:end].reshape(k, rows),
+            thresholds,
+            indices,
+        ]
+
+    def __probability(self, tables: List[Any], node: int) -> Any:
+        arrays: List[np.array] = self.__nodeArrays(tables, node)
+        parents: List[int] = self.__parentIndex[
+            self.__parentPtr[node] : self.__parentPtr[node + 1]
+        ].tolist()
+        if not parents:
+            return DiscreteDistribution.fromSharedArrays(
+                self.__names[node], self.__codebooks[node], None, arrays
+            )
+        shape: Tuple[int, ...] = tuple(
+            int(self.__cardinalities[p]) for p in parents
+        ) + (int(self.__cardinalities[node]),)
+        arrays[0] = arrays[0].reshape(shape)
+        arrays[1] = arrays[1].reshape(shape)
+        prob: ConditionalProbability = ConditionalProbability.fromSharedArrays(
+            self.__names[node],
+            self.__codebooks[node],
+            [self.__names[p] for p in parents],
+            arrays,
+        )
+        prob.setConditionalFeatures(
+            {self.__names[p]: self.__codebooks[p] for p in parents}
+        )
+        return prob
+
+    def __nodes(self, tables: List[Any]) -> List[Node]:
+        conditional: List[bool] = (np.diff(self.__parentPtr) > 0).tolist()
+        return [
+            Node.lazy(name, isCondition, partial(self.__probability, tables, node))
+            for node, (name, isCondition) in enumerate(zip(self.__names, conditional))
+        ]
+
+    def nodes(self) -> List[Node]:
+        # nodes over a fresh copy of the tables, in file order; the
+        # Probability of a node is only made on its first use
+        return self.__nodes(self.__sharedTables())
+
+    def buildNetwork(self, network: Any) -> Any:
+        # the compiled columns are read-only views of the same buffers the
+        # nodes wrap, in the topological order found by the parse
+        tables: List[Any] = self.__sharedTables()
+        nodes: List[Node] = self.__nodes(tables)
+        frozen: List[Any] = [readOnly(a) for a in tables[:3]] + [
+            {key: tuple(readOnly(a) for a in pair) for key, pair in table.items()}
+            for table in tables[3:]
+        ]
+        order: List[int] = self.__order.tolist()
+        position: np.array = np.empty(len(order), dtype=np.intp)
+        position[self.__order] = np.arange(len(order))
+        parents: List[np.array] = np.split(
+            position[self.__parentIndex], self.__parentPtr[1:-1]
+        )
+        arrays: List[List[np.array]] = [self.__nodeArrays(frozen, i) for i in order]
+        network.addCompiled(
+            [nodes[i] for i in order],
+            CompiledNetwork.fromTables(
+                [self.__names[i] for i in order],
+                [self.__codebooks[i] for i in order],
+                [parents[i] for i in order],
+                [a[0] for a in arrays],
+                [a[2] for a in arrays],
+                [a[3] for a in arrays],
+                [a[4] for a in arrays],
+            ),
+        )
+        return network
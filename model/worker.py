@@ -0,0 +1,102 @@
+import numpy as np
+from multiprocessing.sharedctypes import RawArray
+from functools import reduce
+from .nodes import Node
+from .distribution import ConditionalProbability, DiscreteDistribution
+from typing import (
+    Dict,
+    Optional,
+    List,
+    Tuple,
+    Any,
+    Callable,
+)
+
+Layout = List[Tuple[int, Tuple[int, ...], str]]
+NodeSpec = Tuple[str, List[str], Optional[List[str]], int]
+
+# network rebuilt once in every worker process by initWorker
+_network: Optional[Any] = None
+
+
+def allocateArrays(
+    shapes: List[Tuple[int, ...]], dtypes: List[Any]
+) -> Tuple[Any, Layout]:
+    # arrays are packed byte-wise, each starting on an 8-byte boundary
+    layout: Layout = list()
+    offset: int = 0
+    for shape, dtype in zip(shapes, dtypes):
+        dtype = np.dtype(dtype)
+        layout.append((offset, tuple(shape), dtype.str))
+        offset += -(-reduce(lambda x, y: x * y, shape, 1) * dtype.itemsize // 8) * 8
+    return RawArray("b", max(1, offset)), layout
+
+
+def publishArrays(arrays: List[np.array]) -> Tuple[Any, Layout]:
+    buffer, layout = allocateArrays(
+        [array.shape for array in arrays], [array.dtype for array in arrays]
+    )
+    for array, shared in zip(arrays, attachArrays(buffer, layout)):
+        shared[...] = array
+    return buffer, layout
+
+
+def attachArrays(buffer: Any, layout: Layout) -> List[np.array]:
+    arrays: List[np.array] = list()
+    for start, shape, dtype in layout:
+        size: int = reduce(lambda x, y: x * y, shape, 1)
+        arrays.append(
+            np.frombuffer(buffer, dtype=dtype, count=size, offset=start).reshape(shape)
+        )
+    return arrays
+
+
+def describeNode(node: Node) -> NodeSpec:
+    return (
+        node.name,
+        node.features,
+        node.conditions if node.isCondition() else None,
+        len(node.sharedArrays()),
+    )
+
+
+def initWorker(
+    factory: Callable[[], Any],
+    specs: List[NodeSpec],
+    buffer: Any,
+    layout: Layout,
+    *shared: Any,
+) -> None:
+    global _network
+    arrays: List[np.array] = attachArrays(buffer, layout)
+    nodes: Dict[str, Node] = dict()
+    cursor: int = 0
+    for name, features, conditions, count in specs:
+        # the tables were checked and built by the parent, they are only wrapped
+        shared: List[np.array] = arrays[cursor : cursor + count]
+        cursor += count
+        if conditions is None:
+            prob = DiscreteDistribution.fromSharedArrays(name, features, None, shared)
+        else:
+            prob = ConditionalProbability.fromSharedArrays(
+                name, features, conditions, shared
+            )
+            prob.setConditionalFeatures({c: nodes[c].features for c in conditions})
+        nodes[name] = Node.fromSample(prob)
+
+    _network = factory()
+    for node in nodes.values():
+        _network.addNewNode(node)
+    _network.addPaths(
+        (nodes[condition], node)
+        for node in nodes.values()
+        if node.isCondition()
+        for condition in node.conditions
+    )
+    _network._prepare()
+    _network._attachShared(*shared)
+
+
+def runTask(task: Tuple[str, Tuple]) -> Any:
+    method, args = task
+    return getattr(_network, method)(*args)
@@ -8,21 +8,60 @@ def main():
     print("Running unit test for Adjacency matrix class")
     runner.run(test.AdjacencyMatrixTestSuite())
 
+    print("Running unit test for Adjacency list class")
+    runner.run(test.AdjacencyListTestSuite())
+
+    print("Running unit test for Frozen graph")
+    runner.run(test.FrozenGraphTestSuite())
+
+    print("Running unit test for Graph views")
+    runner.run(test.GraphViewTestSuite())
+
     print("Running unit test for Stack class")
     runner.run(test.StackTestSuite())
 
     print("Running unit test for Queue class")
     runner.run(test.QueueTestSuite())
 
+    print("Running unit test for LRU Cache")
+    runner.run(test.LRUCacheTestSuite())
+
+    print("Running unit test for Result Cache")
+    runner.run(test.ResultCacheTestSuite())
+
+    print("Running unit test for Process Pool")
+    runner.run(test.ProcessPoolTestSuite())
+
     print("Running unit test for Topo Sort Algorithm")
     runner.run(test.TopoSortTestSuite())
 
+    print("Running unit test for Bayes Ball Algorithm")
+    runner.run(test.BayesBallTestSuite())
+
+    print("Running unit test for Reachability index")
+    runner.run(test.ReachabilityIndexTestSuite())
+
     print("Running unit test for Generator")
     runner.run(test.GeneratorTestSuite())
 
     print("Running unit test for Distribution")
     runner.run(test.DistributionTestSuite())
 
+    print("Running unit test for Bayesian Network")
+    runner.run(test.NetworkTestSuite())
+
+    print("Running unit test for Model parser")
+    runner.run(test.ModelParserTestSuite())
+
+    print("Running unit test for Batch Query Executor")
+    runner.run(test.QueryTestSuite())
+
+    print("Running unit test for Factor")
+    runner.run(test.FactorTestSuite())
+
+    print("Running unit test for Junction Tree")
+    runner.run(test.JunctionTreeTestSuite())
+
 
 if __name__ == "__main__":
     main()
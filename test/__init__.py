@@ -1,6 +1,19 @@
 from .adjacency_matrix_test import AdjacencyMatrixTestSuite
+from .adjacency_list_test import AdjacencyListTestSuite
+from .frozen_graph_test import FrozenGraphTestSuite
+from .views_test import GraphViewTestSuite
 from .stack_test import StackTestSuite
 from .queue_test import QueueTestSuite
 from .topo_sort_test import TopoSortTestSuite
+from .bayes_ball_test import BayesBallTestSuite
+from .reachability_test import ReachabilityIndexTestSuite
 from .generator_test import GeneratorTestSuite
 from .distribution_test import DistributionTestSuite
+from .network_test import NetworkTestSuite
+from .query_test import QueryTestSuite
+from .factor_test import FactorTestSuite
+from .junction_tree_test import JunctionTreeTestSuite
+from .process_pool_test import ProcessPoolTestSuite
+from .lru_cache_test import LRUCacheTestSuite
+from .result_cache_test import ResultCacheTestSuite
+from .parser_test import ModelParserTestSuite
@@ -0,0 +1,85 @@
+import unittest
+from graph import (
+    AdjacencyList,
+    UnweightedDirectionAdjacencyList,
+    UnweightedIndirectionAdjacencyList,
+)
+from . import adjacency_matrix_test
+
+
+class AdjacencyListTest(adjacency_matrix_test.AdjacencyMatrixTest):
+    graphType = AdjacencyList
+
+    def testDegrees(self) -> None:
+        adj = UnweightedDirectionAdjacencyList(["a", "b", "c"])
+        adj.addPath("a", "b")
+        adj.addPath("a", "c")
+        adj.addPath("a", "c")
+        self.assertEqual(adj.outDegree("a"), 2)
+        self.assertEqual(adj.inDegree("c"), 1)
+        self.assertEqual(adj.numberOfEdges(), 2)
+        adj.deletePath("a", "c")
+        adj.deletePath("a", "c")
+        self.assertEqual(adj.outDegree("a"), 1)
+        self.assertEqual(list(adj.zeroInDegreeVertexes()), ["a", "c"])
+
+    def testIndirection(self) -> None:
+        adj = UnweightedIndirectionAdjacencyList()
+        adj.addPath("a", "b")
+        self.assertEqual(adj.getPath("b", "a"), 1)
+        self.assertEqual([v for v, _ in adj.allPredecessors("a")], ["b"])
+        adj.deletePath("b", "a")
+        self.assertIsNone(adj.getPath("a", "b"))
+        self.assertEqual(adj.numberOfEdges(), 0)
+
+    def testVersion(self) -> None:
+        adj = UnweightedDirectionAdjacencyList()
+        adj.addPath("a", "b")
+        version = adj.version
+        adj.addPath("a", "b")
+        adj.deletePath("b", "a")
+        self.assertEqual(adj.version, version)
+        adj.deletePath("a", "b")
+        self.assertGreater(adj.version, version)
+
+
+def AdjacencyListTestSuite() -> unittest.TestSuite:
+    suite = unittest.TestSuite()
+    suite.addTest(AdjacencyListTest("testAddNode1"))
+    suite.addTest(AdjacencyListTest("testAddNode2"))
+    suite.addTest(AdjacencyListTest("testAddPath1"))
+    suite.addTest(AdjacencyListTest("testAddPath2"))
+    suite.addTest(AdjacencyListTest("testAddPath3"))
+    suite.addTest(AdjacencyListTest("testAddPath4"))
+    suite.addTest(AdjacencyListTest("testAddPath5"))
+    suite.addTest(AdjacencyListTest("testGetPath1"))
+    suite.addTest(AdjacencyListTest("testGetPath2"))
+    suite.addTest(AdjacencyListTest("testGetPath3"))
+    suite.addTest(AdjacencyListTest("testGetPath4"))
+    suite.addTest(AdjacencyListTest("testGetPath5"))
+    suite.addTest(AdjacencyListTest("testGetPath6"))
+    suite.addTest(AdjacencyListTest("testDeletePath1"))
+    suite.addTest(AdjacencyListTest("testDeletePath2"))
+    suite.addTest(AdjacencyListTest("testDeletePath3"))
+    suite.addTest(AdjacencyListTest("testDeletePath4"))
+    suite.addTest(AdjacencyListTest("testDeletePath5"))
+    suite.addTest(AdjacencyListTest("testAllSuccessors1"))
+    suite.addTest(AdjacencyListTest("testAllSuccessors2"))
+    suite.addTest(AdjacencyListTest("testAllSuccessors3"))
+    suite.addTest(AdjacencyListTest("testAllInorderedSuccessors1"))
+    suite.addTest(AdjacencyListTest("testAllInorderedSuccessors2"))
+    suite.addTest(AdjacencyListTest("testAllInorderedSuccessors3"))
+    suite.addTest(AdjacencyListTest("testAllPredecessors1"))
+    suite.addTest(AdjacencyListTest("testAllPredecessors2"))
+    suite.addTest(AdjacencyListTest("testAllPredecessors3"))
+    suite.addTest(AdjacencyListTest("testAllInorderedPredecessors1"))
+    suite.addTest(AdjacencyListTest("testAllInorderedPredecessors2"))
+    suite.addTest(AdjacencyListTest("testAllInorderedPredecessors3"))
+    suite.addTest(AdjacencyListTest("testCheckVertexExist"))
+    suite.addTest(AdjacencyListTest("testZeroInDegreeVertexes"))
+    suite.addTest(AdjacencyListTest("testZeroOutDegreeVertexes"))
+    suite.addTest(AdjacencyListTest("testAllEdges"))
+    suite.addTest(AdjacencyListTest("testDegrees"))
+    suite.addTest(AdjacencyListTest("testIndirection"))
+    suite.addTest(AdjacencyListTest("testVersion"))
+    return suite
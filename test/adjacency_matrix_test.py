@@ -4,8 +4,10 @@ from typing import Any, Optional, List
 
 
 class AdjacencyMatrixTest(unittest.TestCase):
+    graphType = AdjacencyMatrix
+
     def setUp(self) -> None:
-        adj: AdjacencyMatrix = AdjacencyMatrix(
+        adj: AdjacencyMatrix = self.graphType(
             verticesList=[
                 "a",
                 "b",
@@ -0,0 +1,62 @@
+import unittest
+from graph import BayesBallAlgorithm, UnweightedDirectionAdjacencyMatrix
+
+
+class BayesBallTest(unittest.TestCase):
+    def setUp(self) -> None:
+        adj: UnweightedDirectionAdjacencyMatrix = UnweightedDirectionAdjacencyMatrix(
+            verticesList=["D", "I", "G", "S", "L"]
+        )
+        adj.addPath("D", "G")
+        adj.addPath("G", "L")
+        adj.addPath("I", "G")
+        adj.addPath("I", "S")
+        self.__adj = adj
+        self.__ball = BayesBallAlgorithm(adj)
+
+    def testInvalidVertex(self):
+        with self.assertRaises(Exception):
+            self.__ball.dConnected([None], [])
+        with self.assertRaises(Exception):
+            self.__ball.dConnected(["D"], ["None"])
+        with self.assertRaises(Exception):
+            self.__ball.ancestors("None")
+
+    def testDSeparated(self):
+        self.assertTrue(self.__ball.isDSeparated(["D"], ["I"], []))
+        self.assertFalse(self.__ball.isDSeparated(["D"], ["I"], ["G"]))
+        # observing a descendant of the collider also opens it
+        self.assertFalse(self.__ball.isDSeparated(["D"], ["I"], ["L"]))
+        self.assertTrue(self.__ball.isDSeparated(["D"], ["S"], []))
+        self.assertFalse(self.__ball.isDSeparated(["L"], ["S"], []))
+        self.assertTrue(self.__ball.isDSeparated(["L"], ["S"], ["G"]))
+        self.assertTrue(self.__ball.isDSeparated(["L"], ["S"], ["I"]))
+
+    def testDConnected(self):
+        self.assertEqual(self.__ball.dConnected(["D"], []), {"D", "G", "L"})
+        self.assertEqual(self.__ball.dConnected(["D"], ["L"]), {"D", "G", "I", "S"})
+        self.assertEqual(self.__ball.dConnected(["S"], ["I"]), {"S"})
+
+    def testRequisiteEvidence(self):
+        self.assertEqual(self.__ball.requisiteEvidence(["D"], ["L", "S"]), {"L", "S"})
+        self.assertEqual(self.__ball.requisiteEvidence(["L"], ["G", "D"]), {"G"})
+        self.assertEqual(self.__ball.requisiteEvidence(["D"], ["S"]), set())
+
+    def testClosureCache(self):
+        self.assertEqual(self.__ball.ancestors("L"), {"D", "I", "G"})
+        self.assertEqual(self.__ball.descendants("I"), {"G", "S", "L"})
+        self.__adj.addPath("S", "L")
+        self.assertEqual(self.__ball.ancestors("L"), {"D", "I", "G", "S"})
+        self.__adj.deletePath("G", "L")
+        self.assertEqual(self.__ball.ancestors("L"), {"I", "S"})
+        self.assertEqual(self.__ball.descendants("D"), {"G"})
+
+
+def BayesBallTestSuite() -> unittest.TestSuite:
+    suite = unittest.TestSuite()
+    suite.addTest(BayesBallTest("testInvalidVertex"))
+    suite.addTest(BayesBallTest("testDSeparated"))
+    suite.addTest(BayesBallTest("testDConnected"))
+    suite.addTest(BayesBallTest("testRequisiteEvidence"))
+    suite.addTest(BayesBallTest("testClosureCache"))
+    return suite
@@ -1,6 +1,7 @@
 import unittest
 import numpy as np
 from model import ConditionalProbability, DiscreteDistribution
+from model.distribution import buildAliasTable
 
 
 class DistributionTest(unittest.TestCase):
@@ -22,6 +23,16 @@ class DistributionTest(unittest.TestCase):
         with self.assertRaises(Exception):
             _ = DiscreteDistribution("D", [0.6, 0.9], (1, 2), ["Easy", "Hard"])
 
+    def testRowSums(self) -> None:
+        # every row has to sum to one, not just their mean
+        with self.assertRaises(Exception):
+            _ = ConditionalProbability(
+                "S", [0.8, 0.3, 0.2, 0.7], (2, 2), ["Low", "High"], ["I"]
+            )
+        # rounding in the text of a table is tolerated
+        P = DiscreteDistribution("D", [0.7, 0.2, 0.1], (1, 3), ["A", "B", "C"])
+        self.assertEqual(P.getDistribution()["C"], 0.1)
+
     def testDiscreteDistributionGet(self) -> None:
         P = DiscreteDistribution("D", [0.6, 0.4], (1, 2), ["Easy", "Hard"])
         actual = P.getDistribution()
@@ -44,11 +55,99 @@ class DistributionTest(unittest.TestCase):
         expected = {"Weak": 0.99, "Strong": 0.01}
         self.assertEqual(actual, expected)
 
+    def testConditionalProbabilityRowOffset(self) -> None:
+        PG = ConditionalProbability(
+            "G",
+            [0.3, 0.4, 0.3, 0.05, 0.25, 0.7, 0.9, 0.08, 0.02, 0.5, 0.3, 0.2],
+            (2, 2, 3),
+            ["A", "B", "C"],
+            ["D", "I"],
+        )
+        PG.setConditionalFeatures({"D": ["Easy", "Hard"], "I": ["Low", "High"]})
+        # unrelated entries and insertion order of the state do not matter
+        state = {"L": "Weak", "I": "High", "S": "Low", "D": "Hard"}
+        self.assertEqual(PG.rowOffset(state), 3)
+        self.assertEqual(PG.getProbability(state, "A"), 0.5)
+        self.assertEqual(PG.getDistribution({"D": "Easy", "I": "High"})["C"], 0.7)
+        with self.assertRaises(Exception):
+            PG.rowOffset({"D": "Easy"})
+
+    def testDistributionCache(self) -> None:
+        PL = ConditionalProbability(
+            "L", [0.1, 0.9, 0.4, 0.6, 0.99, 0.01], (3, 2), ["Weak", "Strong"], ["G"]
+        )
+        PL.setConditionalFeatures({"G": ["A", "B", "C"]})
+        for feature in ["A", "B", "A", "B", "C"]:
+            PL.getDistribution({"G": feature})
+        self.assertEqual(PL.distributionCache.misses, 3)
+        self.assertEqual(PL.distributionCache.hits, 2)
+
+        PL.setTable([0.2, 0.8, 0.4, 0.6, 0.99, 0.01])
+        self.assertEqual(PL.version, 1)
+        self.assertEqual(len(PL.distributionCache), 0)
+        self.assertEqual(PL.getDistribution({"G": "A"}), {"Weak": 0.2, "Strong": 0.8})
+        with self.assertRaises(Exception):
+            PL.setTable([0.5, 0.6, 0.4, 0.6, 0.99, 0.01])
+
+    def testAliasTable(self) -> None:
+        probs = np.array([0.5, 0.1, 0.0, 0.25, 0.15])
+        threshold, alias = buildAliasTable(probs)
+        mass = threshold.copy()
+        np.add.at(mass, alias, 1.0 - threshold)
+        self.assertTrue(np.allclose(mass / len(probs), probs))
+
+    def testAliasDrawBlock(self) -> None:
+        rng = np.random.default_rng(0)
+        probs = rng.random((2, 40))
+        probs /= probs.sum(axis=1, keepdims=True)
+        probs[:, -1] = 1.0 - probs[:, :-1].sum(axis=1)
+        P = ConditionalProbability(
+            "X", probs.ravel().tolist(), (2, 40), [str(i) for i in range(40)], ["A"]
+        )
+        self.assertTrue(P.usesAlias)
+        rows = rng.integers(0, 2, 400000)
+        states = P.drawBlock(rows, rng.random(400000))
+        for row in range(2):
+            freq = np.bincount(states[rows == row], minlength=40) / np.sum(rows == row)
+            self.assertTrue(np.allclose(freq, probs[row], atol=5e-3))
+
+    def testSmallNodeUsesCdf(self) -> None:
+        P = DiscreteDistribution("D", [0.6, 0.4], (1, 2), ["Easy", "Hard"])
+        self.assertFalse(P.usesAlias)
+        states = P.drawBlock(0, np.array([0.1, 0.6, 0.61, 0.99]))
+        self.assertEqual(states.tolist(), [0, 0, 1, 1])
+
+    def testFromSharedArrays(self) -> None:
+        PL = ConditionalProbability(
+            "L", [0.1, 0.9, 0.4, 0.6, 0.99, 0.01], (3, 2), ["Weak", "Strong"], ["G"]
+        )
+        arrays = PL.sharedArrays()
+        P = ConditionalProbability.fromSharedArrays(
+            "L", ["Weak", "Strong"], ["G"], arrays
+        )
+        P.setConditionalFeatures({"G": ["A", "B", "C"]})
+        # the given arrays are wrapped, not copied
+        for actual, expected in zip(P.sharedArrays(), arrays):
+            self.assertIs(actual, expected)
+        self.assertEqual(P.conditions, ["G"])
+        self.assertEqual(P.getDistribution({"G": "C"}), {"Weak": 0.99, "Strong": 0.01})
+        with self.assertRaises(Exception):
+            _ = ConditionalProbability.fromSharedArrays(
+                "L", ["Weak", "Strong"], ["G", "D"], arrays
+            )
+
 
 def DistributionTestSuite() -> unittest.TestSuite:
     suite = unittest.TestSuite()
     suite.addTest(DistributionTest("testConditionalProbabilityIncorrect"))
     suite.addTest(DistributionTest("testDiscreteDistributionIncorrect"))
+    suite.addTest(DistributionTest("testRowSums"))
     suite.addTest(DistributionTest("testDiscreteDistributionGet"))
     suite.addTest(DistributionTest("testConditionalProbabilityGet"))
+    suite.addTest(DistributionTest("testConditionalProbabilityRowOffset"))
+    suite.addTest(DistributionTest("testDistributionCache"))
+    suite.addTest(DistributionTest("testAliasTable"))
+    suite.addTest(DistributionTest("testAliasDrawBlock"))
+    suite.addTest(DistributionTest("testSmallNodeUsesCdf"))
+    suite.addTest(DistributionTest("testFromSharedArrays"))
     return suite
@@ -0,0 +1,46 @@
+import unittest
+import numpy as np
+from model.factor import Factor, contract, eliminate, eliminationOrder
+
+
+class FactorTest(unittest.TestCase):
+    def setUp(self) -> None:
+        # P(A) and P(B | A)
+        self.__pa = Factor([0], np.array([0.6, 0.4]))
+        self.__pba = Factor([0, 1], np.array([[0.1, 0.9], [0.7, 0.3]]))
+
+    def testReduce(self) -> None:
+        reduced = self.__pba.reduce({0: 1})
+        self.assertEqual(reduced.variables, (1,))
+        self.assertTrue(np.allclose(reduced.values, [0.7, 0.3]))
+        self.assertIs(self.__pba.reduce({5: 0}), self.__pba)
+
+    def testMarginalize(self) -> None:
+        marginal = self.__pba.marginalize({1})
+        self.assertEqual(marginal.variables, (0,))
+        self.assertTrue(np.allclose(marginal.values, [1.0, 1.0]))
+
+    def testContract(self) -> None:
+        joint = contract([self.__pa, self.__pba], [1])
+        self.assertTrue(np.allclose(joint.values, [0.34, 0.66]))
+        joint = contract([self.__pa, self.__pba], [1, 0])
+        self.assertEqual(joint.values.shape, (2, 2))
+        self.assertAlmostEqual(joint.values[0, 1], 0.28)
+
+    def testEliminate(self) -> None:
+        pcb = Factor([1, 2], np.array([[0.5, 0.5], [0.2, 0.8]]))
+        factors = [self.__pa, self.__pba, pcb]
+        self.assertEqual(eliminationOrder(factors, {2}), [0, 1])
+        marginal = eliminate(factors, [2])
+        self.assertTrue(np.allclose(marginal.values, [0.302, 0.698]))
+        posterior = eliminate([f.reduce({2: 1}) for f in factors], [0]).normalize()
+        self.assertTrue(np.allclose(posterior.values, [0.462 / 0.698, 0.236 / 0.698]))
+
+
+def FactorTestSuite() -> unittest.TestSuite:
+    suite = unittest.TestSuite()
+    suite.addTest(FactorTest("testReduce"))
+    suite.addTest(FactorTest("testMarginalize"))
+    suite.addTest(FactorTest("testContract"))
+    suite.addTest(FactorTest("testEliminate"))
+    return suite
@@ -0,0 +1,105 @@
+import unittest
+import numpy as np
+from graph import (
+    FrozenGraph,
+    FrozenGraphAlgorithm,
+    UnweightedDirectionAdjacencyList,
+    UnweightedDirectionAdjacencyMatrix,
+    UnweightedIndirectionAdjacencyList,
+)
+
+
+class FrozenGraphTest(unittest.TestCase):
+    def setUp(self) -> None:
+        adj: UnweightedDirectionAdjacencyList = UnweightedDirectionAdjacencyList(
+            verticesList=["D", "I", "G", "S", "L"]
+        )
+        adj.addPath("D", "G")
+        adj.addPath("G", "L")
+        adj.addPath("I", "G")
+        adj.addPath("I", "S")
+        self.__frozen = adj.freeze()
+        self.__algorithm = FrozenGraphAlgorithm(self.__frozen)
+
+    def testLayout(self):
+        frozen = self.__frozen
+        self.assertEqual(frozen.vertices, ("D", "I", "G", "S", "L"))
+        self.assertEqual(frozen.numberOfEdges(), 4)
+        self.assertEqual(frozen.successorOffsets.dtype, np.int32)
+        self.assertEqual(frozen.successorOffsets.tolist(), [0, 1, 3, 4, 4, 4])
+        self.assertEqual(frozen.vertexesOf(frozen.successors(1)), ["G", "S"])
+        self.assertEqual(frozen.vertexesOf(frozen.predecessors(2)), ["D", "I"])
+        self.assertEqual(frozen.inDegrees().tolist(), [0, 0, 2, 1, 1])
+        self.assertEqual(frozen.outDegrees().tolist(), [1, 2, 1, 0, 0])
+        with self.assertRaises(ValueError):
+            frozen.successorIndices[0] = 3
+        with self.assertRaises(Exception):
+            frozen.index("None")
+
+    def testMatrixBackend(self):
+        adj: UnweightedDirectionAdjacencyMatrix = UnweightedDirectionAdjacencyMatrix(
+            verticesList=["a", "b", "c"]
+        )
+        adj.addPath("a", "c")
+        adj.addPath("b", "c")
+        frozen = adj.freeze()
+        self.assertEqual(frozen.vertexesOf(frozen.predecessors(frozen.index("c"))), ["a", "b"])
+        adj.addPath("a", "b")
+        # a snapshot does not follow later changes
+        self.assertEqual(frozen.numberOfEdges(), 2)
+
+    def testTopoSort(self):
+        order = self.__frozen.vertexesOf(self.__algorithm.topoSort())
+        self.assertEqual(order, ["D", "I", "G", "S", "L"])
+        adj: UnweightedDirectionAdjacencyList = UnweightedDirectionAdjacencyList()
+        adj.addPath("a", "b")
+        adj.addPath("b", "c")
+        adj.addPath("c", "a")
+        with self.assertRaises(Exception):
+            FrozenGraphAlgorithm(adj.freeze()).topoSort()
+
+    def testTraversal(self):
+        frozen = self.__frozen
+        self.assertEqual(
+            frozen.vertexesOf(self.__algorithm.bfs()), ["D", "I", "G", "S", "L"]
+        )
+        self.assertEqual(
+            frozen.vertexesOf(self.__algorithm.dfs()), ["D", "G", "L", "I", "S"]
+        )
+        self.assertEqual(frozen.vertexesOf(self.__algorithm.bfs(["L"], True)), ["L", "G", "D", "I"])
+        ancestors = self.__algorithm.reachable(["L"], reverse=True)
+        self.assertEqual(frozen.vertexesOf(np.flatnonzero(ancestors)), ["D", "I", "G", "L"])
+
+    def testMoralize(self):
+        moral = self.__algorithm.moralize()
+        self.assertFalse(moral.isDigraph())
+        self.assertEqual(moral.numberOfEdges(), 5)
+        edges = set()
+        for i in range(len(moral)):
+            for j in moral.successors(i).tolist():
+                edges.add((moral.vertices[i], moral.vertices[j]))
+        expected = {("D", "G"), ("I", "G"), ("D", "I"), ("G", "L"), ("I", "S")}
+        self.assertEqual(edges, expected | {(e, s) for s, e in expected})
+        with self.assertRaises(Exception):
+            FrozenGraphAlgorithm(moral).moralize()
+
+    def testIndirection(self):
+        adj: UnweightedIndirectionAdjacencyList = UnweightedIndirectionAdjacencyList()
+        adj.addPath("a", "b")
+        adj.addPath("b", "c")
+        frozen = adj.freeze()
+        self.assertEqual(frozen.numberOfEdges(), adj.numberOfEdges())
+        self.assertEqual(frozen.numberOfEdges(), 2)
+        self.assertEqual(len(frozen.successorIndices), 4)
+        self.assertEqual(frozen.vertexesOf(frozen.successors(1)), ["a", "c"])
+
+
+def FrozenGraphTestSuite() -> unittest.TestSuite:
+    suite = unittest.TestSuite()
+    suite.addTest(FrozenGraphTest("testLayout"))
+    suite.addTest(FrozenGraphTest("testMatrixBackend"))
+    suite.addTest(FrozenGraphTest("testTopoSort"))
+    suite.addTest(FrozenGraphTest("testTraversal"))
+    suite.addTest(FrozenGraphTest("testMoralize"))
+    suite.addTest(FrozenGraphTest("testIndirection"))
+    return suite
@@ -0,0 +1,66 @@
+import unittest
+import numpy as np
+from model.factor import Factor, eliminate
+from model.junction_tree import JunctionTree
+
+
+class JunctionTreeTest(unittest.TestCase):
+    def setUp(self) -> None:
+        # chain A -> B -> C -> D -> E, all binary
+        rng = np.random.RandomState(0)
+        self.__factors = [Factor([0], np.array([0.3, 0.7]))]
+        for v in range(1, 5):
+            table = rng.dirichlet([1.0, 1.0], size=2)
+            self.__factors.append(Factor([v - 1, v], table))
+        self.__tree = JunctionTree(self.__factors, {v: 2 for v in range(5)})
+
+    def __expected(self, variables, evidence):
+        return eliminate(
+            [f.reduce(evidence) for f in self.__factors], variables
+        ).normalize()
+
+    def testCliques(self) -> None:
+        self.assertEqual(len(self.__tree.cliques), 4)
+        self.assertEqual(len(self.__tree.treeEdges()), 3)
+
+    def testMarginals(self) -> None:
+        for evidence in [{}, {4: 1}, {0: 0, 3: 1}]:
+            self.__tree.setEvidence(evidence)
+            for v in range(5):
+                if v in evidence:
+                    continue
+                actual = self.__tree.marginal([v])
+                self.assertTrue(
+                    np.allclose(actual.values, self.__expected([v], evidence).values)
+                )
+
+    def testOutOfCliqueMarginal(self) -> None:
+        self.__tree.setEvidence({2: 1})
+        actual = self.__tree.marginal([0, 4])
+        self.assertTrue(
+            np.allclose(actual.values, self.__expected([0, 4], {2: 1}).values)
+        )
+
+    def testIncrementalEvidence(self) -> None:
+        self.__tree.setEvidence({4: 1})
+        self.__tree.calibrate()
+        full = self.__tree.propagatedMessages
+        self.assertEqual(full, 6)
+        self.__tree.setEvidence({4: 0})
+        self.__tree.calibrate()
+        # only messages pointing away from the changed end clique are redone
+        self.assertEqual(self.__tree.propagatedMessages - full, 3)
+        self.assertTrue(
+            np.allclose(
+                self.__tree.marginal([0]).values, self.__expected([0], {4: 0}).values
+            )
+        )
+
+
+def JunctionTreeTestSuite() -> unittest.TestSuite:
+    suite = unittest.TestSuite()
+    suite.addTest(JunctionTreeTest("testCliques"))
+    suite.addTest(JunctionTreeTest("testMarginals"))
+    suite.addTest(JunctionTreeTest("testOutOfCliqueMarginal"))
+    suite.addTest(JunctionTreeTest("testIncrementalEvidence"))
+    return suite
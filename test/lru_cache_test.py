@@ -0,0 +1,52 @@
+import unittest
+from common import LRUCache
+
+
+class LRUCacheTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.__cache = LRUCache(2)
+        self.__cache.put("a", 1)
+        self.__cache.put("b", 2)
+
+    def testGet(self) -> None:
+        self.assertEqual(self.__cache.get("a"), 1)
+        self.assertIsNone(self.__cache.get("c"))
+        self.assertEqual(self.__cache.hits, 1)
+        self.assertEqual(self.__cache.misses, 1)
+        self.assertEqual(self.__cache.hitRate, 0.5)
+
+    def testEvictLeastRecentlyUsed(self) -> None:
+        self.__cache.get("a")
+        self.__cache.put("c", 3)
+        self.assertIn("a", self.__cache)
+        self.assertNotIn("b", self.__cache)
+        self.assertEqual(self.__cache.evictions, 1)
+        self.assertEqual(len(self.__cache), 2)
+
+    def testGetOrCompute(self) -> None:
+        calls = []
+        compute = lambda: calls.append(1) or len(calls)
+        self.assertEqual(self.__cache.getOrCompute("c", compute), 1)
+        self.assertEqual(self.__cache.getOrCompute("c", compute), 1)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(self.__cache.misses, 1)
+        self.assertEqual(self.__cache.hits, 1)
+
+    def testClear(self) -> None:
+        self.__cache.clear()
+        self.assertEqual(len(self.__cache), 0)
+        self.assertIsNone(self.__cache.get("a"))
+
+    def testInvalidSize(self) -> None:
+        with self.assertRaises(Exception):
+            LRUCache(0)
+
+
+def LRUCacheTestSuite() -> unittest.TestSuite:
+    suite = unittest.TestSuite()
+    suite.addTest(LRUCacheTest("testGet"))
+    suite.addTest(LRUCacheTest("testEvictLeastRecentlyUsed"))
+    suite.addTest(LRUCacheTest("testGetOrCompute"))
+    suite.addTest(LRUCacheTest("testClear"))
+    suite.addTest(LRUCacheTest("testInvalidSize"))
+    return suite
@@ -0,0 +1,523 @@
+import os
+import tempfile
+import unittest
+import tracemalloc
+from unittest import mock
+import numpy as np
+from typing import Optional
+from model import (
+    ConditionalProbability,
+    DiscreteDistribution,
+    Node,
+    BayesianNetwork,
+    ForwardBayesianNetwork,
+    GibbsBayesianNetwork,
+)
+from model.network import GROUP_SAMPLES
+from model.worker import publishArrays, attachArrays
+from common import ResultCache
+
+
+def buildStudentNetwork(
+    algorithm: str, network: Optional[BayesianNetwork] = None
+) -> BayesianNetwork:
+    PD = DiscreteDistribution("D", [0.6, 0.4], (1, 2), ["Easy", "Hard"])
+    PI = DiscreteDistribution("I", [0.7, 0.3], (1, 2), ["Low", "High"])
+    PS = ConditionalProbability(
+        "S", [0.95, 0.05, 0.2, 0.8], (2, 2), ["Low", "High"], ["I"]
+    )
+    PG = ConditionalProbability(
+        "G",
+        [0.3, 0.4, 0.3, 0.05, 0.25, 0.7, 0.9, 0.08, 0.02, 0.5, 0.3, 0.2],
+        (2, 2, 3),
+        ["A", "B", "C"],
+        ["D", "I"],
+    )
+    PL = ConditionalProbability(
+        "L", [0.1, 0.9, 0.4, 0.6, 0.99, 0.01], (3, 2), ["Weak", "Strong"], ["G"]
+    )
+    PS.setConditionalFeatures({PI.name: PI.features})
+    PG.setConditionalFeatures({PD.name: PD.features, PI.name: PI.features})
+    PL.setConditionalFeatures({PG.name: PG.features})
+    nodeD, nodeI, nodeS, nodeG, nodeL = [
+        Node.fromSample(p) for p in [PD, PI, PS, PG, PL]
+    ]
+
+    if network is None:
+        network = BayesianNetwork.factory(algorithm)
+    network.addPath(nodeD, nodeG)
+    network.addPath(nodeI, nodeG)
+    network.addPath(nodeI, nodeS)
+    network.addPath(nodeG, nodeL)
+    return network
+
+
+class InProcessPool:
+    def __init__(self, network: BayesianNetwork, size: int) -> None:
+        self.__network = network
+        self.size = size
+
+    def map(self, function, tasks):
+        return [getattr(self.__network, method)(*args) for method, args in tasks]
+
+
+class SampleBlockTest(unittest.TestCase):
+    def setUp(self) -> None:
+        np.random.seed(0)
+        self.__network = buildStudentNetwork("forward")
+        self.__network._prepare()
+
+    def testBlockShape(self) -> None:
+        block = self.__network._generateSampleBlock(1000)
+        self.assertEqual(len(block), 1000)
+        self.assertEqual(len(block.names), 5)
+        self.assertEqual(block.nbytes, 5000)
+
+    def testBlockMarginals(self) -> None:
+        block = self.__network._generateSampleBlock(200000)
+        freqD = np.bincount(block.column("D"), minlength=2) / len(block)
+        freqG = np.bincount(block.column("G"), minlength=3) / len(block)
+        self.assertTrue(np.allclose(freqD, [0.6, 0.4], atol=1e-2))
+        self.assertTrue(np.allclose(freqG, [0.447, 0.2714, 0.2816], atol=1e-2))
+
+    def testBlockClamped(self) -> None:
+        block = self.__network._generateSamples(100000, {"I": "High"})
+        self.assertTrue((block.column("I") == 1).all())
+        freqS = np.bincount(block.column("S"), minlength=2) / len(block)
+        self.assertTrue(np.allclose(freqS, [0.2, 0.8], atol=1e-2))
+
+    def testFilterSamples(self) -> None:
+        block = self.__network._generateSamples(1000)
+        filtered = self.__network._filterSamples(block, {"G": "A", "L": "Weak"})
+        for record in filtered.records():
+            self.assertEqual(record["G"], "A")
+            self.assertEqual(record["L"], "Weak")
+        cnt, total = self.__network._noneConditionStatsSample({"G": "A"}, block)
+        self.assertEqual(total, 1000)
+        self.assertEqual(cnt, int((block.column("G") == 0).sum()))
+
+    def testStreamSamples(self) -> None:
+        sizes = []
+        counts = np.zeros(3, dtype=np.int64)
+        tracemalloc.start()
+        try:
+            for block in self.__network._streamSamples(500000, blockSize=20000):
+                sizes.append(len(block))
+                counts += np.bincount(block.column("G"), minlength=3)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        self.assertEqual(sizes, [20000] * 25)
+        self.assertTrue(np.allclose(counts / 500000, [0.447, 0.2714, 0.2816], atol=1e-2))
+        # the materialized store would hold 2.5MB of sample columns
+        self.assertLess(peak, 10 ** 6)
+
+
+class LikelihoodTest(unittest.TestCase):
+    def testBatchQuery(self) -> None:
+        network = buildStudentNetwork("likelihood")
+        actual = network.batchQuery(
+            [
+                ({"D": "Easy"}, {"L": "Strong"}),
+                ({"L": "Weak"}, {"I": "Low", "D": "Hard"}),
+                ({"G": "A"}, None),
+            ]
+        )
+        expected = [0.4434, 0.1420, 0.447]
+        self.assertTrue(np.allclose(actual, expected, atol=5e-3))
+
+    def testProbabilityBlock(self) -> None:
+        PL = ConditionalProbability(
+            "L", [0.1, 0.9, 0.4, 0.6, 0.99, 0.01], (3, 2), ["Weak", "Strong"], ["G"]
+        )
+        actual = PL.getProbabilityBlock([np.array([0, 1, 2, 0])], 1)
+        self.assertTrue(np.allclose(actual, [0.9, 0.6, 0.01, 0.9]))
+
+
+class WorkerPoolTest(unittest.TestCase):
+    def testPoolReused(self) -> None:
+        with buildStudentNetwork("forward") as network:
+            queries = [({"G": "A"}, None), ({"D": "Easy"}, {"L": "Strong"})]
+            first = network.batchQuery(queries, 200000)
+            pool = network._pool
+            second = network.batchQuery(queries, 200000)
+            self.assertIs(network._pool, pool)
+            self.assertEqual(first, second)
+        self.assertTrue(pool.closed)
+
+    def testSharedTables(self) -> None:
+        network = buildStudentNetwork("forward")
+        network._prepare()
+        arrays = [a for node in network._topoNodes for a in node.sharedArrays()]
+        buffer, layout = publishArrays(arrays)
+        for original, shared in zip(arrays, attachArrays(buffer, layout)):
+            self.assertTrue(np.array_equal(original, shared))
+            self.assertFalse(np.shares_memory(original, shared))
+
+
+class RandomStreamsTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.__network = buildStudentNetwork("forward")
+        self.__network._prepare()
+        self.__queries = [({"G": "A"}, None), ({"D": "Easy"}, {"L": "Strong"})]
+
+    def __counts(self, steps: int, workers: int) -> np.array:
+        ranges = self.__network._chunkRanges(steps, workers)
+        self.assertEqual(sum(n for _, n in ranges), steps)
+        return sum(
+            self.__network._forwardCounts(
+                n, self.__queries, self.__network._streams, first
+            )
+            for first, n in ranges
+        )
+
+    def testWorkerCountInvariant(self) -> None:
+        expected = self.__counts(450000, 1)
+        for workers in [2, 3, 7]:
+            self.assertTrue(np.array_equal(self.__counts(450000, workers), expected))
+
+    def testSeed(self) -> None:
+        first = self.__counts(100000, 1)
+        self.__network.randomSeed = 1
+        self.assertFalse(np.array_equal(self.__counts(100000, 1), first))
+        self.__network.randomSeed = 0
+        self.assertTrue(np.array_equal(self.__counts(100000, 1), first))
+
+    def testBatchOrder(self) -> None:
+        queries = [
+            ({"D": "Easy"}, {"L": "Strong"}),
+            ({"G": "A"}, None),
+            ({"L": "Weak"}, {"I": "Low", "D": "Hard"}),
+        ]
+        for algorithm in ["likelihood", "gibbs"]:
+            network = buildStudentNetwork(algorithm)
+            first = network.batchQuery(queries, 20000)
+            # groups draw from the stream of their evidence, not their position
+            second = network.batchQuery(queries[::-1], 20000)
+            self.assertEqual(second[::-1], first)
+        network = buildStudentNetwork("likelihood")
+        first = network.anytimeBatchQuery(queries, 0.01, blockSize=2000)
+        second = network.anytimeBatchQuery(queries[::-1], 0.01, blockSize=2000)
+        self.assertEqual(
+            [(e.estimate, e.samples) for e in second[::-1]],
+            [(e.estimate, e.samples) for e in first],
+        )
+
+
+class CompileTest(unittest.TestCase):
+    def testLayout(self) -> None:
+        compiled = buildStudentNetwork("forward").compile()
+        self.assertEqual(len(compiled), 5)
+        column = compiled.position("G")
+        self.assertEqual(
+            sorted(compiled.names[p] for p in compiled.parents[column]), ["D", "I"]
+        )
+        self.assertTrue(all(p < column for p in compiled.parents[column]))
+        self.assertEqual(compiled.cardinalities[column], 3)
+        self.assertEqual(compiled.codebooks[column], ("A", "B", "C"))
+        self.assertEqual(compiled.tables[column].shape, (4, 3))
+        self.assertEqual(compiled.cpt(column).shape, (2, 2, 3))
+        self.assertEqual(compiled.encodeState({"G": "C"}), {column: 2})
+        self.assertRaises(Exception, compiled.encodeState, {"G": "D"})
+        self.assertRaises(Exception, compiled.position, "X")
+
+    def testFrozen(self) -> None:
+        compiled = buildStudentNetwork("forward").compile()
+        with self.assertRaises(ValueError):
+            compiled.tables[0][0, 0] = 1.0
+        with self.assertRaises(ValueError):
+            compiled.parents[-1][0] = 0
+        with self.assertRaises(TypeError):
+            compiled.columnTable["X"] = 0
+
+    def testLevels(self) -> None:
+        compiled = buildStudentNetwork("forward").compile()
+        levels = [sorted(compiled.names[c] for c in level) for level in compiled.levels]
+        self.assertEqual(levels, [["D", "I"], ["G", "S"], ["L"]])
+        # columns are laid out level after level
+        self.assertEqual(np.concatenate(compiled.levels).tolist(), list(range(5)))
+
+    def testRelevance(self) -> None:
+        compiled = buildStudentNetwork("exact").compile()
+        D, I, S, G, L = [compiled.position(name) for name in "DISGL"]
+        free, weighted = compiled.relevance([D], [L])
+        self.assertEqual(sorted(free), sorted([D, I, G]))
+        self.assertEqual(weighted, [L])
+        # S is barren, I only reaches S through the evidence
+        self.assertEqual(compiled.relevance([S], [I]), ([S], []))
+        # G separates L from its ancestors
+        self.assertEqual(compiled.relevance([L], [G, D]), ([L], []))
+
+    def testRecompiled(self) -> None:
+        network = buildStudentNetwork("forward")
+        compiled = network.compile()
+        self.assertIs(network.compile(), compiled)
+        network._nodeTable["D"].setTable([0.5, 0.5])
+        self.assertIsNot(network.compile(), compiled)
+
+    def testCycleRefused(self) -> None:
+        network = buildStudentNetwork("forward")
+        nodes = network._nodeTable
+        with self.assertRaises(Exception):
+            network.addPath(nodes["L"], nodes["D"])
+        self.assertIsNone(network.getPath(nodes["L"], nodes["D"]))
+        network.addPath(nodes["S"], nodes["L"])
+        self.assertTrue(network._reachability.isAncestor(nodes["S"], nodes["L"]))
+
+
+class SamplePoolTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.__queries = [({"G": "A"}, None), ({"D": "Easy"}, {"L": "Strong"})]
+
+    def testPoolReused(self) -> None:
+        with buildStudentNetwork("forward") as network:
+            first = network.batchQuery(self.__queries, 200000)
+            pool = network.samplePool
+            self.assertEqual(len(pool), 200000)
+            # a smaller batch is answered from the pool without new samples
+            network.batchQuery(self.__queries, 100000)
+            self.assertIs(network.samplePool, pool)
+            self.assertEqual(network.batchQuery(self.__queries, 200000), first)
+
+    def testTopUp(self) -> None:
+        with buildStudentNetwork("forward") as network:
+            network.batchQuery(self.__queries, 100000)
+            column = network.samplePool.column("G")
+            network.batchQuery(self.__queries, 250000)
+            self.assertEqual(len(network.samplePool), 300000)
+            # topped up in place, the pooled rows are neither copied nor moved
+            self.assertTrue(np.shares_memory(network.samplePool.column("G"), column))
+
+    def testMatchesStreaming(self) -> None:
+        with buildStudentNetwork("forward") as network:
+            pooled = network.batchQuery(self.__queries, 300000)
+        network = ForwardBayesianNetwork(300000, poolBytes=0)
+        with buildStudentNetwork("forward", network):
+            self.assertEqual(network.batchQuery(self.__queries, 300000), pooled)
+            self.assertIsNone(network.samplePool)
+
+    def testOverCapacity(self) -> None:
+        with buildStudentNetwork("forward") as network:
+            expected = network.batchQuery(self.__queries, 300000)
+        network = ForwardBayesianNetwork(300000, poolBytes=5 * 100000)
+        with buildStudentNetwork("forward", network):
+            self.assertEqual(network.batchQuery(self.__queries, 300000), expected)
+            self.assertEqual(len(network.samplePool), 100000)
+
+    def testInvalidation(self) -> None:
+        with buildStudentNetwork("forward") as network:
+            network.batchQuery(self.__queries, 100000)
+            pool = network.samplePool
+            network._nodeTable["D"].setTable([0.0, 1.0])
+            actual = network.batchQuery([({"D": "Easy"}, None)], 100000)
+            self.assertIsNot(network.samplePool, pool)
+            self.assertEqual(actual, [0.0])
+
+            pool = network.samplePool
+            network.randomSeed = 1
+            network.batchQuery(self.__queries, 100000)
+            self.assertIsNot(network.samplePool, pool)
+
+
+class GibbsTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.__network = buildStudentNetwork("gibbs")
+
+    def testMarkovBlanket(self) -> None:
+        self.__network._prepare()
+        self.assertEqual(self.__network._markovBlankets["I"], {"D", "G", "S"})
+        self.assertEqual(self.__network._markovBlankets["L"], {"G"})
+
+    def testBatchQuery(self) -> None:
+        actual = self.__network.batchQuery(
+            [
+                ({"D": "Easy"}, {"L": "Strong"}),
+                ({"I": "High"}, {"L": "Strong"}),
+                ({"G": "A"}, None),
+            ],
+            400000,
+        )
+        expected = [0.4434, 0.1976, 0.447]
+        self.assertTrue(np.allclose(actual, expected, atol=1e-2))
+
+    def testSweepBudget(self) -> None:
+        queries = [({"D": "Easy"}, {"L": "Strong"}), ({"G": "A"}, None)]
+        for size in [1, 2, 8]:
+            network = buildStudentNetwork(
+                "gibbs", GibbsBayesianNetwork(1000, chains=100, burnIn=5, thinning=2)
+            )
+            network._workerPool = lambda: InProcessPool(network, size)
+            with mock.patch.object(
+                GibbsBayesianNetwork,
+                "_GibbsBayesianNetwork__sweep",
+                autospec=True,
+                side_effect=lambda *args: None,
+            ) as sweep:
+                network.batchQuery(queries, 450)
+            # two evidence groups, each 5 burn-in + 2 * ceil(450 / 100) sweeps
+            self.assertEqual(sweep.call_count, 2 * (5 + 2 * 5))
+
+
+class AnytimeTest(unittest.TestCase):
+    def setUp(self) -> None:
+        np.random.seed(0)
+        self.__queries = [
+            ({"G": "A"}, None),
+            ({"L": "Weak"}, {"I": "Low", "D": "Hard"}),
+            ({"D": "Easy"}, {"L": "Strong"}),
+        ]
+        self.__expected = [0.447, 0.1418, 0.443379]
+
+    def testForward(self) -> None:
+        self.__checkAnytime(buildStudentNetwork("forward"))
+
+    def testLikelihood(self) -> None:
+        self.__checkAnytime(buildStudentNetwork("likelihood"))
+
+    def testBudgetExhausted(self) -> None:
+        network = buildStudentNetwork("forward")
+        actual = network.anytimeBatchQuery(
+            self.__queries, 1e-4, maxSamples=20000, blockSize=5000
+        )
+        for estimate in actual:
+            self.assertFalse(estimate.converged)
+            self.assertEqual(estimate.samples, 20000)
+            self.assertGreater(estimate.halfWidth, 1e-4)
+
+    def __checkAnytime(self, network: BayesianNetwork) -> None:
+        actual = network.anytimeBatchQuery(
+            self.__queries, 0.01, confidence=0.99, blockSize=2000
+        )
+        for estimate, expected in zip(actual, self.__expected):
+            lower, upper = estimate.interval
+            self.assertTrue(estimate.converged)
+            self.assertLessEqual(estimate.halfWidth, 0.01)
+            self.assertTrue(lower <= expected <= upper)
+        # queries retire independently, so easy ones stop early
+        self.assertLess(min(e.samples for e in actual), max(e.samples for e in actual))
+
+
+class ExactTest(unittest.TestCase):
+    def testBatchQuery(self) -> None:
+        self.__checkBatchQuery(buildStudentNetwork("exact"))
+
+    def testJunctionTreeBatchQuery(self) -> None:
+        self.__checkBatchQuery(buildStudentNetwork("junction"))
+
+    def testPlanQueries(self) -> None:
+        network = buildStudentNetwork("exact")
+        planned = network._planQueries(
+            [({"L": "Weak"}, {"G": "A", "D": "Easy"}), ({"D": "Easy"}, {"S": "High"})]
+        )
+        self.assertEqual(planned, [({"L": "Weak"}, {"G": "A"}), ({"D": "Easy"}, None)])
+
+    def testCachedBatchQuery(self) -> None:
+        network = buildStudentNetwork("exact")
+        queries = [({"G": "A"}, None), ({"D": "Easy"}, {"L": "Strong"})]
+        with tempfile.TemporaryDirectory() as directory:
+            with ResultCache(os.path.join(directory, "results.sqlite")) as cache:
+                first = network.cachedBatchQuery(queries, cache, "model")
+                self.assertEqual(cache.misses, 2)
+                # answered queries come from the cache, only the new one runs
+                second = network.cachedBatchQuery(
+                    [({"I": "High"}, {"L": "Strong"})] + queries, cache, "model"
+                )
+                self.assertEqual(cache.hits, 2)
+                self.assertEqual(second[1:], first)
+                network.cachedBatchQuery(queries, cache, "other model")
+                self.assertEqual(cache.misses, 5)
+        self.assertTrue(np.allclose(second, [0.197548, 0.447, 0.443379], atol=1e-5))
+
+    def testCachedComposition(self) -> None:
+        query = ({"D": "Easy"}, {"L": "Strong"})
+        others = [({"S": "High"}, {"L": "Strong"}), ({"G": "A"}, {"L": "Strong"})]
+        for algorithm in ["likelihood", "gibbs"]:
+            network = buildStudentNetwork(algorithm)
+            with tempfile.TemporaryDirectory() as directory:
+                with ResultCache(os.path.join(directory, "results.sqlite")) as cache:
+                    network.cachedBatchQuery([query, others[0]], cache, "model", 20000)
+                    cached = network.cachedBatchQuery(
+                        [others[1], query], cache, "model", 20000
+                    )
+                    self.assertEqual(cache.hits, 1)
+            # a cached answer is the one any batch holding its query computes,
+            # up to the order its weights are summed in
+            for batch, i in [([others[1], query], 1), ([query], 0)]:
+                uncached = network.batchQuery(batch, 20000)[i]
+                self.assertAlmostEqual(cached[1], uncached, places=12)
+
+    def testBudgetKey(self) -> None:
+        network = buildStudentNetwork("exact")
+        queries = [({"G": "A"}, None)]
+        with tempfile.TemporaryDirectory() as directory:
+            with ResultCache(os.path.join(directory, "results.sqlite")) as cache:
+                network.cachedBatchQuery(queries, cache, "model", 100)
+                network.cachedBatchQuery(queries, cache, "model", 1000)
+                self.assertEqual((cache.hits, cache.misses), (1, 1))
+        # the key follows the samples the engine really draws
+        likelihood = buildStudentNetwork("likelihood")
+        self.assertEqual(
+            likelihood._budgetKey(-1), likelihood._budgetKey(GROUP_SAMPLES)
+        )
+        self.assertNotEqual(likelihood._budgetKey(1000), likelihood._budgetKey(-1))
+        gibbs = GibbsBayesianNetwork(1000, chains=100)
+        self.assertNotEqual(
+            gibbs._budgetKey(1000), GibbsBayesianNetwork(1000)._budgetKey(1000)
+        )
+        self.assertNotEqual(
+            gibbs._budgetKey(1000),
+            GibbsBayesianNetwork(1000, chains=100, thinning=5)._budgetKey(1000),
+        )
+
+    def __checkBatchQuery(self, network: BayesianNetwork) -> None:
+        actual = network.batchQuery(
+            [
+                ({"D": "Easy"}, {"L": "Strong"}),
+                ({"I": "High"}, {"L": "Strong"}),
+                ({"L": "Weak"}, {"I": "Low", "D": "Hard"}),
+                ({"G": "A"}, None),
+                ({"D": "Easy", "I": "Low"}, {"L": "Strong"}),
+            ]
+        )
+        expected = [0.443379, 0.197548, 0.1418, 0.447, 0.379357]
+        self.assertTrue(np.allclose(actual, expected, atol=1e-5))
+
+
+def NetworkTestSuite() -> unittest.TestSuite:
+    suite = unittest.TestSuite()
+    suite.addTest(SampleBlockTest("testBlockShape"))
+    suite.addTest(SampleBlockTest("testBlockMarginals"))
+    suite.addTest(SampleBlockTest("testBlockClamped"))
+    suite.addTest(SampleBlockTest("testFilterSamples"))
+    suite.addTest(SampleBlockTest("testStreamSamples"))
+    suite.addTest(LikelihoodTest("testBatchQuery"))
+    suite.addTest(LikelihoodTest("testProbabilityBlock"))
+    suite.addTest(WorkerPoolTest("testPoolReused"))
+    suite.addTest(WorkerPoolTest("testSharedTables"))
+    suite.addTest(RandomStreamsTest("testWorkerCountInvariant"))
+    suite.addTest(RandomStreamsTest("testSeed"))
+    suite.addTest(RandomStreamsTest("testBatchOrder"))
+    suite.addTest(CompileTest("testLayout"))
+    suite.addTest(CompileTest("testFrozen"))
+    suite.addTest(CompileTest("testLevels"))
+    suite.addTest(CompileTest("testRelevance"))
+    suite.addTest(CompileTest("testRecompiled"))
+    suite.addTest(CompileTest("testCycleRefused"))
+    suite.addTest(SamplePoolTest("testPoolReused"))
+    suite.addTest(SamplePoolTest("testTopUp"))
+    suite.addTest(SamplePoolTest("testMatchesStreaming"))
+    suite.addTest(SamplePoolTest("testOverCapacity"))
+    suite.addTest(SamplePoolTest("testInvalidation"))
+    suite.addTest(GibbsTest("testMarkovBlanket"))
+    suite.addTest(GibbsTest("testBatchQuery"))
+    suite.addTest(GibbsTest("testSweepBudget"))
+    suite.addTest(AnytimeTest("testForward"))
+    suite.addTest(AnytimeTest("testLikelihood"))
+    suite.addTest(AnytimeTest("testBudgetExhausted"))
+    suite.addTest(ExactTest("testBatchQuery"))
+    suite.addTest(ExactTest("testJunctionTreeBatchQuery"))
+    suite.addTest(ExactTest("testPlanQueries"))
+    suite.addTest(ExactTest("testCachedBatchQuery"))
+    suite.addTest(ExactTest("testCachedComposition"))
+    suite.addTest(ExactTest("testBudgetKey"))
+    return suite
@@ -0,0 +1,133 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+from model import ModelParser, BayesianNetwork, Node
+
+
+class ModelParserTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.__directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self) -> None:
+        self.__directory.cleanup()
+
+    def __write(self, lines) -> str:
+        path = os.path.join(self.__directory.name, "model.txt")
+        with open(path, "w") as fp:
+            fp.write("\n".join([str(len(lines))] + lines) + "\n")
+        return path
+
+    def __parse(self, lines) -> ModelParser:
+        parser = ModelParser(self.__write(lines))
+        parser.parse()
+        return parser
+
+    def testStudentModel(self):
+        parser = self.__parse(
+            [
+                "L;G;Weak,Strong;3,2;0.1,0.9,0.4,0.6,0.99,0.01",
+                "G;D,I;A,B,C;2,2,3;0.3,0.4,0.3,0.05,0.25,0.7,0.9,0.08,0.02,0.5,0.3,0.2",
+                "D;;Easy,Hard;2;0.6,0.4",
+                "I;;Low,High;2;0.7,0.3",
+                "X;;x0,x1,x2,x3,x4,x5,x6,x7,x8,x9,x10,x11;12;"
+                + ",".join(["0.5"] + ["0.0"] * 10 + ["0.5"]),
+            ]
+        )
+        nodes = parser.getNodes()
+        self.assertEqual(parser.getNumberOfNodes(), 5)
+        self.assertEqual(nodes["G"].table.shape, (2, 2, 3))
+        self.assertEqual(nodes["G"].conditions, ["D", "I"])
+        self.assertEqual(nodes["X"].table.shape, (1, 12))
+        network = parser.buildNetwork(BayesianNetwork.factory("exact"))
+        # a root without children is still part of the network
+        self.assertEqual(len(network.vertexSet()), 5)
+        self.assertEqual(network.numberOfEdges(), 3)
+        compiled = network.compile()
+        self.assertEqual(len(compiled), 5)
+        self.assertLess(compiled.position("G"), compiled.position("L"))
+        self.assertAlmostEqual(network.batchQuery([({"X": "x11"}, None)])[0], 0.5)
+
+    def testSharedTables(self):
+        parser = self.__parse(
+            [
+                "L;G;Weak,Strong;3,2;0.1,0.9,0.4,0.6,0.99,0.01",
+                "G;;A,B,C;3;0.2,0.3,0.5",
+            ]
+        )
+        network = parser.buildNetwork(BayesianNetwork.factory("exact"))
+        compiled = network.compile()
+        node = next(v for v in network.vertexSet() if v.name == "L")
+        # the compiled columns are views of the tables the nodes wrap
+        self.assertTrue(
+            np.shares_memory(compiled.tables[compiled.position("L")], node.table)
+        )
+        self.assertEqual(node.table.shape, (3, 2))
+        self.assertEqual(
+            node.getDistribution({"G": "C"}), {"Weak": 0.99, "Strong": 0.01}
+        )
+        # a changed table is recompiled, other networks keep their own copy
+        node.setTable([0.5, 0.5, 0.4, 0.6, 0.99, 0.01])
+        self.assertAlmostEqual(network.batchQuery([({"L": "Weak"}, None)])[0], 0.715)
+        other = parser.buildNetwork(BayesianNetwork.factory("exact"))
+        self.assertAlmostEqual(other.batchQuery([({"L": "Weak"}, None)])[0], 0.635)
+
+    def testNoNodeCap(self):
+        lines = ["N0;;a,b;2;0.5,0.5"] + [
+            "N{};N{};a,b;2,2;0.5,0.5,0.1,0.9".format(i, i - 1) for i in range(1, 1500)
+        ]
+        network = self.__parse(lines).buildNetwork(BayesianNetwork.factory("forward"))
+        self.assertEqual(len(network.compile().levels), 1500)
+
+    def testInvalidModel(self):
+        invalid = [
+            # the parent has 2 states, not 3
+            ["D;;Easy,Hard;2;0.6,0.4", "L;D;Weak,Strong;3,2;0.1,0.9,0.4,0.6,0.99,0.01"],
+            # unknown parent
+            ["D;;Easy,Hard;2;0.6,0.4", "L;G;Weak,Strong;2,2;0.1,0.9,0.4,0.6"],
+            # not a number
+            ["D;;Easy,Hard;2;0.6,x", "I;;Low,High;2;0.7,0.3"],
+            # features and shape disagree
+            ["D;;Easy,Hard,Medium;2;0.6,0.4", "I;;Low,High;2;0.7,0.3"],
+            # defined twice
+            ["D;;Easy,Hard;2;0.6,0.4", "D;;Easy,Hard;2;0.6,0.4"],
+            # a row that does not sum to one
+            ["D;;Easy,Hard;2;0.6,0.4", "L;D;Weak,Strong;2,2;0.1,0.9,0.4,0.7"],
+            # too few probabilities
+            ["D;;Easy,Hard;2;0.6,0.4", "L;D;Weak,Strong;2,2;0.1,0.9"],
+        ]
+        for lines in invalid:
+            with self.assertRaises(Exception):
+                self.__parse(lines)
+        # the header announces more nodes than the file holds
+        path = self.__write(["D;;Easy,Hard;2;0.6,0.4", "I;;Low,High;2;0.7,0.3"])
+        with open(path, "r+") as fp:
+            fp.write("3")
+        with self.assertRaises(Exception):
+            ModelParser(path).parse()
+
+    def testNodeFromTxt(self):
+        node = Node.fromTxt("L;G;Weak,Strong;3,2;0.1,0.9,0.4,0.6,0.99,0.01")
+        self.assertEqual(node.name, "L")
+        with self.assertRaisesRegex(Exception, "Incorrect probabilities of node D"):
+            Node.fromTxt("D;;Easy,Hard;2;0.6,x")
+
+    def testCycle(self):
+        with self.assertRaisesRegex(Exception, "cycle"):
+            self.__parse(
+                [
+                    "A;B;a0,a1;2,2;0.5,0.5,0.1,0.9",
+                    "B;A;b0,b1;2,2;0.5,0.5,0.1,0.9",
+                ]
+            )
+
+
+def ModelParserTestSuite() -> unittest.TestSuite:
+    suite = unittest.TestSuite()
+    suite.addTest(ModelParserTest("testStudentModel"))
+    suite.addTest(ModelParserTest("testSharedTables"))
+    suite.addTest(ModelParserTest("testNoNodeCap"))
+    suite.addTest(ModelParserTest("testInvalidModel"))
+    suite.addTest(ModelParserTest("testNodeFromTxt"))
+    suite.addTest(ModelParserTest("testCycle"))
+    return suite
@@ -0,0 +1,47 @@
+import os
+import unittest
+from common import ProcessPool
+
+_offset = 0
+
+
+def initOffset(offset: int) -> None:
+    global _offset
+    _offset = offset
+
+
+def addOffset(value: int):
+    return os.getpid(), value + _offset
+
+
+class ProcessPoolTest(unittest.TestCase):
+    def testMap(self) -> None:
+        with ProcessPool(2, initOffset, (10,)) as pool:
+            result = [value for _, value in pool.map(addOffset, [1, 2, 3])]
+        self.assertEqual(result, [11, 12, 13])
+
+    def testReuseWorkers(self) -> None:
+        with ProcessPool(1, initOffset, (0,)) as pool:
+            first = {pid for pid, _ in pool.map(addOffset, [1, 2])}
+            second = {pid for pid, _ in pool.map(addOffset, [3, 4])}
+        self.assertEqual(first, second)
+
+    def testSpawn(self) -> None:
+        with ProcessPool(1, initOffset, (5,), "spawn") as pool:
+            self.assertEqual(pool.map(addOffset, [1])[0][1], 6)
+
+    def testClose(self) -> None:
+        pool = ProcessPool(1)
+        pool.close()
+        self.assertTrue(pool.closed)
+        with self.assertRaises(Exception):
+            pool.map(addOffset, [1])
+
+
+def ProcessPoolTestSuite() -> unittest.TestSuite:
+    suite = unittest.TestSuite()
+    suite.addTest(ProcessPoolTest("testMap"))
+    suite.addTest(ProcessPoolTest("testReuseWorkers"))
+    suite.addTest(ProcessPoolTest("testSpawn"))
+    suite.addTest(ProcessPoolTest("testClose"))
+    return suite
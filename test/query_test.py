@@ -0,0 +1,83 @@
+import unittest
+import numpy as np
+import model.query as query
+from model import SampleStore
+from model.query import BatchQueryExecutor
+
+
+class BatchQueryExecutorTest(unittest.TestCase):
+    def setUp(self) -> None:
+        rng = np.random.RandomState(0)
+        self.__samples = SampleStore(
+            ["A", "B", "C"],
+            [["a0", "a1"], ["b0", "b1", "b2"], ["c0", "c1"]],
+            1000,
+            [
+                rng.randint(0, 2, 1000).astype(np.uint8),
+                rng.randint(0, 3, 1000).astype(np.uint8),
+                rng.randint(0, 2, 1000).astype(np.uint8),
+            ],
+        )
+        self.__queries = [
+            ({0: 1}, None),
+            ({1: 2}, {0: 0}),
+            ({2: 1}, {0: 1, 1: 0}),
+            ({0: 0, 2: 0}, {1: 1}),
+        ]
+
+    def __expected(self):
+        columns = [self.__samples.columnAt(i) for i in range(3)]
+        result = []
+        for prob, evidence in self.__queries:
+            evidenceMask = np.ones(1000, dtype=bool)
+            for p, v in (evidence or {}).items():
+                evidenceMask &= columns[p] == v
+            probMask = evidenceMask.copy()
+            for p, v in prob.items():
+                probMask &= columns[p] == v
+            result.append((int(probMask.sum()), int(evidenceMask.sum())))
+        return result
+
+    def testJointTableCounts(self) -> None:
+        executor = BatchQueryExecutor(self.__queries, [2, 3, 2])
+        executor.accumulate(self.__samples)
+        self.assertEqual(executor.counts(), self.__expected())
+
+    def testPredicateCounts(self) -> None:
+        limit = query.JOINT_TABLE_LIMIT
+        query.JOINT_TABLE_LIMIT = 0
+        try:
+            executor = BatchQueryExecutor(self.__queries, [2, 3, 2])
+        finally:
+            query.JOINT_TABLE_LIMIT = limit
+        executor.accumulate(self.__samples)
+        self.assertEqual(executor.counts(), self.__expected())
+
+    def testAccumulateBlocks(self) -> None:
+        executor = BatchQueryExecutor(self.__queries, [2, 3, 2])
+        executor.accumulate(self.__samples.select(np.arange(1000) < 400))
+        executor.accumulate(self.__samples.select(np.arange(1000) >= 400))
+        self.assertEqual(executor.counts(), self.__expected())
+
+    def testUnitWeightVariances(self) -> None:
+        counted = BatchQueryExecutor(self.__queries, [2, 3, 2])
+        counted.accumulate(self.__samples)
+        weighted = BatchQueryExecutor(
+            self.__queries, [2, 3, 2], weighted=True, secondMoments=True
+        )
+        weighted.accumulate(self.__samples, np.ones(1000))
+        expected = [n / d * (1 - n / d) / d for n, d in self.__expected()]
+        self.assertTrue(np.allclose(counted.variances(), expected))
+        self.assertTrue(np.allclose(weighted.variances(), expected))
+        self.assertTrue(
+            np.allclose(weighted.effectiveSamples(), [d for _, d in self.__expected()])
+        )
+
+
+def QueryTestSuite() -> unittest.TestSuite:
+    suite = unittest.TestSuite()
+    suite.addTest(BatchQueryExecutorTest("testJointTableCounts"))
+    suite.addTest(BatchQueryExecutorTest("testPredicateCounts"))
+    suite.addTest(BatchQueryExecutorTest("testAccumulateBlocks"))
+    suite.addTest(BatchQueryExecutorTest("testUnitWeightVariances"))
+    return suite
@@ -0,0 +1,78 @@
+import unittest
+from graph import ReachabilityIndex, UnweightedDirectionAdjacencyList
+
+
+class ReachabilityIndexTest(unittest.TestCase):
+    def setUp(self) -> None:
+        adj: UnweightedDirectionAdjacencyList = UnweightedDirectionAdjacencyList(
+            verticesList=["D", "I", "G", "S", "L"]
+        )
+        adj.addPath("D", "G")
+        adj.addPath("G", "L")
+        adj.addPath("I", "G")
+        adj.addPath("I", "S")
+        self.__adj = adj
+        self.__index = ReachabilityIndex(adj)
+
+    def testInvalidVertex(self):
+        with self.assertRaises(Exception):
+            self.__index.ancestors([None])
+        with self.assertRaises(Exception):
+            self.__index.isAncestor("D", "None")
+        with self.assertRaises(Exception):
+            ReachabilityIndex(self.__adj, maxBytes=0)
+
+    def testQueries(self):
+        self.assertEqual(self.__index.ancestors(["L"]), ["D", "I", "G"])
+        self.assertEqual(self.__index.descendants(["I"]), ["G", "S", "L"])
+        self.assertEqual(self.__index.ancestors(["L", "S"]), ["D", "I", "G"])
+        self.assertEqual(
+            self.__index.descendantMask(["D", "S"]).tolist(),
+            [False, False, True, False, True],
+        )
+        self.assertTrue(self.__index.isAncestor("D", "L"))
+        self.assertFalse(self.__index.isAncestor("L", "D"))
+        self.assertTrue(self.__index.isDescendant("S", "I"))
+        self.assertFalse(self.__index.isDescendant("S", "D"))
+
+    def testIncremental(self):
+        self.__index.build()
+        self.__index.checkNewPath("S", "L")
+        self.__adj.addPath("S", "L")
+        self.__index.pathAdded("S", "L")
+        self.__adj.addPath("L", "X")
+        self.__index.pathAdded("L", "X")
+        self.assertEqual(self.__index.ancestors(["X"]), ["D", "I", "G", "S", "L"])
+        self.assertEqual(self.__index.descendants(["S"]), ["L", "X"])
+        self.assertEqual(self.__index.descendants(["D"]), ["G", "L", "X"])
+        with self.assertRaises(Exception):
+            self.__index.checkNewPath("X", "I")
+        with self.assertRaises(Exception):
+            self.__index.checkNewPath("G", "G")
+
+    def testUntrackedChange(self):
+        self.assertEqual(self.__index.ancestors(["L"]), ["D", "I", "G"])
+        self.__adj.deletePath("G", "L")
+        self.__adj.addPath("S", "L")
+        self.assertEqual(self.__index.ancestors(["L"]), ["I", "S"])
+
+    def testBoundedMemory(self):
+        adj: UnweightedDirectionAdjacencyList = UnweightedDirectionAdjacencyList()
+        chain = ["v{}".format(i) for i in range(300)]
+        for start, end in zip(chain, chain[1:]):
+            adj.addPath(start, end)
+        index = ReachabilityIndex(adj, maxBytes=2000)
+        index.build()
+        self.assertLessEqual(index.nbytes, 2000)
+        self.assertEqual(index.ancestors(["v299"]), chain[:-1])
+        self.assertEqual(index.descendants(["v0"]), chain[1:])
+
+
+def ReachabilityIndexTestSuite() -> unittest.TestSuite:
+    suite = unittest.TestSuite()
+    suite.addTest(ReachabilityIndexTest("testInvalidVertex"))
+    suite.addTest(ReachabilityIndexTest("testQueries"))
+    suite.addTest(ReachabilityIndexTest("testIncremental"))
+    suite.addTest(ReachabilityIndexTest("testUntrackedChange"))
+    suite.addTest(ReachabilityIndexTest("testBoundedMemory"))
+    return suite
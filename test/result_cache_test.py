@@ -0,0 +1,50 @@
+import os
+import tempfile
+import unittest
+from common import ResultCache, fileFingerprint
+
+
+class ResultCacheTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.__directory = tempfile.TemporaryDirectory()
+        self.__path = os.path.join(self.__directory.name, "results.sqlite")
+
+    def tearDown(self) -> None:
+        self.__directory.cleanup()
+
+    def testPersist(self) -> None:
+        with ResultCache(self.__path) as cache:
+            cache.putMany([("a", 0.5), ("b", {"x": 1})])
+        with ResultCache(self.__path) as cache:
+            self.assertEqual(cache.getMany(["a", "b", "c"]), {"a": 0.5, "b": {"x": 1}})
+            self.assertEqual(cache.hits, 2)
+            self.assertEqual(cache.misses, 1)
+            self.assertIsNone(cache.get("c"))
+
+    def testEvictLeastRecentlyUsed(self) -> None:
+        with ResultCache(self.__path, maxEntries=2) as cache:
+            cache.put("a", 1)
+            cache.put("b", 2)
+            cache.get("a")
+            cache.put("c", 3)
+            self.assertEqual(len(cache), 2)
+            self.assertEqual(cache.evictions, 1)
+            self.assertEqual(sorted(cache.getMany(["a", "b", "c"])), ["a", "c"])
+
+    def testFingerprint(self) -> None:
+        path = os.path.join(self.__directory.name, "model.txt")
+        with open(path, "w") as fp:
+            fp.write("model")
+        first = fileFingerprint(path)
+        self.assertEqual(first, fileFingerprint(path))
+        with open(path, "a") as fp:
+            fp.write(" changed")
+        self.assertNotEqual(first, fileFingerprint(path))
+
+
+def ResultCacheTestSuite() -> unittest.TestSuite:
+    suite = unittest.TestSuite()
+    suite.addTest(ResultCacheTest("testPersist"))
+    suite.addTest(ResultCacheTest("testEvictLeastRecentlyUsed"))
+    suite.addTest(ResultCacheTest("testFingerprint"))
+    return suite
@@ -1,5 +1,9 @@
 import unittest
-from graph import TopoSortAlgorithm, UnweightedDirectionAdjacencyMatrix
+from graph import (
+    TopoSortAlgorithm,
+    UnweightedDirectionAdjacencyList,
+    UnweightedDirectionAdjacencyMatrix,
+)
 
 
 class TopoSortTest1(unittest.TestCase):
@@ -99,6 +103,43 @@ class TopoSortTest2(unittest.TestCase):
         self.assertEqual(expected, actual)
 
 
+class KahnTest(unittest.TestCase):
+    def testLevels(self):
+        adj: UnweightedDirectionAdjacencyMatrix = UnweightedDirectionAdjacencyMatrix(
+            verticesList=["a", "c", "b", "d"]
+        )
+        adj.addPath("a", "b")
+        adj.addPath("b", "c")
+        adj.addPath("a", "c")
+        adj.addPath("d", "c")
+        topo = TopoSortAlgorithm(adj)
+        # plain BFS from the roots reaches c before its parent b
+        self.assertEqual([v for v in topo.bfs()], ["a", "d", "c", "b"])
+        self.assertEqual(topo.levels(), [["a", "d"], ["b"], ["c"]])
+        self.assertEqual([v for v in topo.kahn()], ["a", "d", "b", "c"])
+
+    def testCycle(self):
+        adj: UnweightedDirectionAdjacencyMatrix = UnweightedDirectionAdjacencyMatrix(
+            verticesList=["a", "b", "c", "d"]
+        )
+        adj.addPath("a", "b")
+        adj.addPath("b", "c")
+        adj.addPath("c", "d")
+        adj.addPath("d", "b")
+        with self.assertRaisesRegex(
+            Exception, "b -> c -> d -> b|c -> d -> b -> c|d -> b -> c -> d"
+        ):
+            TopoSortAlgorithm(adj).levels()
+
+    def testDeepChain(self):
+        adj: UnweightedDirectionAdjacencyList = UnweightedDirectionAdjacencyList()
+        chain = ["v{}".format(i) for i in range(5000)]
+        for start, end in zip(chain, chain[1:]):
+            adj.addPath(start, end)
+        topo = TopoSortAlgorithm(adj)
+        self.assertEqual([v for v in topo.dfs()], chain)
+        self.assertEqual([v for v in topo.kahn()], chain)
+
 
 def TopoSortTestSuite() -> unittest.TestSuite:
     suite = unittest.TestSuite()
@@ -113,4 +154,8 @@ def TopoSortTestSuite() -> unittest.TestSuite:
     suite.addTest(TopoSortTest2("testTopoSortFromD"))
     suite.addTest(TopoSortTest2("testTopoSortFromI"))
     suite.addTest(TopoSortTest2("testTopoSortAll"))
+
+    suite.addTest(KahnTest("testLevels"))
+    suite.addTest(KahnTest("testCycle"))
+    suite.addTest(KahnTest("testDeepChain"))
     return suite
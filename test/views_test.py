@@ -0,0 +1,95 @@
+import unittest
+from graph import (
+    BayesBallAlgorithm,
+    EdgeMaskedGraphView,
+    InducedSubgraphView,
+    ReversedGraphView,
+    TopoSortAlgorithm,
+    UnweightedDirectionAdjacencyList,
+    UnweightedIndirectionAdjacencyMatrix,
+    reverseGraph,
+)
+
+
+class GraphViewTest(unittest.TestCase):
+    def setUp(self) -> None:
+        adj: UnweightedDirectionAdjacencyList = UnweightedDirectionAdjacencyList(
+            verticesList=["D", "I", "G", "S", "L"]
+        )
+        adj.addPath("D", "G")
+        adj.addPath("G", "L")
+        adj.addPath("I", "G")
+        adj.addPath("I", "S")
+        self.__adj = adj
+
+    def testReversed(self):
+        view = ReversedGraphView(self.__adj)
+        self.assertEqual([v for v, _ in view.allInorderedSuccessors("G")], ["D", "I"])
+        self.assertEqual([v for v, _ in view.allPredecessors("I")], ["G", "S"])
+        self.assertEqual(view.getPath("L", "G"), 1)
+        self.assertIsNone(view.getPath("G", "L"))
+        self.assertEqual(view.inDegree("I"), 2)
+        self.assertEqual(view.numberOfEdges(), 4)
+        self.assertEqual(list(view.zeroInDegreeVertexes()), ["S", "L"])
+        self.assertEqual(TopoSortAlgorithm(view).levels(), [["S", "L"], ["G"], ["D", "I"]])
+        self.assertEqual(reverseGraph(self.__adj).vertexSet(), self.__adj.vertexSet())
+        # a view follows the graph below it
+        self.__adj.addPath("S", "L")
+        self.assertEqual([v for v, _ in view.allSuccessors("L")], ["G", "S"])
+
+    def testInduced(self):
+        view = InducedSubgraphView(self.__adj, ["I", "G", "L"])
+        self.assertEqual(view.vertexSet(), ["I", "G", "L"])
+        self.assertEqual([v for v, _ in view.allSuccessors("I")], ["G"])
+        self.assertEqual([v for v, _ in view.allPredecessors("G")], ["I"])
+        self.assertEqual(list(view.zeroInDegreeVertexes()), ["I"])
+        self.assertEqual(view.numberOfEdges(), 2)
+        self.assertFalse(view.checkVertexExist("D"))
+        with self.assertRaises(Exception):
+            _ = [v for v in view.allSuccessors("D")]
+        with self.assertRaises(Exception):
+            InducedSubgraphView(self.__adj, ["X"])
+        frozen = view.freeze()
+        self.assertEqual(frozen.vertices, ("I", "G", "L"))
+        self.assertEqual(frozen.numberOfEdges(), 2)
+
+    def testEdgeMasked(self):
+        view = EdgeMaskedGraphView.intervened(self.__adj, ["G"])
+        self.assertEqual(view.hiddenEdges, {("D", "G"), ("I", "G")})
+        self.assertIsNone(view.getPath("D", "G"))
+        self.assertEqual(view.inDegree("G"), 0)
+        self.assertEqual(view.numberOfEdges(), 2)
+        # observing G no longer couples its former parents, and cutting its
+        # parents leaves L independent of I
+        ball = BayesBallAlgorithm(view)
+        self.assertTrue(ball.isDSeparated(["L"], ["I"], []))
+        self.assertFalse(BayesBallAlgorithm(self.__adj).isDSeparated(["L"], ["I"], []))
+
+    def testIndirection(self):
+        adj: UnweightedIndirectionAdjacencyMatrix = UnweightedIndirectionAdjacencyMatrix(
+            verticesList=["a", "b", "c"]
+        )
+        adj.addPath("a", "b")
+        adj.addPath("b", "c")
+        view = EdgeMaskedGraphView(adj, [("b", "a")])
+        self.assertIsNone(view.getPath("a", "b"))
+        self.assertEqual(view.numberOfEdges(), 1)
+
+    def testReadOnly(self):
+        view = ReversedGraphView(self.__adj)
+        with self.assertRaises(Exception):
+            view.addPath("L", "D")
+        with self.assertRaises(Exception):
+            view.addNewNode("X")
+        with self.assertRaises(Exception):
+            view.deletePath("L", "G")
+
+
+def GraphViewTestSuite() -> unittest.TestSuite:
+    suite = unittest.TestSuite()
+    suite.addTest(GraphViewTest("testReversed"))
+    suite.addTest(GraphViewTest("testInduced"))
+    suite.addTest(GraphViewTest("testEdgeMasked"))
+    suite.addTest(GraphViewTest("testIndirection"))
+    suite.addTest(GraphViewTest("testReadOnly"))
+    return suite